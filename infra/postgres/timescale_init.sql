@@ -48,6 +48,14 @@ CREATE INDEX IF NOT EXISTS idx_candlesticks_pair_time ON candlesticks (trading_p
 CREATE INDEX IF NOT EXISTS idx_candlesticks_open_time ON candlesticks (trading_pair_id, open_time);
 CREATE INDEX IF NOT EXISTS idx_candlesticks_close_time ON candlesticks (trading_pair_id, close_time);
 
+-- Create the "ingestion_state" table (per trading pair resume watermark, updated in the COPY transaction)
+CREATE TABLE IF NOT EXISTS ingestion_state (
+    trading_pair_id INT PRIMARY KEY REFERENCES trading_pairs(id) ON DELETE CASCADE,  -- Reference to the trading pair
+    last_open_time BIGINT NOT NULL,                                                  -- Latest stored opening time in milliseconds
+    last_close_time BIGINT NOT NULL,                                                 -- Latest stored closing time in milliseconds
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()                                    -- Time of the last update
+);
+
 -- Insert example data into the "sources" table (optional)
 INSERT INTO sources (name, type, description)
 VALUES
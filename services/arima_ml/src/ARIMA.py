@@ -7,18 +7,12 @@ from statsmodels.tsa.arima.model import ARIMA
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 import math
 from pmdarima.arima import auto_arima
-
-def load_data(frequency, local=False):
-    if local == True:
-        df = pd.read_json(f"../../sample_data/LINKUSDT_{frequency}.json")
-
-    else:
-        print("TODO: create logic to load data from database here")
+from data import load_data
 
 def clean_data(df):
     df["Date"] = pd.to_datetime(df["open time"], unit='ms')
     df.index = df["Date"]
-    df.drop(columns=['open time', 'close time', 'delete', 'Date'], inplace=True)
+    df.drop(columns=['open time', 'close time', 'delete', 'Date'], errors='ignore', inplace=True)
 
     df_close = df['close']
 
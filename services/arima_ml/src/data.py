@@ -0,0 +1,32 @@
+"""
+Loading of the LINKUSDT candlestick history for the models and notebooks of this directory.
+
+Kept apart from the modelling code, so reading data does not import statsmodels or TensorFlow.
+"""
+import sys
+import pandas as pd
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _candle_store_class():
+    # The candle store belongs to the loader service and is imported through the repository root
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.append(str(REPO_ROOT))
+    from services.binance_data_loader.src.archive.candle_store import CandleStore
+    return CandleStore
+
+
+def load_data(frequency, local=False, store_dir=None):
+    if store_dir is not None:
+        # Memory-mapped candle store written by the loader (loader/candle_store_path), nothing is parsed
+        with _candle_store_class().open(Path(store_dir) / f"LINKUSDT_{frequency}.candles") as store:
+            return store.to_dataframe()
+
+    if local == True:
+        df = pd.read_json(REPO_ROOT / "sample_data" / f"LINKUSDT_{frequency}.json")
+        return df
+
+    else:
+        print("TODO: create logic to load data from database here")
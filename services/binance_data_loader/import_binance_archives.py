@@ -0,0 +1,178 @@
+"""
+Start script for importing deep candlestick history from the public Binance kline archives.
+
+Paging `client.get_klines` a few hundred rows at a time is the slowest way to load years of 1m
+candles. Binance publishes the same data as monthly and daily zip files on data.binance.vision
+(e.g., `BTCUSDT-1m-2024-01.zip`). This script imports such files from a local directory without
+any network access, so the regular loader only has to fetch the recent tail afterwards.
+
+Workflow
+--------
+1. **Setup**: The script reads `config.yml` for the database connection, the log path and the
+   optional `loader` section, scans the given directory for kline archives and resolves the
+   trading pairs of all found (symbol, interval) combinations in a few set-based queries.
+2. **Parsing**: The archives are decompressed and parsed by a pool of worker processes. At most
+   twice as many files as there are workers are parsed ahead of the database writer, so memory
+   stays bounded.
+3. **Validation**: Candles that are already stored, or that overlap with an earlier file (e.g., a
+   daily file of a month that is also available as a monthly file), are skipped. Missing candles
+   are reported as gaps; they can be filled later with `load_binance_data.py --mode repair`.
+4. **Import**: Every file is written as one COPY batch through the same path as the loader
+   (`loader/copy_format`, `loader/write_mode`) and committed on its own, advancing the
+   `ingestion_state` watermark, so `load_binance_data.py` continues right after the imported data.
+
+Example
+-------
+Download the archives, e.g., from https://data.binance.vision/?prefix=data/spot/monthly/klines/,
+into a directory and execute:
+
+    python import_binance_archives.py /data/binance --workers 4
+"""
+import argparse
+import pandas as pd
+
+from binance.helpers import interval_to_milliseconds
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from src.config.config_loader import load_config
+from src.data_download.kline_archive_reader import find_kline_archives, read_kline_archive, validate_continuity
+from src.db.database_handler import connect_to_database
+from src.db.postgres_operations import PostgresOperations
+from src.config.logger_config import setup_logger
+
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SOURCE_NAME = "Binance"
+
+
+def parse_archives(paths: List[Path], executor: ProcessPoolExecutor,
+                   max_pending: int) -> Iterator[Tuple[Path, pd.DataFrame]]:
+    """
+    Parses archives in a process pool and yields (path, DataFrame) in the order of `paths`.
+
+    At most `max_pending` files are parsed ahead of the consumer.
+    """
+    paths = iter(paths)
+    pending = deque((path, executor.submit(read_kline_archive, path)) for path in islice(paths, max_pending))
+    while pending:
+        path, future = pending.popleft()
+        for next_path in islice(paths, 1):
+            pending.append((next_path, executor.submit(read_kline_archive, next_path)))
+        yield path, future.result()
+
+
+def import_trading_pair(key: Tuple[str, str], paths: List[Path], pair_state: Dict, connection,
+                        pg: PostgresOperations, executor: ProcessPoolExecutor, max_pending: int) -> int:
+    """
+    Imports the archives of one trading pair in chronological order and returns the number of rows.
+
+    Parameters
+    ----------
+    key : Tuple[str, str]
+        (symbol, interval) of the trading pair.
+    paths : List[Path]
+        Archives of the pair, ordered by period.
+    pair_state : Dict
+        The 'trading_pair_id' and 'last_close_time' of the pair.
+    connection : psycopg2 connection
+        Database connection object.
+    pg : PostgresOperations
+        Database operations used to store the data.
+    executor : ProcessPoolExecutor
+        Pool that parses the archives.
+    max_pending : int
+        Number of archives parsed ahead of the database writer.
+
+    Returns
+    -------
+    int
+        Number of rows imported.
+    """
+    symbol, interval = key
+    interval_ms = interval_to_milliseconds(interval)
+
+    # Resume after the last stored candle, expressed as its open time for the continuity check
+    last_open_time = pair_state['last_close_time']
+    if last_open_time and interval_ms:
+        last_open_time = last_open_time + 1 - interval_ms
+
+    def batches():
+        nonlocal last_open_time
+        for path, df_klines in parse_archives(paths, executor, max_pending):
+            df_klines, gaps = validate_continuity(df_klines, interval_ms, last_open_time)
+            for gap_start, gap_end in gaps:
+                logger.warning(f"Gap in '{symbol}' with interval '{interval}' at {path.name}: "
+                               f"open times {gap_start} to {gap_end} are missing.")
+            if df_klines.empty:
+                logger.info(f"Skipping {path.name}, all candles are already imported.")
+                continue
+
+            last_open_time = int(df_klines['open time'].iloc[-1])
+            yield df_klines
+
+    return pg.copy_import_candlestick_batches(connection, batches(), pair_state['trading_pair_id'])
+
+
+def import_archives(directory: Path, connection, workers: int, settings: Optional[Dict] = None) -> None:
+    """
+    Imports all Binance kline archives found below `directory` into the database.
+
+    Parameters
+    ----------
+    directory : Path
+        Directory containing the kline zip files, searched recursively.
+    connection : psycopg2 connection
+        Database connection object.
+    workers : int
+        Number of processes that parse archives.
+    settings : Dict, optional
+        The `loader` section of `config.yml`.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    - A failure of one trading pair is logged and does not affect the others. Batches committed
+      before the failure are kept, and a second run continues after them.
+    """
+    settings = settings or {}
+    pg = PostgresOperations(logger, settings.get('copy_format', 'csv'), settings.get('write_mode', 'copy'))
+
+    archives = find_kline_archives(directory)
+    if not archives:
+        logger.warning(f"No Binance kline archives found in '{directory}'.")
+        return
+
+    pg.ensure_ingestion_state_table(connection)
+    pair_states = pg.resolve_trading_pairs(connection, list(archives), SOURCE_NAME)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for key, paths in archives.items():
+            try:
+                rows = import_trading_pair(key, paths, pair_states[key], connection, pg, executor, workers * 2)
+                logger.info(f"Imported {rows} candles from {len(paths)} archives for '{key[0]}' with interval '{key[1]}'.")
+            except Exception as e:
+                logger.error(f"Error occurred while importing '{key[0]}' with interval '{key[1]}'. ERROR: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import Binance kline archive files into the database.")
+    parser.add_argument("directory", type=Path, help="Directory containing the kline zip files.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of processes that parse archives.")
+    args = parser.parse_args()
+
+    conf_path = Path(__file__).resolve().parent / "/app/config.yml"
+    config = load_config(conf_path)
+
+    log_path = Path(config['log']['path'])
+    logger = setup_logger(log_path)
+
+    conn = connect_to_database(config['postgres'])
+    import_archives(args.directory, conn, args.workers, config.get('loader', {}))
+    conn.close()
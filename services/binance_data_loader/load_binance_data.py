@@ -39,35 +39,352 @@ Configuration Files
 Workflow
 --------
 1. **Setup**: The script reads `config.yml` to load API credentials and configure the logger.
-   It then loads `trading_pairs.yml` to determine the trading pairs and intervals to process.
+   It then loads `trading_pairs.yml` to determine the trading pairs and intervals to process,
+   checks the Binance system status once and resolves the IDs and resume points of all trading
+   pairs in a few set-based queries.
 2. **Data Retrieval**: For each trading pair:
    - If no previous data exists, the script performs an **initial load** from the specified `start_date`.
    - If previous data is found, the script performs an **incremental update** starting from
      the last recorded `close time`. This approach minimizes redundant API requests by only
      fetching new data since the last recorded candlestick.
-3. **Logging**: All operations are logged to a file located in the path specified by `log/path`
-   in `config.yml`.
+3. **Concurrency**: With `loader/workers` greater than 1 in `config.yml`, the trading pairs are
+   processed by a pool of worker threads. All workers share one token-bucket rate limiter that is
+   driven by the used-weight headers Binance returns, sized by `loader/max_weight_per_minute`.
+   A failure of one trading pair is logged and never affects the others.
+   With `loader/writer_workers` set, the workers only download and hand their batches to that
+   many concurrent COPY connections, which are assigned by the TimescaleDB space partition of the
+   trading pair and report their throughput.
+   Initial loads can additionally be split into time windows that are fetched concurrently
+   (`loader/backfill_workers`).
+   With `loader/streaming` enabled, pages are handed to the database writer in batches of
+   `loader/flush_size` rows as they arrive and every batch is committed on its own, so memory
+   stays flat regardless of the length of the history.
+   Loads spanning more than `loader/flush_size` candles always take this path: every committed
+   batch advances the `ingestion_state` watermark of its pair in the same transaction, so a load
+   that is interrupted by an error, a ban or a restart resumes from the last committed batch.
+   Rate limits (429/418), server errors and network failures are retried with backoff
+   (`loader/max_retries`, `loader/retry_backoff_seconds`, `loader/max_backoff_seconds`).
+   With `loader/http_client: aiohttp`, klines are fetched by a pooled keep-alive aiohttp client
+   with gzip and ujson decoding that keeps `loader/pipeline_depth` pages in flight per pair.
+4. **Gap Repair**: Started with `--mode repair`, the script scans the stored series for missing
+   candles in SQL and refetches only those ranges from Binance.
+5. **Daemon**: Started with `--mode daemon`, the script keeps its database connection and caches
+   warm, computes the next close boundary of every trading pair from its interval and sleeps
+   until exactly then, fetching only the newly closed candles.
+6. **Rollup**: With `loader/rollup` enabled, coarser intervals of a symbol that is also configured
+   at 1m (e.g., 5m, 1h, 1d) are not downloaded. After every 1m load they are aggregated from the
+   stored 1m candles in SQL, recomputing only the buckets that received new candles, and stored
+   under their own trading pair.
+7. **Stream**: Started with `--mode stream`, the script subscribes to the kline WebSocket streams
+   of all trading pairs and writes closed candles in micro-batches (`loader/stream_batch_size`
+   candles or `loader/stream_flush_seconds`), one COPY per batch. After every (re)connect the
+   candles missed while not subscribed are backfilled over REST.
+8. **Spool**: With `loader/spool_path` set, fetched batches are appended to a local on-disk spool
+   and written to the database by a separate drainer thread, so fetching never waits for the
+   database. After an outage or a restart the spooled batches are replayed, no data is lost. If
+   the database rejects a batch, the pair is skipped until the next run fetches it again.
+9. **Metrics**: With `loader/metrics_port` or `loader/metrics_textfile` set, request latency and
+   outcome, used API weight, the duration of every stage (JSON decode, DataFrame build, numeric
+   conversion, CSV serialisation, COPY), committed rows and the lag behind the latest closed
+   candle are exposed as Prometheus metrics, labelled by symbol and interval.
+10. **Candle Store**: With `loader/candle_store_path` set, every committed candle is also appended
+    to a memory-mapped `<symbol>_<interval>.candles` file, which analysis code opens without parsing.
+11. **Logging**: All operations are logged to a file located in the path specified by `log/path`
+    in `config.yml`.
 
 Example
 -------
 To run this script, make sure to create `config.yml` and `trading_pairs.yml` in the same directory.
 Then execute:
 
+    python load_binance_data.py                 # load new candles
+    python load_binance_data.py --mode repair   # refetch gaps in the stored series
+    python load_binance_data.py --mode daemon   # keep running, fetch candles as they close
+    python load_binance_data.py --mode stream   # keep running, receive closed candles via WebSocket
 """
+import argparse
+import asyncio
+import atexit
+import signal
+import threading
+import time
+import pandas as pd
+
 from binance.client import Client
-from binance.helpers import date_to_milliseconds
+from binance.helpers import date_to_milliseconds, interval_to_milliseconds
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from psycopg2.pool import ThreadedConnectionPool
 
+from src.archive.candle_store import CandleStore
 from src.config.config_loader import load_config
+from src.data_download.async_kline_client import BINANCE_API_URL, AsyncKlineClient, ThreadedKlineClient
 from src.data_download.binance_data_loader import BinanceDataLoader
+from src.data_download.rate_limiter import WeightRateLimiter
+from src.data_download.retry_policy import RetryPolicy
+from src.db.batch_spool import BatchSpool, SpoolDrainer
 from src.db.database_handler import connect_to_database
+from src.db.parallel_copy_writer import ParallelCopyWriter
 from src.db.postgres_operations import PostgresOperations
+from src.helper import metrics
+from src.helper.prefetch import prefetch
+from src.helper.rollup import plan_rollups, rollup_bucket_width
+from src.scheduler.candle_scheduler import CandleCloseScheduler, next_close_boundary
+from src.streaming.kline_stream import BINANCE_STREAM_URL, KlineStreamIngestor
 from src.config.logger_config import setup_logger
 
 
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Tuple, Union
+
+SOURCE_NAME = "Binance"
+
+
+def prepare_trading_pairs(pairs: List[Dict], client, connection,
+                          pg: PostgresOperations) -> Optional[Dict[Tuple[str, str], Dict]]:
+    """
+    Startup phase: checks the Binance system status once and resolves the database ID and
+    resume point of every configured trading pair in a few set-based queries.
+
+    Parameters
+    ----------
+    pairs : List[Dict]
+        List of trading pair configurations with each dictionary containing 'symbol',
+        'interval', and 'start_date' keys.
+    client : binance.Client
+        Binance client instance for API interaction.
+    connection : psycopg2 connection
+        Database connection object.
+    pg : PostgresOperations
+        Database operations used to resolve the trading pairs.
+
+    Returns
+    -------
+    Dict[Tuple[str, str], Dict] or None
+        Maps every (symbol, interval) to its 'trading_pair_id' and 'last_close_time', or `None`
+        if Binance is not available.
+    """
+    status = client.get_system_status()
+    if status.get('status') != 0:
+        logger.error("Binance is not available. Skipping data load for all trading pairs.")
+        return None
+
+    pg.ensure_ingestion_state_table(connection)
+    return pg.resolve_trading_pairs(connection, [(pair['symbol'], pair['interval']) for pair in pairs], SOURCE_NAME)
+
+
+def plan_trading_pairs(pairs: List[Dict], settings: Dict) -> Tuple[List[Dict], Dict[Tuple[str, str], List[str]]]:
+    """
+    Returns the trading pairs to download and, with `loader/rollup` enabled, the intervals that
+    are derived locally from every configured (symbol, '1m') pair instead.
+    """
+    if settings.get('rollup', False):
+        return plan_rollups(pairs)
+    return pairs, {}
+
+
+def rollup_trading_pair(source_key: Tuple[str, str], since_ms: Optional[int], intervals: List[str],
+                        pair_states: Dict[Tuple[str, str], Dict], connection, pg: PostgresOperations) -> None:
+    """
+    Rebuilds the buckets of all derived intervals of a 1m trading pair that contain candles from
+    `since_ms` onwards (all buckets if `None`). Errors are logged per interval.
+    """
+    symbol = source_key[0]
+    for interval in intervals:
+        try:
+            pg.rollup_candlesticks(connection, pair_states[source_key]['trading_pair_id'],
+                                   pair_states[(symbol, interval)]['trading_pair_id'],
+                                   rollup_bucket_width(interval), since_ms or 0)
+        except Exception as e:
+            logger.error(f"Error occurred while rolling up '{symbol}' with interval '{interval}'. ERROR: {e}")
+
+
+def store_candles(settings: Dict, symbol: str, interval: str, df_klines) -> None:
+    """
+    Appends candlestick data to the memory-mapped candle store of the pair, if
+    `loader/candle_store_path` is configured.
+    """
+    store_path = settings.get('candle_store_path')
+    if not store_path or df_klines.empty:
+        return
+
+    path = Path(store_path) / f"{symbol}_{interval}.candles"
+    with CandleStore.create(path, symbol, interval, interval_to_milliseconds(interval) or 0) as store:
+        store.append_dataframe(df_klines)
+
+
+def committed_candle_store(settings: Dict, pair_states: Dict[Tuple[str, str], Dict]) -> Optional[Callable]:
+    """
+    Returns the `PostgresOperations.on_committed` callback that appends committed candlestick data
+    to the candle store, or `None` if `loader/candle_store_path` is not configured.
+
+    The store is only appended once the data has been committed, so it never holds candles the
+    database does not have.
+    """
+    if not settings.get('candle_store_path'):
+        return None
+    pairs_by_id = {state['trading_pair_id']: key for key, state in pair_states.items()}
+
+    def on_committed(df_klines) -> None:
+        for trading_pair_id, df_pair in df_klines.groupby('trading_pair_id'):
+            symbol, interval = pairs_by_id[trading_pair_id]
+            try:
+                store_candles(settings, symbol, interval, df_pair)
+            except Exception as e:
+                logger.error(f"Error appending '{symbol}' with interval '{interval}' to the candle store. ERROR: {e}")
+
+    return on_committed
+
+
+def create_binance_loader(settings: Dict, rate_limiter: Optional[WeightRateLimiter] = None) -> BinanceDataLoader:
+    """
+    Creates a BinanceDataLoader with the numeric mode, retry policy and HTTP client of the `loader`
+    settings.
+    """
+    rate_limiter = rate_limiter or WeightRateLimiter(settings.get('max_weight_per_minute', 6000))
+    retry_policy = RetryPolicy(settings.get('max_retries', 5), settings.get('retry_backoff_seconds', 1.0),
+                               settings.get('max_backoff_seconds', 120.0))
+
+    kline_client = None
+    if settings.get('http_client', 'binance') == 'aiohttp':
+        kline_client = ThreadedKlineClient(AsyncKlineClient(
+            logger, settings.get('api_url', BINANCE_API_URL), settings.get('http_connections', 20),
+            settings.get('pipeline_depth', 8), rate_limiter=rate_limiter, retry_policy=retry_policy))
+        atexit.register(kline_client.close)
+
+    return BinanceDataLoader(logger, rate_limiter, settings.get('numeric_mode', 'decimal'), retry_policy, kline_client)
+
+
+def needs_checkpoints(settings: Dict, interval: str, start_ts: int) -> bool:
+    """
+    Returns True if a load from `start_ts` has to be written in committed batches, either because
+    `loader/streaming` is enabled or because it spans more than `loader/flush_size` candles.
+    """
+    if settings.get('streaming', False):
+        return True
+    interval_ms = interval_to_milliseconds(interval)
+    if not interval_ms:
+        return False
+    return (time.time() * 1000 - start_ts) / interval_ms > settings.get('flush_size', 50_000)
+
 
-def process_trading_pairs(pairs: List[Dict], client, connection) -> None:
+def process_trading_pair(pair: Dict, pair_state: Dict, client, connection, bh: BinanceDataLoader,
+                         pg: PostgresOperations, settings: Optional[Dict] = None,
+                         writer: Optional[Union[ParallelCopyWriter, BatchSpool]] = None) -> None:
+    """
+    Retrieves the candlestick data of a single trading pair and saves it to the database.
+
+    Parameters
+    ----------
+    pair : Dict
+        Trading pair configuration containing 'symbol', 'interval', and 'start_date' keys.
+    pair_state : Dict
+        The 'trading_pair_id' and 'last_close_time' of the pair, as resolved by
+        `prepare_trading_pairs`.
+    client : binance.Client
+        Binance client instance for API interaction.
+    connection : psycopg2 connection
+        Database connection object for inserting data.
+    bh : BinanceDataLoader
+        Loader used to fetch the candlestick data.
+    pg : PostgresOperations
+        Database operations used to store the data.
+    settings : Dict, optional
+        The `loader` section of `config.yml`.
+    writer : ParallelCopyWriter or BatchSpool, optional
+        Writer the batches are handed to instead of writing them on `connection`, which may then
+        be `None`.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    - Any exception is logged and swallowed, so a failing trading pair never affects the others.
+    - With `streaming` enabled, or if the load spans more than `flush_size` candles, the data is
+      written in batches of `flush_size` rows while it is being fetched; at most
+      `max_pending_batches` batches are buffered ahead of the writer. Every batch commits the
+      watermark of the pair, so an interrupted load resumes after the last committed batch. If
+      the `writer` fails a batch, the download of the pair stops.
+    - An initial load (no data in the database yet) is fetched as a time-sharded parallel backfill
+      when `backfill_workers` is greater than 1.
+    - With `write_mode` set to 'merge', the last stored candle is fetched again and upserted,
+      so a candle that was still open during the previous run gets its final values.
+    """
+    settings = settings or {}
+    symbol = pair['symbol']
+    interval = pair['interval']
+    start_date = pair['start_date']
+
+    try:
+        trading_pair_id = pair_state['trading_pair_id']
+
+        # Resume after the last close time recorded in the database or use the start_date
+        last_close_time = pair_state['last_close_time']
+        if last_close_time:
+            start_ts = last_close_time + 1
+            if settings.get('write_mode', 'copy') == 'merge':
+                # Re-fetch the last stored candle, it may still have been open when it was loaded
+                start_ts -= interval_to_milliseconds(interval)
+            backfill_workers = 1
+        else:
+            start_ts = date_to_milliseconds(start_date)  # Convert start_date to milliseconds
+            backfill_workers = settings.get('backfill_workers', 1)
+
+        if needs_checkpoints(settings, interval, start_ts):
+            # Hand batches to the database as they arrive, one commit per batch
+            # Stop downloading once the writer has given up on the pair
+            cancelled = None
+            if writer is not None:
+                cancelled = lambda: trading_pair_id in writer.failed_pairs
+            batches = bh.iter_candlestick_batches(client, symbol, interval, start_ts,
+                                                  settings.get('flush_size', 50_000), backfill_workers, cancelled)
+
+            if writer is not None:
+                total_rows = 0
+                for df_batch in batches:
+                    writer.submit(trading_pair_id, df_batch)
+                    total_rows += len(df_batch)
+                if cancelled is not None and cancelled():
+                    logger.warning(f"Stopped downloading '{symbol}' with interval '{interval}' after a failed write.")
+                elif total_rows:
+                    # Queued batches may still fail, the outcome is reported once the writer is closed
+                    logger.info(f"Queued {total_rows} rows of '{symbol}' with interval '{interval}' for writing.")
+                else:
+                    logger.warning(f"No new data available for '{symbol}' with interval '{interval}'. Skipping.")
+                return
+
+            batches = prefetch(batches, settings.get('max_pending_batches', 2))
+            total_rows = pg.copy_import_candlestick_batches(connection, batches, trading_pair_id)
+            if total_rows:
+                logger.info(f"Data for '{symbol}' with interval '{interval}' has been successfully processed.")
+            else:
+                logger.warning(f"No new data available for '{symbol}' with interval '{interval}'. Skipping.")
+            return
+
+        # Load candlestick data from Binance
+        df_klines = bh.load_candlestick_data(client, symbol, interval, start_ts, backfill_workers)
+
+        if writer is not None and not df_klines.empty:
+            writer.submit(trading_pair_id, df_klines)
+            logger.info(f"Queued {len(df_klines)} rows of '{symbol}' with interval '{interval}' for writing.")
+            return
+
+        df_klines["trading_pair_id"] = trading_pair_id
+        df_klines.insert(0, 'trading_pair_id', df_klines.pop('trading_pair_id'))  # Move 'timestamp' to the first column
+
+        if not df_klines.empty:
+            # Save data to the database using PostgreSQL COPY
+            if pg.copy_import_candlestick_data(connection, df_klines):
+                logger.info(f"Data for '{symbol}' with interval '{interval}' has been successfully processed.")
+        else:
+            logger.warning(f"No new data available for '{symbol}' with interval '{interval}'. Skipping.")
+
+    except Exception as e:
+        logger.error(f"Error occurred while processing '{symbol}' with interval '{interval}'. ERROR: {e}")
+
+
+def process_trading_pairs(pairs: List[Dict], client, connection, settings: Optional[Dict] = None) -> None:
     """
     Processes each trading pair from the configuration, checks the Binance system status,
     retrieves candlestick data, and saves it to the database.
@@ -81,6 +398,8 @@ def process_trading_pairs(pairs: List[Dict], client, connection) -> None:
         Binance client instance for API interaction.
     connection : psycopg2 connection
         Database connection object for inserting data.
+    settings : Dict, optional
+        The `loader` section of `config.yml`.
 
     Returns
     -------
@@ -88,9 +407,10 @@ def process_trading_pairs(pairs: List[Dict], client, connection) -> None:
 
     Notes
     -----
-    - The function checks the Binance system status before each data retrieval. If Binance
-      is unavailable, it skips the current trading pair.
-    - Ensures the trading pair and source exist in the database before data processing.
+    - The Binance system status is checked once before any data retrieval. If Binance is
+      unavailable, no trading pair is processed.
+    - The trading pairs and their source are created in bulk if they do not exist yet, and
+      the resume points are read from the `ingestion_state` watermark table.
     - Saves the candlestick data directly to the database.
 
     Example
@@ -100,51 +420,485 @@ def process_trading_pairs(pairs: List[Dict], client, connection) -> None:
     process_trading_pairs(pairs, client, connection)
     ```
     """
-    bh = BinanceDataLoader(logger)
-    pg = PostgresOperations(logger)
-    source_name = "Binance"
+    settings = settings or {}
+    bh = create_binance_loader(settings)
+    pg = PostgresOperations(logger, settings.get('copy_format', 'csv'), settings.get('write_mode', 'copy'))
+
+    pair_states = prepare_trading_pairs(pairs, client, connection, pg)
+    if pair_states is None:
+        return
+    pg.on_committed = committed_candle_store(settings, pair_states)
+
+    download_pairs, rollups = plan_trading_pairs(pairs, settings)
+    for pair in download_pairs:
+        key = (pair['symbol'], pair['interval'])
+        since_ms = pair_states[key]['last_close_time']
+        process_trading_pair(pair, pair_states[key], client, connection, bh, pg, settings)
+        if key in rollups:
+            rollup_trading_pair(key, since_ms, rollups[key], pair_states, connection, pg)
+
+
+def process_trading_pairs_concurrently(pairs: List[Dict], client, db_params: Dict, workers: int,
+                                       rate_limiter: WeightRateLimiter, settings: Optional[Dict] = None) -> None:
+    """
+    Processes the trading pairs with a pool of worker threads that share one rate limiter.
+
+    Every worker borrows its own database connection from a connection pool, so the COPY
+    transactions of different trading pairs never interfere with each other. All Binance requests
+    are paced by the shared `rate_limiter`, which keeps the combined request weight of all
+    workers within the per-IP budget.
+
+    With `loader/spool_path` set, the workers append their batches to a local on-disk spool
+    instead of writing them, and a single drainer thread writes the spool to the database at its
+    own pace. Fetching then never waits for the database, and batches that could not be written
+    before the process stopped are replayed on the next run.
 
+    Parameters
+    ----------
+    pairs : List[Dict]
+        List of trading pair configurations with each dictionary containing 'symbol',
+        'interval', and 'start_date' keys.
+    client : binance.Client
+        Binance client instance for API interaction, shared by all workers.
+    db_params : Dict
+        Database connection parameters (the `postgres` section of `config.yml`).
+    workers : int
+        Number of trading pairs processed at the same time.
+    rate_limiter : WeightRateLimiter
+        Limiter shared by all workers.
+    settings : Dict, optional
+        The `loader` section of `config.yml`.
+
+    Returns
+    -------
+    None
+
+    Example
+    -------
+    ```python
+    limiter = WeightRateLimiter(max_weight_per_minute=6000)
+    process_trading_pairs_concurrently(pairs, client, config['postgres'], workers=8, rate_limiter=limiter)
+    ```
+    """
+    settings = settings or {}
+    bh = create_binance_loader(settings, rate_limiter)
+    pg = PostgresOperations(logger, settings.get('copy_format', 'csv'), settings.get('write_mode', 'copy'))
+    spool_path = settings.get('spool_path')
+    writer_workers = 0 if spool_path else settings.get('writer_workers', 0)
+    pool = ThreadedConnectionPool(1, workers + writer_workers, **db_params)
+
+    download_pairs, rollups = plan_trading_pairs(pairs, settings)
+    writer = None
+    drainer = None
+
+    def worker(pair: Dict) -> None:
+        key = (pair['symbol'], pair['interval'])
+        if writer is not None:
+            process_trading_pair(pair, pair_states[key], client, None, bh, pg, settings, writer)
+            return
+
+        connection = pool.getconn()
+        try:
+            since_ms = pair_states[key]['last_close_time']
+            process_trading_pair(pair, pair_states[key], client, connection, bh, pg, settings)
+            if key in rollups:
+                rollup_trading_pair(key, since_ms, rollups[key], pair_states, connection, pg)
+        finally:
+            pool.putconn(connection)
+
+    try:
+        connection = pool.getconn()
+        try:
+            pair_states = prepare_trading_pairs(pairs, client, connection, pg)
+            if pair_states is not None and writer_workers:
+                trading_pair_ids = [state['trading_pair_id'] for state in pair_states.values()]
+                partitions = pg.get_space_partitions(connection, trading_pair_ids)
+        finally:
+            pool.putconn(connection)
+        if pair_states is None:
+            return
+        pg.on_committed = committed_candle_store(settings, pair_states)
+
+        since = {key: state['last_close_time'] for key, state in pair_states.items()}
+        if spool_path:
+            # Fetch workers only append to the spool, the drainer writes it to the database
+            writer = BatchSpool(spool_path, fsync=settings.get('spool_fsync', True))
+            for state in pair_states.values():
+                # Resume after batches that were fetched before, but not written yet
+                spooled = writer.last_close_times.get(state['trading_pair_id'], 0)
+                state['last_close_time'] = max(state['last_close_time'] or 0, spooled) or None
+            drainer = SpoolDrainer(logger, writer, pg, lambda: connect_to_database(db_params))
+        elif writer_workers:
+            # Fetch workers only download, the writers COPY grouped by hypertable space partition
+            writer = ParallelCopyWriter(logger, pool, pg, writer_workers, partitions,
+                                        settings.get('max_pending_batches', 2))
+
+        logger.info(f"Processing {len(download_pairs)} trading pairs with {workers} workers.")
+        written = True
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(worker, download_pairs))
+        finally:
+            if drainer is not None:
+                written = drainer.close(settings.get('spool_drain_timeout', 600))
+                writer.close()
+            elif writer is not None:
+                writer.close()
+                report_written_pairs(download_pairs, pair_states, writer)
+
+        if not written and rollups:
+            logger.warning("Skipping rollups, the spool has not been written to the database completely.")
+        elif writer is not None and rollups:
+            connection = pool.getconn()
+            try:
+                for key, intervals in rollups.items():
+                    rollup_trading_pair(key, since[key], intervals, pair_states, connection, pg)
+            finally:
+                pool.putconn(connection)
+    finally:
+        pool.closeall()
+
+
+def report_written_pairs(pairs: List[Dict], pair_states: Dict, writer: ParallelCopyWriter) -> None:
+    """
+    Logs whether the batches queued for every trading pair have been written, once `writer` is closed.
+    """
     for pair in pairs:
+        symbol, interval = pair['symbol'], pair['interval']
+        trading_pair_id = pair_states[(symbol, interval)]['trading_pair_id']
+        if trading_pair_id in writer.failed_pairs:
+            logger.error(f"Writing '{symbol}' with interval '{interval}' failed, the rest is loaded next run.")
+        elif writer.rows_by_pair.get(trading_pair_id):
+            logger.info(f"Data for '{symbol}' with interval '{interval}' has been successfully processed "
+                        f"({writer.rows_by_pair[trading_pair_id]} rows).")
+
+
+def repair_trading_pairs(pairs: List[Dict], client, connection, settings: Optional[Dict] = None) -> None:
+    """
+    Finds holes in the stored candlestick series and fetches only the missing ranges from Binance.
+
+    Gaps in the middle of a series (Binance outages, rolled back COPYs, ...) are never noticed by
+    the regular load, which only resumes after the last close time. This function scans every
+    configured trading pair for missing `open_time` slots in SQL and upserts the refetched candles,
+    so data is fixed without a full reload.
+
+    Parameters
+    ----------
+    pairs : List[Dict]
+        List of trading pair configurations with each dictionary containing 'symbol',
+        'interval', and 'start_date' keys.
+    client : binance.Client
+        Binance client instance for API interaction.
+    connection : psycopg2 connection
+        Database connection object.
+    settings : Dict, optional
+        The `loader` section of `config.yml`.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    - Ranges for which Binance itself has no data (e.g., exchange downtime) cannot be repaired
+      and are reported again on the next run.
+    """
+    settings = settings or {}
+    bh = create_binance_loader(settings)
+    pg = PostgresOperations(logger, settings.get('copy_format', 'csv'))
+
+    pair_states = prepare_trading_pairs(pairs, client, connection, pg)
+    if pair_states is None:
+        return
+    pg.on_committed = committed_candle_store(settings, pair_states)
+
+    download_pairs, rollups = plan_trading_pairs(pairs, settings)
+    for pair in download_pairs:
         symbol = pair['symbol']
         interval = pair['interval']
-        start_date = pair['start_date']
+        trading_pair_id = pair_states[(symbol, interval)]['trading_pair_id']
 
         try:
-            # Check Binance system status
-            status = client.get_system_status()
-            if status.get('status') != 0:
-                logger.error(f"Binance is not available. Skipping data load for '{symbol}' with interval '{interval}'.")
-                continue
-
-            # Ensure trading pair exists in the database
-            trading_pair_id = pg.get_or_create_trading_pair(connection, symbol, interval, source_name)
-
-            # Get the last close time from the database or use the start_date
-            last_close_time = pg.get_last_close_time(connection, trading_pair_id)
-            if last_close_time:
-                start_ts = last_close_time + 1
-            else:
-                start_ts = date_to_milliseconds(start_date)  # Convert start_date to milliseconds
+            gaps = pg.find_candle_gaps(connection, trading_pair_id, interval_to_milliseconds(interval))
+            repaired_rows = 0
+            for gap_start, gap_end in gaps:
+                klines = bh.get_klines_window(client, symbol, interval, gap_start, gap_end)
+                if not klines:
+                    logger.warning(f"Binance has no data for '{symbol}' with interval '{interval}' "
+                                   f"between {gap_start} and {gap_end}.")
+                    continue
+
+                df_klines = bh.build_candlestick_dataframe(klines, symbol, interval)
+                df_klines.insert(0, 'trading_pair_id', trading_pair_id)
+                pg.merge_import_candlestick_data(connection, df_klines)
+                repaired_rows += len(df_klines)
+
+            logger.info(f"Repaired {repaired_rows} candles in {len(gaps)} gaps for '{symbol}' with interval '{interval}'.")
+            if repaired_rows and (symbol, interval) in rollups:
+                rollup_trading_pair((symbol, interval), gaps[0][0], rollups[(symbol, interval)], pair_states,
+                                    connection, pg)
+        except Exception as e:
+            logger.error(f"Error occurred while repairing '{symbol}' with interval '{interval}'. ERROR: {e}")
 
-            # Load candlestick data from Binance
-            df_klines = bh.load_candlestick_data(client, symbol, interval, start_ts)
 
-            df_klines["trading_pair_id"] = trading_pair_id
-            df_klines.insert(0, 'trading_pair_id', df_klines.pop('trading_pair_id'))  # Move 'timestamp' to the first column
+def fetch_closed_candles(pair: Dict, pair_state: Dict, boundary: int, client, connection,
+                         bh: BinanceDataLoader, pg: PostgresOperations) -> None:
+    """
+    Fetches the candles of a trading pair that closed before `boundary` and upserts them.
 
-            if not df_klines.empty:
-                # Save data to the database using PostgreSQL COPY
-                pg.copy_import_candlestick_data(connection, df_klines)
+    Parameters
+    ----------
+    pair : Dict
+        Trading pair configuration containing 'symbol', 'interval', and 'start_date' keys.
+    pair_state : Dict
+        Cached 'trading_pair_id' and 'last_close_time' of the pair, updated in place.
+    boundary : int
+        Close boundary in milliseconds that has just passed.
+    client : binance.Client
+        Binance client instance for API interaction.
+    connection : psycopg2 connection
+        Database connection object.
+    bh : BinanceDataLoader
+        Loader used to fetch the candlestick data.
+    pg : PostgresOperations
+        Database operations used to store the data; its `on_committed` callback receives the
+        stored candles.
 
-                logger.info(f"Data for '{symbol}' with interval '{interval}' has been successfully processed.")
-            else:
-                logger.warning(f"No new data available for '{symbol}' with interval '{interval}'. Skipping.")
+    Returns
+    -------
+    None
+    """
+    symbol = pair['symbol']
+    interval = pair['interval']
+    step = interval_to_milliseconds(interval)
+
+    # The last closed candle opened one step before the boundary. It is always fetched again,
+    # because it may have been stored while it was still open.
+    last_open_time = boundary - step
+    if pair_state['last_close_time']:
+        start_ts = min(pair_state['last_close_time'] + 1, last_open_time)
+    else:
+        start_ts = min(date_to_milliseconds(pair['start_date']), last_open_time)
+
+    klines = bh.get_klines_window(client, symbol, interval, start_ts, last_open_time)
+    if not klines:
+        logger.warning(f"No closed candle available yet for '{symbol}' with interval '{interval}' at {boundary}.")
+        return
+
+    df_klines = bh.build_candlestick_dataframe(klines, symbol, interval)
+    df_klines.insert(0, 'trading_pair_id', pair_state['trading_pair_id'])
+    pg.merge_import_candlestick_data(connection, df_klines)
+    pair_state['last_close_time'] = max(pair_state['last_close_time'] or 0, int(df_klines['close time'].max()))
+
+
+def run_daemon(pairs: List[Dict], client, db_params: Dict, settings: Optional[Dict] = None,
+               stop: Optional[threading.Event] = None) -> None:
+    """
+    Keeps the loader running and fetches every trading pair right after each of its candles closes.
 
-        except Exception as e:
-            logger.error(f"Error occurred while processing '{symbol}' with interval '{interval}'. ERROR: {e}")
+    The database connection, the loader objects and the resolved trading pair states stay warm for
+    the lifetime of the process. After an initial catch-up load, the next close boundary of every
+    pair is computed from its interval and the process sleeps until exactly then, fetching only
+    the newly closed candles.
+
+    Parameters
+    ----------
+    pairs : List[Dict]
+        List of trading pair configurations with each dictionary containing 'symbol',
+        'interval', and 'start_date' keys.
+    client : binance.Client
+        Binance client instance for API interaction.
+    db_params : Dict
+        Database connection parameters (the `postgres` section of `config.yml`).
+    settings : Dict, optional
+        The `loader` section of `config.yml`.
+    stop : threading.Event, optional
+        Stops the daemon when set. SIGTERM and SIGINT set it when the daemon runs in the main thread.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    - Closed candles are always upserted, so a candle stored while still open is finalised.
+    - A lost database connection is re-established on the next boundary.
+    - Pairs whose interval has no fixed length, such as '1M', are skipped with an error; they
+      are kept up to date when they are rolled up from a configured '1m' pair.
+    """
+    settings = settings or {}
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    bh = create_binance_loader(settings)
+    pg = PostgresOperations(logger, settings.get('copy_format', 'csv'), settings.get('write_mode', 'copy'))
+    connection = connect_to_database(db_params)
+
+    # Catch up on everything missed while the daemon was not running
+    process_trading_pairs(pairs, client, connection, settings)
+    pair_states = prepare_trading_pairs(pairs, client, connection, pg)
+    while pair_states is None and not stop.wait(60):
+        pair_states = prepare_trading_pairs(pairs, client, connection, pg)
+    if pair_states is None:
+        connection.close()
+        return
+    pg.on_committed = committed_candle_store(settings, pair_states)
+
+    scheduler = CandleCloseScheduler(int(settings.get('daemon_settle_seconds', 1) * 1000))
+    download_pairs, rollups = plan_trading_pairs(pairs, settings)
+    pairs_by_key = {(pair['symbol'], pair['interval']): pair for pair in download_pairs}
+    for key, pair in list(pairs_by_key.items()):
+        try:
+            scheduler.add(key, pair['interval'])
+        except ValueError as e:
+            # E.g., monthly candles have no fixed length, they can only be derived from a 1m pair
+            logger.error(f"Skipping '{key[0]}' with interval '{key[1]}' in daemon mode: {e}")
+            del pairs_by_key[key]
+    logger.info(f"Daemon started for {len(pairs_by_key)} trading pairs.")
+
+    while not stop.is_set():
+        for key, boundary in scheduler.wait_next(stop):
+            try:
+                if connection.closed:
+                    connection = connect_to_database(db_params)
+                since_ms = pair_states[key]['last_close_time']
+                fetch_closed_candles(pairs_by_key[key], pair_states[key], boundary, client, connection, bh, pg)
+                if key in rollups:
+                    rollup_trading_pair(key, since_ms, rollups[key], pair_states, connection, pg)
+            except Exception as e:
+                logger.error(f"Error occurred while updating '{key[0]}' with interval '{key[1]}'. ERROR: {e}")
+        metrics.write_textfile()
+
+    logger.info("Daemon stopped.")
+    connection.close()
+
+
+def run_stream(pairs: List[Dict], client, db_params: Dict, settings: Optional[Dict] = None,
+               stop: Optional[threading.Event] = None) -> None:
+    """
+    Keeps the loader running and ingests closed candles from the Binance kline WebSocket streams.
+
+    After an initial catch-up load, all trading pairs are subscribed over a few multiplexed
+    connections. Closed candles are collected into micro-batches and every batch is upserted with
+    a single COPY, no matter how many trading pairs it spans. Whenever a connection is
+    (re-)established, the candles that closed while not subscribed are fetched over REST.
+
+    Parameters
+    ----------
+    pairs : List[Dict]
+        List of trading pair configurations with each dictionary containing 'symbol',
+        'interval', and 'start_date' keys.
+    client : binance.Client
+        Binance client instance for API interaction.
+    db_params : Dict
+        Database connection parameters (the `postgres` section of `config.yml`).
+    settings : Dict, optional
+        The `loader` section of `config.yml`.
+    stop : threading.Event, optional
+        Stops streaming when set. SIGTERM and SIGINT set it when running in the main thread.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    - Batches are written by a single worker thread, so one database connection is sufficient.
+      A lost connection is re-established on the next batch, and the candles of a failed batch
+      are backfilled over REST.
+    - A candle may be written more than once (stream and backfill), the upsert makes this harmless.
+    """
+    settings = settings or {}
+    stop = stop or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    bh = create_binance_loader(settings)
+    pg = PostgresOperations(logger, settings.get('copy_format', 'csv'), settings.get('write_mode', 'copy'))
+    connection = connect_to_database(db_params)
+
+    # Catch up on the history first, the stream only delivers candles closing from now on
+    process_trading_pairs(pairs, client, connection, settings)
+    pair_states = prepare_trading_pairs(pairs, client, connection, pg)
+    while pair_states is None and not stop.wait(60):
+        pair_states = prepare_trading_pairs(pairs, client, connection, pg)
+    if pair_states is None:
+        connection.close()
+        return
+    pg.on_committed = committed_candle_store(settings, pair_states)
+
+    download_pairs, rollups = plan_trading_pairs(pairs, settings)
+
+    def get_connection():
+        nonlocal connection
+        if connection.closed:
+            connection = connect_to_database(db_params)
+        return connection
+
+    def write_batch(rows_by_pair: Dict[Tuple[str, str], List[List]]) -> None:
+        frames = []
+        for key, klines in rows_by_pair.items():
+            df_klines = bh.build_candlestick_dataframe(klines, *key)
+            df_klines.insert(0, 'trading_pair_id', pair_states[key]['trading_pair_id'])
+            frames.append(df_klines)
+
+        pg.merge_import_candlestick_data(get_connection(), pd.concat(frames, ignore_index=True))
+        for key, klines in rows_by_pair.items():
+            pair_state = pair_states[key]
+            pair_state['last_close_time'] = max(pair_state['last_close_time'] or 0, max(row[6] for row in klines))
+            if key in rollups:
+                rollup_trading_pair(key, min(row[0] for row in klines), rollups[key], pair_states,
+                                    get_connection(), pg)
+        metrics.write_textfile()
+
+    def backfill(key: Tuple[str, str], last_close_time: Optional[int]) -> None:
+        symbol, interval = key
+        step = interval_to_milliseconds(interval)
+        last_open_time = next_close_boundary(int(time.time() * 1000), interval) - 2 * step
+        if last_close_time is None:
+            # Nothing written from the stream yet, continue after the catch-up load
+            last_close_time = pair_states[key]['last_close_time']
+        if not last_close_time or last_close_time + 1 > last_open_time:
+            return
+
+        klines = bh.get_klines_window(client, symbol, interval, last_close_time + 1, last_open_time)
+        if klines:
+            logger.info(f"Backfilled {len(klines)} candles for '{symbol}' with interval '{interval}'.")
+            write_batch({key: klines})
+
+    ingestor = KlineStreamIngestor(
+        logger, [(pair['symbol'], pair['interval']) for pair in download_pairs], write_batch, backfill,
+        url=settings.get('stream_url', BINANCE_STREAM_URL),
+        streams_per_connection=settings.get('streams_per_connection', 200),
+        batch_size=settings.get('stream_batch_size', 1000),
+        flush_interval=settings.get('stream_flush_seconds', 1.0),
+    )
+
+    async def stream() -> None:
+        stream_stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        # The threading event is set from signal handlers, bridge it into the event loop
+        threading.Thread(target=lambda: (stop.wait(), loop.call_soon_threadsafe(stream_stop.set)),
+                         daemon=True).start()
+        await ingestor.run(stream_stop)
+
+    logger.info(f"Streaming {len(download_pairs)} trading pairs.")
+    asyncio.run(stream())
+    logger.info(f"Streaming stopped after {ingestor.reconnects} reconnects.")
+    connection.close()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load historical candlestick data from Binance into the database.")
+    parser.add_argument("--mode", choices=["load", "repair", "daemon", "stream"], default="load",
+                        help="'load' fetches new candles, 'repair' refetches gaps in the stored series, "
+                             "'daemon' keeps running and fetches every candle right after it closes, "
+                             "'stream' keeps running and receives closed candles via WebSocket.")
+    args = parser.parse_args()
+
     conf_path = Path(__file__).resolve().parent / "/app/config.yml"
     pairs_conf_path = Path(__file__).resolve().parent / "/app/trading_pairs.yml"
 
@@ -159,6 +913,23 @@ if __name__ == "__main__":
 
     pairs = load_config(pairs_conf_path)
 
-    conn = connect_to_database(config['postgres'])
-    process_trading_pairs(pairs['trading_pairs'], client=client, connection=conn)
-    conn.close()
+    loader_config = config.get('loader', {})
+    workers = loader_config.get('workers', 1)
+    metrics.start_metrics(loader_config.get('metrics_port'), loader_config.get('metrics_textfile'))
+
+    if args.mode == "stream":
+        run_stream(pairs['trading_pairs'], client, config['postgres'], loader_config)
+    elif args.mode == "daemon":
+        run_daemon(pairs['trading_pairs'], client, config['postgres'], loader_config)
+    elif args.mode == "repair":
+        conn = connect_to_database(config['postgres'])
+        repair_trading_pairs(pairs['trading_pairs'], client=client, connection=conn, settings=loader_config)
+        conn.close()
+    elif workers > 1 or loader_config.get('spool_path'):
+        rate_limiter = WeightRateLimiter(loader_config.get('max_weight_per_minute', 6000))
+        process_trading_pairs_concurrently(pairs['trading_pairs'], client, config['postgres'], workers, rate_limiter,
+                                           loader_config)
+    else:
+        conn = connect_to_database(config['postgres'])
+        process_trading_pairs(pairs['trading_pairs'], client=client, connection=conn, settings=loader_config)
+        conn.close()
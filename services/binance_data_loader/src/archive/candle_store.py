@@ -0,0 +1,309 @@
+"""
+Module for storing candlestick data in a memory-mappable, fixed-width binary file.
+
+This module provides the `CandleStore` class. A store file holds the candles of one trading pair
+and interval as a flat NumPy structured array behind a small fixed-size header:
+
+    header (64 bytes): magic, version, price scale, record count, interval, symbol
+    records:           open_time, close_time (int64 ms), open, high, low, close, volume,
+                       number_of_trades (float64 or scaled int64 prices)
+
+Readers open the file with `np.memmap`, so nothing is parsed on load and the load time does not
+grow with the length of the history. Records are ordered by open time, so a time range is located
+with a binary search and returned as a zero-copy view. Appends write the new records behind the
+last one and then bump the record count in the header, so they cost the same regardless of the
+file size and a reader never sees an appended record before it is complete. The only record that
+is rewritten in place is a repeated last candle (one that was still open when it was stored). It
+is removed from the count while it is rewritten, so stores opened or refreshed in the meantime end
+before it, but a reader that had already mapped it may see it half-written until it calls
+`refresh()`. Candles older than the last one, e.g., holes filled by the loader's gap repair or
+rebuilt rollup buckets, are merged by writing a new file and renaming it over the old one, so
+the store never keeps holes the database no longer has. Readers keep their old mapping until they
+`refresh()`.
+
+The module only depends on NumPy (and pandas for `to_dataframe`), so analysis code outside the
+loader can import it directly.
+
+Dependencies:
+    - numpy
+    - pandas
+
+Example:
+    Write candles in the loader and read one month in the analysis code:
+
+    ```python
+    from src.archive.candle_store import CandleStore
+
+    with CandleStore.create("LINKUSDT_1h.candles", "LINKUSDT", "1h", interval_ms=3_600_000) as store:
+        store.append_dataframe(df_klines)
+
+    with CandleStore.open("LINKUSDT_1h.candles") as store:
+        january = store.slice(1704067200000, 1706745599999)
+        closes = january["close"]  # numpy view, no copy
+    ```
+"""
+import os
+import struct
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import Optional, Union
+
+MAGIC = b"CANDLES\x00"
+VERSION = 1
+HEADER_SIZE = 64
+# magic, version, price scale (0 = float64 prices), record count, interval in ms, symbol
+_HEADER = struct.Struct("<8sHxxIqq24s")
+_COUNT_OFFSET = 16
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def record_dtype(price_scale: int = 0) -> np.dtype:
+    """
+    Returns the record layout of a store, with float64 prices or, if `price_scale` is set, int64
+    prices holding the value multiplied by `price_scale`.
+    """
+    price_type = "<i8" if price_scale else "<f8"
+    return np.dtype(
+        [("open_time", "<i8"), ("close_time", "<i8")]
+        + [(name, price_type) for name in PRICE_FIELDS]
+        + [("number_of_trades", "<i8")]
+    )
+
+
+class CandleStore:
+    def __init__(self, path: Union[str, Path], mode: str = "r"):
+        """
+        Initialize the CandleStore class. Use `CandleStore.open` or `CandleStore.create` instead.
+
+        Args:
+            path: Path of the store file.
+            mode: 'r' for read-only access, 'r+' to allow appends.
+        """
+        self.path = Path(path)
+        self.mode = mode
+        with open(self.path, "rb") as file:
+            magic, version, self.price_scale, _, self.interval_ms, symbol = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a candle store file (version {VERSION})")
+
+        self.symbol = symbol.rstrip(b"\x00").decode()
+        self.dtype = record_dtype(self.price_scale)
+        self._records: Optional[np.memmap] = None
+        self.refresh()
+
+    @classmethod
+    def open(cls, path: Union[str, Path], mode: str = "r") -> "CandleStore":
+        """
+        Opens an existing store file.
+        """
+        return cls(path, mode)
+
+    @classmethod
+    def create(cls, path: Union[str, Path], symbol: str, interval: str, interval_ms: int,
+               price_scale: int = 0) -> "CandleStore":
+        """
+        Opens a store file for appending, creating it with an empty record array if it does not exist.
+
+        Parameters
+        ----------
+        path : str or Path
+            Path of the store file.
+        symbol : str
+            Name of the trading pair, e.g., "BNBBTC".
+        interval : str
+            Candlestick interval, e.g., "1m". Only used in error messages.
+        interval_ms : int
+            Candlestick interval in milliseconds.
+        price_scale : int, optional
+            Store prices as int64 multiplied by this factor (e.g., 10**8) instead of float64.
+            Exact, but every price and volume times the factor must fit into an int64.
+
+        Returns
+        -------
+        CandleStore
+            The store, opened in 'r+' mode.
+        """
+        path = Path(path)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            with open(tmp_path, "wb") as file:
+                header = _HEADER.pack(MAGIC, VERSION, price_scale, 0, interval_ms, symbol.encode())
+                file.write(header.ljust(HEADER_SIZE, b"\x00"))
+            os.replace(tmp_path, path)
+
+        store = cls(path, "r+")
+        if store.symbol != symbol or store.interval_ms != interval_ms:
+            store.close()
+            raise ValueError(f"{path} holds '{store.symbol}' with interval {store.interval_ms}ms, "
+                             f"not '{symbol}' with interval '{interval}'")
+        return store
+
+    def refresh(self) -> None:
+        """
+        Re-reads the record count from the header and maps all committed records.
+        """
+        with open(self.path, "rb") as file:
+            file.seek(_COUNT_OFFSET)
+            count = struct.unpack("<q", file.read(8))[0]
+
+        if count == 0:
+            self._records = np.empty(0, dtype=self.dtype)
+        else:
+            self._records = np.memmap(self.path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+    @property
+    def records(self) -> np.ndarray:
+        """
+        All committed records as a read-only, memory-mapped structured array.
+        """
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def last_close_time(self) -> Optional[int]:
+        """
+        Returns the close time of the last record, or `None` if the store is empty.
+        """
+        return int(self._records["close_time"][-1]) if len(self._records) else None
+
+    def slice(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the records whose open time lies within [start_ms, end_ms] as a zero-copy view.
+
+        The bounds are located with a binary search over the sorted open times, so only the pages
+        of the returned records are read from disk.
+        """
+        open_times = self._records["open_time"]
+        start = 0 if start_ms is None else np.searchsorted(open_times, start_ms, side="left")
+        end = len(open_times) if end_ms is None else np.searchsorted(open_times, end_ms, side="right")
+        return self._records[start:end]
+
+    def prices(self, records: np.ndarray, field: str) -> np.ndarray:
+        """
+        Returns a price field of `records` as float64. This is a view for float64 stores and a
+        scaled copy for scaled int64 stores.
+        """
+        if self.price_scale:
+            return records[field] / self.price_scale
+        return records[field]
+
+    def to_dataframe(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> pd.DataFrame:
+        """
+        Returns the records of a time range as a DataFrame with the column names of the JSON files
+        ('open time', 'open', ..., 'close time', 'number of trades').
+        """
+        records = self.slice(start_ms, end_ms)
+        data = {"open time": records["open_time"]}
+        data.update({field: self.prices(records, field) for field in PRICE_FIELDS})
+        data["close time"] = records["close_time"]
+        data["number of trades"] = records["number_of_trades"]
+        return pd.DataFrame(data)
+
+    def append_dataframe(self, df_klines: pd.DataFrame) -> int:
+        """
+        Appends candlestick data and returns the number of records written.
+
+        A candle with the same open time as the last stored one replaces it, so a candle that was
+        still open when it was appended is finalised by the next append. The replaced record is
+        rewritten in place, readers that mapped it before should `refresh()` afterwards. Candles
+        older than the last stored one are merged into the stored records (replacing records with
+        the same open time) by rewriting the whole file, unless they are all stored unchanged.
+
+        Parameters
+        ----------
+        df_klines : pd.DataFrame
+            Candlestick data with the columns 'open time', 'open', 'high', 'low', 'close',
+            'volume', 'close time' and 'number of trades', ordered by open time. Prices may be
+            decimal strings, `Decimal` values or floats.
+
+        Returns
+        -------
+        int
+            Number of records written, including a replaced last record.
+        """
+        if self.mode != "r+":
+            raise ValueError(f"{self.path} is opened read-only")
+
+        if df_klines.empty:
+            return 0
+
+        new_records = np.empty(len(df_klines), dtype=self.dtype)
+        new_records["open_time"] = df_klines["open time"].to_numpy(dtype=np.int64)
+        new_records["close_time"] = df_klines["close time"].to_numpy(dtype=np.int64)
+        new_records["number_of_trades"] = df_klines["number of trades"].to_numpy(dtype=np.int64)
+        for field in PRICE_FIELDS:
+            values = np.asarray(df_klines[field].to_numpy(), dtype=np.float64)
+            new_records[field] = np.rint(values * self.price_scale) if self.price_scale else values
+
+        count = len(self._records)
+        last_open_time = int(self._records["open_time"][-1]) if count else None
+        older = new_records["open_time"] < last_open_time if count else np.zeros(len(new_records), dtype=bool)
+        if older.any():
+            # Candles that are already stored unchanged, e.g., a replayed batch, need no rewrite
+            positions = np.minimum(np.searchsorted(self._records["open_time"], new_records["open_time"][older]),
+                                   count - 1)
+            if not (self._records[positions] == new_records[older]).all():
+                self._rewrite(new_records)
+                return len(new_records)
+            new_records = new_records[~older]
+            if len(new_records) == 0:
+                return 0
+
+        # Overwrite the last record if it is repeated, otherwise write behind it
+        position = count - 1 if new_records["open_time"][0] == last_open_time else count
+        with open(self.path, "r+b") as file:
+            if position < count:
+                # Unpublish the record before rewriting it, so newly mapped readers never see it torn
+                file.seek(_COUNT_OFFSET)
+                file.write(struct.pack("<q", position))
+                file.flush()
+                os.fsync(file.fileno())
+            file.seek(HEADER_SIZE + position * self.dtype.itemsize)
+            file.write(new_records.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+            # Publishing the new count commits the records
+            file.seek(_COUNT_OFFSET)
+            file.write(struct.pack("<q", position + len(new_records)))
+
+        self.refresh()
+        return len(new_records)
+
+    def _rewrite(self, new_records: np.ndarray) -> None:
+        """
+        Merges records into the stored ones, the new record winning for a repeated open time,
+        and atomically replaces the file with the result.
+        """
+        combined = np.concatenate([new_records, np.asarray(self._records)])
+        # `np.unique` returns the first occurrence of every open time, i.e., the new record
+        _, first = np.unique(combined["open_time"], return_index=True)
+        merged = combined[first]
+
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        with open(self.path, "rb") as file:
+            header = bytearray(file.read(HEADER_SIZE))
+        header[_COUNT_OFFSET:_COUNT_OFFSET + 8] = struct.pack("<q", len(merged))
+        with open(tmp_path, "wb") as file:
+            file.write(header)
+            file.write(merged.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+        self.refresh()
+
+    def close(self) -> None:
+        """
+        Releases the memory map.
+        """
+        self._records = None
+
+    def __enter__(self) -> "CandleStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,270 @@
+"""
+Module for archiving candlestick data locally as partitioned, compressed Parquet files.
+
+This module provides the `ParquetCandleArchive` class, an append-only local store for candlestick
+(OHLCV) data. Candles are written with a fixed, typed schema (integer timestamps, `decimal128`
+prices and volumes) and ZSTD compression into a Hive-style directory layout:
+
+    <root>/symbol=BTCUSDT/interval=1m/month=2024-01/part-<first open time>-<last close time>.parquet
+
+Every append writes new part files only for the months it touches, so existing data is never
+rewritten; `compact` merges the parts of a finished month. The last close time of a series is
+stored in the footer of every part file and read from the newest part alone, without loading any
+candles. Range reads prune month directories and push the time filter down to the Parquet row
+group statistics.
+
+Dependencies:
+    - numpy
+    - pandas
+    - pathlib
+    - pyarrow
+
+Example:
+    Append fresh klines and read back January 2024:
+
+    ```python
+    from src.archive.parquet_archive import ParquetCandleArchive
+
+    archive = ParquetCandleArchive("archive")
+    archive.append("BNBBTC", "1h", klines)
+    last_close_time = archive.last_close_time("BNBBTC", "1h")
+    df = archive.read_range("BNBBTC", "1h", start_ms=1704067200000, end_ms=1706745599999,
+                            columns=["open time", "close"])
+    ```
+"""
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from pathlib import Path
+from typing import List, Optional, Union
+
+DECIMAL_TYPE = pa.decimal128(38, 8)
+
+# Binance kline fields without the trailing unused ('ignore') field
+CANDLE_SCHEMA = pa.schema([
+    ("open time", pa.int64()),
+    ("open", DECIMAL_TYPE),
+    ("high", DECIMAL_TYPE),
+    ("low", DECIMAL_TYPE),
+    ("close", DECIMAL_TYPE),
+    ("volume", DECIMAL_TYPE),
+    ("close time", pa.int64()),
+    ("quote asset volume", DECIMAL_TYPE),
+    ("number of trades", pa.int64()),
+    ("taker buy base asset volume", DECIMAL_TYPE),
+    ("taker buy quote asset volume", DECIMAL_TYPE),
+])
+
+LAST_CLOSE_TIME_KEY = b"last_close_time"
+MONTH_PARTITIONING = ds.partitioning(pa.schema([("month", pa.string())]), flavor="hive")
+
+
+def _month_of(open_time_ms: int) -> str:
+    return pd.Timestamp(open_time_ms, unit="ms", tz="UTC").strftime("%Y-%m")
+
+
+def _drop_duplicate_candles(table: pa.Table) -> pa.Table:
+    """
+    Sorts candles by open time, keeping only the last row of every open time in table order.
+
+    Parts overlap while `compact` publishes a merged file, or after it was interrupted before the
+    merged parts were removed.
+    """
+    if pc.count_distinct(table["open time"]).as_py() == table.num_rows:
+        return table.sort_by("open time")
+    rows = table.append_column("row", pa.array(np.arange(table.num_rows)))
+    last_rows = rows.group_by("open time", use_threads=False).aggregate([("row", "max")])
+    return table.take(last_rows["row_max"]).sort_by("open time")
+
+
+class ParquetCandleArchive:
+    def __init__(self, root: Union[str, Path], compression: str = "zstd"):
+        """
+        Initialize the ParquetCandleArchive class.
+
+        Args:
+            root: Directory of the archive, created on the first append.
+            compression: Parquet compression codec of new part files.
+        """
+        self.root = Path(root)
+        self.compression = compression
+
+    def series_path(self, symbol: str, interval: str) -> Path:
+        """
+        Returns the directory holding the month partitions of a trading pair.
+        """
+        return self.root / f"symbol={symbol}" / f"interval={interval}"
+
+    def append(self, symbol: str, interval: str, klines: List[List]) -> int:
+        """
+        Appends klines in the row layout of the Binance REST API and returns the number of new rows.
+
+        Parameters
+        ----------
+        symbol : str
+            Name of the trading pair, e.g., "BNBBTC".
+        interval : str
+            Candlestick interval, e.g., "1m" for 1 minute.
+        klines : List[List]
+            Kline rows as returned by Binance; fields beyond the schema are ignored.
+
+        Returns
+        -------
+        int
+            Number of candles written.
+        """
+        columns = list(zip(*klines)) if klines else [[] for _ in CANDLE_SCHEMA]
+        arrays = [pa.array(columns[i]).cast(field.type) for i, field in enumerate(CANDLE_SCHEMA)]
+        return self.append_table(symbol, interval, pa.Table.from_arrays(arrays, schema=CANDLE_SCHEMA))
+
+    def append_dataframe(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Appends a DataFrame that has the archive's columns (e.g., one loaded from the JSON files)
+        and returns the number of new rows.
+        """
+        table = pa.Table.from_pandas(df[CANDLE_SCHEMA.names].astype({
+            name: str for name in CANDLE_SCHEMA.names if CANDLE_SCHEMA.field(name).type == DECIMAL_TYPE
+        }), preserve_index=False)
+        return self.append_table(symbol, interval, table.cast(CANDLE_SCHEMA))
+
+    def append_table(self, symbol: str, interval: str, table: pa.Table) -> int:
+        """
+        Appends an Arrow table with the archive schema and returns the number of new rows.
+
+        Candles that do not start after the archived last close time are skipped, so repeating an
+        append is harmless. Every touched month receives one new part file, written to a temporary
+        name first and renamed, so readers never see partial files.
+        """
+        last_close_time = self.last_close_time(symbol, interval)
+        if last_close_time is not None:
+            table = table.filter(pc.greater(table["open time"], last_close_time))
+        if table.num_rows == 0:
+            return 0
+
+        table = table.sort_by("open time")
+        months = pc.strftime(pc.cast(table["open time"], pa.timestamp("ms", tz="UTC")), format="%Y-%m")
+        for month in pc.unique(months).to_pylist():
+            part = table.filter(pc.equal(months, month))
+            first_open_time = part["open time"][0].as_py()
+            part_close_time = pc.max(part["close time"]).as_py()
+
+            directory = self.series_path(symbol, interval) / f"month={month}"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"part-{first_open_time:013d}-{part_close_time:013d}.parquet"
+            tmp_path = directory / f".{path.name}.tmp"  # Hidden from dataset discovery
+
+            part = part.replace_schema_metadata({LAST_CLOSE_TIME_KEY: str(part_close_time).encode()})
+            pq.write_table(part, tmp_path, compression=self.compression)
+            os.replace(tmp_path, path)
+
+        return table.num_rows
+
+    def last_close_time(self, symbol: str, interval: str) -> Optional[int]:
+        """
+        Returns the last archived close time of a trading pair, or `None` if nothing is archived.
+
+        Only the footer of the newest part file is read, so the cost does not depend on the
+        amount of archived data.
+        """
+        newest = self._newest_part(symbol, interval)
+        if newest is None:
+            return None
+        metadata = pq.read_schema(newest).metadata or {}
+        return int(metadata[LAST_CLOSE_TIME_KEY])
+
+    def _newest_part(self, symbol: str, interval: str) -> Optional[Path]:
+        series_path = self.series_path(symbol, interval)
+        if not series_path.exists():
+            return None
+        # Zero-padded names sort chronologically; empty month directories are skipped
+        for month_dir in sorted(series_path.iterdir(), reverse=True):
+            parts = sorted(month_dir.glob("part-*.parquet"))
+            if parts:
+                return parts[-1]
+        return None
+
+    def read_range(self, symbol: str, interval: str, start_ms: Optional[int] = None,
+                   end_ms: Optional[int] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reads the archived candles whose open time lies within [start_ms, end_ms].
+
+        Parameters
+        ----------
+        symbol : str
+            Name of the trading pair, e.g., "BNBBTC".
+        interval : str
+            Candlestick interval, e.g., "1m" for 1 minute.
+        start_ms : int, optional
+            First open time in milliseconds (inclusive). Defaults to the start of the archive.
+        end_ms : int, optional
+            Last open time in milliseconds (inclusive). Defaults to the end of the archive.
+        columns : List[str], optional
+            Columns to read; all other columns are never decoded.
+
+        Returns
+        -------
+        pd.DataFrame
+            The candles ordered by open time. Decimal columns hold `decimal.Decimal` values.
+
+        Notes
+        -----
+        - Month directories outside the range are pruned from the directory names, and row groups
+          outside the range are skipped from their min/max statistics.
+        - A candle stored in overlapping part files, e.g., while a month is compacted, is returned once.
+        """
+        columns = columns or CANDLE_SCHEMA.names
+        series_path = self.series_path(symbol, interval)
+        if not series_path.exists():
+            return pd.DataFrame(columns=columns)
+
+        dataset = ds.dataset(series_path, schema=CANDLE_SCHEMA.append(pa.field("month", pa.string())),
+                             format="parquet", partitioning=MONTH_PARTITIONING)
+        expression = None
+        if start_ms is not None:
+            expression = (ds.field("month") >= _month_of(start_ms)) & (ds.field("open time") >= start_ms)
+        if end_ms is not None:
+            upper = (ds.field("month") <= _month_of(end_ms)) & (ds.field("open time") <= end_ms)
+            expression = upper if expression is None else expression & upper
+
+        read_columns = columns if "open time" in columns else columns + ["open time"]
+        table = _drop_duplicate_candles(dataset.to_table(columns=read_columns, filter=expression))
+        return table.select(columns).to_pandas()
+
+    def compact(self, symbol: str, interval: str, month: str) -> None:
+        """
+        Merges all part files of a month into a single file, e.g., once the month is complete.
+
+        Parameters
+        ----------
+        symbol : str
+            Name of the trading pair, e.g., "BNBBTC".
+        interval : str
+            Candlestick interval, e.g., "1m" for 1 minute.
+        month : str
+            Month partition in the format 'YYYY-MM'.
+        """
+        directory = self.series_path(symbol, interval) / f"month={month}"
+        parts = sorted(directory.glob("part-*.parquet"))
+        if len(parts) < 2:
+            return
+
+        # Parts of an interrupted compaction overlap with the merged file, later parts win
+        table = _drop_duplicate_candles(
+            pa.concat_tables(pq.read_table(part, schema=CANDLE_SCHEMA) for part in parts))
+        first_open_time = table["open time"][0].as_py()
+        last_close_time = pc.max(table["close time"]).as_py()
+        path = directory / f"part-{first_open_time:013d}-{last_close_time:013d}.parquet"
+        tmp_path = directory / f".{path.name}.tmp"
+
+        table = table.replace_schema_metadata({LAST_CLOSE_TIME_KEY: str(last_close_time).encode()})
+        pq.write_table(table, tmp_path, compression=self.compression)
+        # Publish the merged file before removing the parts, so no candle is ever missing
+        os.replace(tmp_path, path)
+        for part in parts:
+            if part != path:
+                part.unlink()
@@ -0,0 +1,306 @@
+"""
+Module for fetching klines over a pooled keep-alive HTTP transport with many requests in flight.
+
+`binance.Client` sends one blocking request at a time, so a backfill spends most of its time
+waiting for round trips. This module provides two classes:
+
+- `AsyncKlineClient`, an aiohttp client for `GET /api/v3/klines`. All requests share one
+  connection pool with keep-alive and DNS caching, ask for gzip-compressed responses and decode
+  them with ujson. Once the first candle of a range is known, the start time of every following
+  page can be computed, so `iter_klines` keeps `pipeline_depth` page requests in flight and
+  yields the pages in order. Requests are paced by a `WeightRateLimiter` and retried according
+  to a `RetryPolicy`, and errors are raised as the exceptions of python-binance.
+- `ThreadedKlineClient`, which runs an `AsyncKlineClient` on a background event loop, so the
+  synchronous `BinanceDataLoader` and its worker threads can share it.
+
+Dependencies:
+    - aiohttp
+    - python-binance
+    - ujson
+
+Example:
+    Fetch a year of 1m candles with eight pages in flight:
+
+    ```python
+    from src.data_download.async_kline_client import AsyncKlineClient
+
+    async with AsyncKlineClient(logger, pipeline_depth=8) as client:
+        async for page in client.iter_klines("BTCUSDT", "1m", start_ts, end_ts):
+            handle(page)
+    ```
+"""
+import asyncio
+import threading
+import time
+import aiohttp
+import ujson
+
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+from binance.helpers import interval_to_milliseconds
+from collections import deque
+from types import SimpleNamespace
+from typing import AsyncIterator, Coroutine, Iterator, List, Optional
+
+from src.data_download.rate_limiter import WeightRateLimiter, klines_request_weight
+from src.data_download.retry_policy import RetryPolicy, is_rate_limited, retry_after_seconds
+from src.helper import metrics
+
+BINANCE_API_URL = "https://api.binance.com"
+KLINES_ENDPOINT = "/api/v3/klines"
+
+
+class AsyncKlineClient:
+    # Maximum number of candlesticks Binance returns per request
+    klines_limit = 1000
+
+    def __init__(self, logger, base_url: str = BINANCE_API_URL, connections: int = 20, pipeline_depth: int = 8,
+                 timeout: float = 30.0, rate_limiter: Optional[WeightRateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None):
+        """
+        Initialize the AsyncKlineClient class. The connection pool is created by `open`.
+
+        Args:
+            logger: Logger instance for logging.
+            base_url: Scheme and host of the Binance REST API.
+            connections: Maximum number of pooled keep-alive connections.
+            pipeline_depth: Number of page requests kept in flight by `iter_klines`.
+            timeout: Total timeout of a single request in seconds.
+            rate_limiter: Limiter shared with all other clients fetching through the same IP.
+            retry_policy: Decides which failed requests are retried and how long to back off.
+        """
+        self.logger = logger
+        self.base_url = base_url.rstrip("/")
+        self.connections = connections
+        self.pipeline_depth = pipeline_depth
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or WeightRateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def open(self) -> None:
+        """
+        Creates the pooled HTTP session.
+        """
+        connector = aiohttp.TCPConnector(limit=self.connections, ttl_dns_cache=300, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"Accept-Encoding": "gzip, deflate"},
+            json_serialize=ujson.dumps,
+        )
+
+    async def close(self) -> None:
+        """
+        Closes the HTTP session and all pooled connections.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> "AsyncKlineClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _request(self, params: dict) -> List[List]:
+        symbol, interval = params["symbol"], params["interval"]
+        start = time.perf_counter()
+        try:
+            async with self.session.get(self.base_url + KLINES_ENDPOINT, params=params) as response:
+                body = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            metrics.observe_request(symbol, interval, "network", time.perf_counter() - start)
+            raise
+        metrics.observe_request(symbol, interval, str(response.status), time.perf_counter() - start)
+
+        if response.status >= 400:
+            text = body.decode(errors="replace")
+            error_response = SimpleNamespace(status_code=response.status, headers=response.headers, text=text)
+            raise BinanceAPIException(error_response, response.status, text)
+        self.rate_limiter.update_from_headers(response.headers)
+        with metrics.time_stage("json_decode", symbol, interval):
+            return ujson.loads(body)
+
+    async def get_klines(self, symbol: str, interval: str, start_ts: int, end_ts: Optional[int] = None,
+                         limit: Optional[int] = None) -> List[List]:
+        """
+        Fetches a single page of klines, paced by the rate limiter and retried on transient errors.
+
+        Parameters
+        ----------
+        symbol : str
+            Trading pair symbol (e.g., "BNBBTC").
+        interval : str
+            Candlestick interval (e.g., "1m" for 1 minute, "1h" for 1 hour).
+        start_ts : int
+            First open time in milliseconds.
+        end_ts : int, optional
+            Last open time in milliseconds (inclusive).
+        limit : int, optional
+            Maximum number of klines, defaults to `klines_limit`.
+
+        Returns
+        -------
+        List[List]
+            Klines as returned by the Binance API.
+
+        Raises
+        ------
+        BinanceAPIException
+            If Binance answered with an error status that is not retried or retries are exhausted.
+        BinanceRequestException
+            If the request failed on the network level and retries are exhausted.
+        """
+        limit = limit or self.klines_limit
+        params = {"symbol": symbol, "interval": interval, "limit": limit, "startTime": start_ts}
+        if end_ts is not None:
+            params["endTime"] = end_ts
+
+        attempt = 0
+        while True:
+            wait = self.rate_limiter.try_acquire(klines_request_weight(limit))
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self.rate_limiter.try_acquire(klines_request_weight(limit))
+
+            try:
+                return await self._request(params)
+            except BinanceAPIException as e:
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = BinanceRequestException(f"{type(e).__name__}: {e}")
+
+            delay = self.retry_policy.retry_delay(error, attempt)
+            if delay is None:
+                if is_rate_limited(error):
+                    # Keep the other workers from requesting before Binance lifts the limit or ban
+                    self.rate_limiter.pause(retry_after_seconds(error) or 0)
+                raise error
+            attempt += 1
+            self.logger.warning(f"Request for '{symbol}' with interval '{interval}' at {start_ts} failed, "
+                                f"retry {attempt}/{self.retry_policy.max_retries} in {delay:.1f}s: {error}")
+            if is_rate_limited(error):
+                self.rate_limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+
+    async def iter_klines(self, symbol: str, interval: str, start_ts: int,
+                          end_ts: Optional[int] = None) -> AsyncIterator[List[List]]:
+        """
+        Yields all non-empty pages of klines with an open time in `[start_ts, end_ts]`, in order.
+
+        The first candle at or after `start_ts` is looked up with a single request, which also
+        skips the time before the symbol was listed. The range is then cut into pages of
+        `klines_limit` candles, and up to `pipeline_depth` of them are requested at the same time.
+        Intervals without a fixed length (1M) are fetched with a sequential cursor.
+
+        Parameters
+        ----------
+        symbol : str
+            Trading pair symbol (e.g., "BNBBTC").
+        interval : str
+            Candlestick interval (e.g., "1m" for 1 minute, "1h" for 1 hour).
+        start_ts : int
+            Start timestamp in milliseconds from which data should be fetched.
+        end_ts : int, optional
+            Last open time in milliseconds. Defaults to the current time.
+
+        Yields
+        ------
+        List[List]
+            Pages of klines as returned by the Binance API.
+        """
+        step = interval_to_milliseconds(interval)
+        if end_ts is None:
+            end_ts = int(time.time() * 1000)
+
+        if not step:
+            while start_ts <= end_ts:
+                page = await self.get_klines(symbol, interval, start_ts, end_ts)
+                if not page:
+                    return
+                yield page
+                if len(page) < self.klines_limit:
+                    return
+                start_ts = page[-1][6] + 1
+            return
+
+        first_kline = await self.get_klines(symbol, interval, start_ts, end_ts, limit=1)
+        if not first_kline:
+            return
+
+        page_span = self.klines_limit * step
+        page_starts = iter(range(first_kline[0][0], end_ts + 1, page_span))
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < self.pipeline_depth:
+                    page_start = next(page_starts, None)
+                    if page_start is None:
+                        break
+                    page_end = min(page_start + page_span - step, end_ts)
+                    pending.append(asyncio.ensure_future(self.get_klines(symbol, interval, page_start, page_end)))
+                if not pending:
+                    return
+
+                page = await pending.popleft()
+                if page:
+                    yield page
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class ThreadedKlineClient:
+    def __init__(self, client: AsyncKlineClient):
+        """
+        Initialize the ThreadedKlineClient class and start the event loop thread of `client`.
+
+        Args:
+            client: Client run on the background event loop. All threads calling this wrapper
+                share its connection pool.
+        """
+        self.client = client
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._call(client.open())
+
+    def _call(self, coroutine: Coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def get_klines(self, symbol: str, interval: str, start_ts: int, end_ts: Optional[int] = None,
+                   limit: Optional[int] = None) -> List[List]:
+        """
+        Blocking version of `AsyncKlineClient.get_klines`.
+        """
+        return self._call(self.client.get_klines(symbol, interval, start_ts, end_ts, limit))
+
+    def iter_klines(self, symbol: str, interval: str, start_ts: int,
+                    end_ts: Optional[int] = None) -> Iterator[List[List]]:
+        """
+        Blocking version of `AsyncKlineClient.iter_klines`. The next pages are fetched in the
+        background while the caller processes the current one.
+        """
+        pages = self.client.iter_klines(symbol, interval, start_ts, end_ts)
+        try:
+            while True:
+                try:
+                    yield self._call(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._call(pages.aclose())
+
+    def close(self) -> None:
+        """
+        Closes the client and stops the event loop thread.
+        """
+        if self._loop.is_closed():
+            return
+        self._call(self.client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -8,7 +8,7 @@ and to allow appending data incrementally.
 
 Dependencies:
     - python-binance
-    - time
+    - pandas
     - typing
 
 Example:
@@ -32,13 +32,101 @@ import pandas as pd
 
 from binance.helpers import interval_to_milliseconds
 from binance import Client
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from typing import List
+from itertools import islice
+from typing import Callable, Iterator, List, Optional
+
+from src.data_download.async_kline_client import ThreadedKlineClient
+from src.data_download.rate_limiter import WeightRateLimiter, klines_request_weight
+from src.data_download.retry_policy import RetryPolicy, is_rate_limited, retry_after_seconds
+from src.helper import metrics
+
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# Plain decimal literals that fit into the NUMERIC(18, 8) columns of the candlesticks table
+NUMERIC_18_8_PATTERN = r"-?\d{1,10}(?:\.\d{1,8})?"
+
+NUMERIC_MODES = ("decimal", "passthrough")
 
 
 class BinanceDataLoader:
-    def __init__(self, logger):
+    # Maximum number of candlesticks requested per API call
+    klines_limit = 500
+
+    def __init__(self, logger, rate_limiter: Optional[WeightRateLimiter] = None, numeric_mode: str = "decimal",
+                 retry_policy: Optional[RetryPolicy] = None, kline_client: Optional[ThreadedKlineClient] = None):
+        """
+        Initialize the BinanceDataLoader class.
+
+        Args:
+            logger: Logger instance for logging.
+            rate_limiter: Limiter shared by all loaders fetching through the same IP. A private
+                limiter with Binance's default weight budget is created if none is given.
+            numeric_mode: How price and volume strings are prepared for the database. "decimal"
+                converts every cell to `decimal.Decimal`; "passthrough" validates the strings
+                Binance returns with a vectorized pattern match and hands them to COPY unchanged.
+            retry_policy: Decides which failed requests are retried and how long to back off.
+                Defaults to five retries with exponential backoff.
+            kline_client: If given, klines are fetched with this pooled aiohttp client, with
+                several pages in flight per trading pair, instead of the `binance.Client` passed
+                to the methods. It should share `rate_limiter` and `retry_policy`.
+        """
+        if numeric_mode not in NUMERIC_MODES:
+            raise ValueError(f"Invalid numeric mode '{numeric_mode}', expected one of {NUMERIC_MODES}.")
+
         self.logger = logger
+        self.rate_limiter = rate_limiter or WeightRateLimiter()
+        self.numeric_mode = numeric_mode
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.kline_client = kline_client
+
+    def _fetch_page(self, client: Client, symbol: str, interval: str, start_ts: int,
+                    end_ts: Optional[int] = None, limit: Optional[int] = None) -> List[List]:
+        """
+        Fetches a single page of klines, paced by the rate limiter.
+
+        Rate limits (429/418), server errors and network failures are retried according to
+        `self.retry_policy`. After a rate limit the shared limiter is paused, so all workers back off.
+        """
+        limit = limit or self.klines_limit
+        if self.kline_client is not None:
+            return self.kline_client.get_klines(symbol, interval, start_ts, end_ts, limit)
+
+        params = {"symbol": symbol, "interval": interval, "limit": limit, "startTime": start_ts}
+        if end_ts is not None:
+            params["endTime"] = end_ts
+
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(klines_request_weight(limit))
+            start = time.perf_counter()
+            try:
+                # python-binance decodes the JSON body inside the call, it is part of the request time
+                page = client.get_klines(**params)
+            except Exception as e:
+                metrics.observe_request(symbol, interval, str(getattr(e, "status_code", "network")),
+                                        time.perf_counter() - start)
+                delay = self.retry_policy.retry_delay(e, attempt)
+                if delay is None:
+                    if is_rate_limited(e):
+                        # Keep the other workers from requesting before Binance lifts the limit or ban
+                        self.rate_limiter.pause(retry_after_seconds(e) or 0)
+                    raise
+                attempt += 1
+                self.logger.warning(f"Request for '{symbol}' with interval '{interval}' at {start_ts} failed, "
+                                    f"retry {attempt}/{self.retry_policy.max_retries} in {delay:.1f}s: {e}")
+                if is_rate_limited(e):
+                    self.rate_limiter.pause(delay)
+                else:
+                    time.sleep(delay)
+                continue
+
+            metrics.observe_request(symbol, interval, "200", time.perf_counter() - start)
+            self.rate_limiter.update_from_headers(getattr(client.response, "headers", None))
+            return page
 
     def get_klines(self, client: Client, symbol: str, interval: str, start_ts: int) -> List[List]:
         """
@@ -70,7 +158,8 @@ class BinanceDataLoader:
         - The function makes repeated API calls to retrieve up to 500 candlesticks per call.
         - If the symbol was not yet listed on Binance at `start_ts`, the timestamp is automatically
           incremented until valid data is retrieved.
-        - The function sleeps for 1 second after every 3 API calls to avoid hitting Binance API limits.
+        - Every call is paced by `self.rate_limiter`, which is re-synchronised with the
+          `X-MBX-USED-WEIGHT-1M` header Binance returns after each request.
 
         Raises
         ------
@@ -95,32 +184,44 @@ class BinanceDataLoader:
 
         # Initialize list to store output data
         output_data = []
+        for page in self.iter_klines(client, symbol, interval, start_ts):
+            output_data += page
+
+        return output_data
+
+    def iter_klines(self, client: Client, symbol: str, interval: str, start_ts: int) -> Iterator[List[List]]:
+        """
+        Generator version of `get_klines` that yields every non-empty page as soon as it has been
+        fetched, so callers can process the history without holding it in memory.
+
+        With a `kline_client`, the following pages are already requested while the caller
+        processes the current one.
+        """
+        if self.kline_client is not None:
+            yield from self.kline_client.iter_klines(symbol, interval, start_ts)
+            return
 
         # Set maximum limit per API call
-        limit = 500
+        limit = self.klines_limit
 
         # Convert interval to milliseconds
         timeframe = interval_to_milliseconds(interval)
 
-        idx = 0
         # Flag to handle cases where the start date is before the symbol was listed
         symbol_existed = False
         while True:
             # Fetch klines starting from the specified timestamp
-            temp_data = client.get_klines(
-                symbol=symbol,
-                interval=interval,
-                limit=limit,
-                startTime=start_ts
-            )
+            temp_data = self._fetch_page(client, symbol, interval, start_ts, limit=limit)
 
             # Check if the symbol is available on Binance
             if not symbol_existed and len(temp_data):
                 symbol_existed = True
 
             if symbol_existed:
-                # Append data to output list
-                output_data += temp_data
+                # An empty page after a full one means the history ends exactly at a page boundary
+                if not temp_data:
+                    break
+                yield temp_data
 
                 # Update start timestamp to the last entry's timestamp plus the interval
                 start_ts = temp_data[-1][0] + timeframe
@@ -128,18 +229,140 @@ class BinanceDataLoader:
                 # If symbol is not available yet, increment start timestamp
                 start_ts += timeframe
 
-            idx += 1
             # Exit loop if fewer than `limit` entries were retrieved, indicating the end of available data
             if len(temp_data) < limit:
                 break
 
-            # Sleep for 1 second after every 3 API calls to respect rate limits
-            if idx % 3 == 0:
-                time.sleep(1)
+    def get_klines_window(self, client: Client, symbol: str, interval: str, start_ts: int,
+                          end_ts: int) -> List[List]:
+        """
+        Fetches all klines whose open time lies within `[start_ts, end_ts]`.
+
+        Parameters
+        ----------
+        client : binance.Client
+            Binance API Client instance used for making API calls.
+        symbol : str
+            Trading pair symbol (e.g., "BNBBTC").
+        interval : str
+            Candlestick interval (e.g., "1m" for 1 minute, "1h" for 1 hour).
+        start_ts : int
+            First open time of the window in milliseconds.
+        end_ts : int
+            Last open time of the window in milliseconds (inclusive).
+
+        Returns
+        -------
+        List[List]
+            Klines of the window ordered by open time.
+        """
+        output_data = []
+        timeframe = interval_to_milliseconds(interval)
+
+        while start_ts <= end_ts:
+            temp_data = self._fetch_page(client, symbol, interval, start_ts, end_ts)
+            output_data += temp_data
+
+            if len(temp_data) < self.klines_limit:
+                break
+            start_ts = temp_data[-1][0] + timeframe
+
+        return output_data
+
+    def get_klines_sharded(self, client: Client, symbol: str, interval: str, start_ts: int,
+                           end_ts: Optional[int] = None, workers: int = 4,
+                           pages_per_window: int = 20) -> List[List]:
+        """
+        Fetches historical klines by splitting the time range into independent windows that are
+        downloaded concurrently.
+
+        Unlike `get_klines`, where each page's `startTime` depends on the previous page, the range
+        `[start_ts, end_ts]` is known up front and the candlestick step is fixed, so it can be cut
+        into windows of `pages_per_window` full pages. The windows are fetched by a thread pool,
+        paced by the shared rate limiter, and merged back in order.
+
+        Parameters
+        ----------
+        client : binance.Client
+            Binance API Client instance used for making API calls.
+        symbol : str
+            Trading pair symbol (e.g., "BNBBTC").
+        interval : str
+            Candlestick interval (e.g., "1m" for 1 minute, "1h" for 1 hour).
+        start_ts : int
+            Start timestamp in milliseconds from which data should be fetched.
+        end_ts : int, optional
+            End timestamp in milliseconds. Defaults to the current time.
+        workers : int
+            Number of windows fetched at the same time.
+        pages_per_window : int
+            Number of full pages (`klines_limit` candlesticks each) per window.
+
+        Returns
+        -------
+        List[List]
+            Klines ordered by open time, without duplicates.
+
+        Notes
+        -----
+        - The first available candlestick at or after `start_ts` is looked up with a single
+          request, so no windows are wasted on the time before the symbol was listed.
+        """
+        output_data = []
+        for window_data in self.iter_klines_sharded(client, symbol, interval, start_ts, end_ts, workers,
+                                                    pages_per_window):
+            output_data += window_data
 
         return output_data
 
-    def load_candlestick_data(self, client: Client, symbol: str, interval: str, start_ts: int) -> pd.DataFrame:
+    def iter_klines_sharded(self, client: Client, symbol: str, interval: str, start_ts: int,
+                            end_ts: Optional[int] = None, workers: int = 4,
+                            pages_per_window: int = 20) -> Iterator[List[List]]:
+        """
+        Generator version of `get_klines_sharded` that yields the windows in order.
+
+        At most `workers` windows are in flight or waiting to be consumed at any time, so memory
+        stays bounded by the window size no matter how long the history is.
+        """
+        timeframe = interval_to_milliseconds(interval)
+        if end_ts is None:
+            end_ts = int(time.time() * 1000)
+
+        first_kline = self._fetch_page(client, symbol, interval, start_ts, limit=1)
+        if not first_kline:
+            return
+        start_ts = max(start_ts, first_kline[0][0])
+
+        window_size = pages_per_window * self.klines_limit * timeframe
+        windows = [
+            (window_start, min(window_start + window_size - timeframe, end_ts))
+            for window_start in range(start_ts, end_ts + 1, window_size)
+        ]
+        self.logger.info(
+            f"Backfilling '{symbol}' with interval '{interval}' in {len(windows)} windows using {workers} workers.")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            windows = iter(windows)
+            last_open_time = None
+            while True:
+                # Keep the pool busy without fetching further ahead than `workers` windows
+                for window in islice(windows, workers - len(pending)):
+                    pending.append(executor.submit(self.get_klines_window, client, symbol, interval, *window))
+                if not pending:
+                    break
+
+                # Windows are consumed in order, drop anything overlapping an earlier window
+                window_data = [
+                    kline for kline in pending.popleft().result()
+                    if last_open_time is None or kline[0] > last_open_time
+                ]
+                if window_data:
+                    last_open_time = window_data[-1][0]
+                    yield window_data
+
+    def load_candlestick_data(self, client: Client, symbol: str, interval: str, start_ts: int,
+                              backfill_workers: int = 1) -> pd.DataFrame:
         """
         Loads candlestick data from Binance starting at a specific timestamp.
 
@@ -153,6 +376,9 @@ class BinanceDataLoader:
             Candlestick interval, e.g., "1m" for 1 minute.
         start_ts : int
             Start timestamp in milliseconds for fetching candlestick data.
+        backfill_workers : int
+            If greater than 1, the range is fetched with `get_klines_sharded` using this many
+            concurrent windows instead of a sequential cursor walk.
 
         Returns
         -------
@@ -164,30 +390,141 @@ class BinanceDataLoader:
             f"Loading candlestick data from BINANCE for '{symbol}' with interval '{interval}' starting from {start_ts}.")
 
         # Fetch klines from Binance
-        klines = self.get_klines(client, symbol, interval, start_ts)
+        if backfill_workers > 1:
+            klines = self.get_klines_sharded(client, symbol, interval, start_ts, workers=backfill_workers)
+        else:
+            klines = self.get_klines(client, symbol, interval, start_ts)
         self.logger.info(f"Successfully loaded {len(klines)} candlestick records for '{symbol}'.")
 
+        return self.build_candlestick_dataframe(klines, symbol, interval)
+
+    def iter_candlestick_batches(self, client: Client, symbol: str, interval: str, start_ts: int,
+                                 flush_size: int = 50_000, backfill_workers: int = 1,
+                                 cancelled: Optional[Callable[[], bool]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams candlestick data from Binance as DataFrames of at most `flush_size` rows.
+
+        This is the bounded-memory counterpart of `load_candlestick_data`: pages are converted and
+        handed to the caller as soon as `flush_size` rows have been collected, so only one batch is
+        held in memory at a time. Since the generator is pulled by the consumer, no further pages
+        are fetched while a batch is being written.
+
+        Parameters
+        ----------
+        client : binance.Client
+            Binance client instance for API interaction.
+        symbol : str
+            Name of the trading pair, e.g., "BNBBTC".
+        interval : str
+            Candlestick interval, e.g., "1m" for 1 minute.
+        start_ts : int
+            Start timestamp in milliseconds for fetching candlestick data.
+        flush_size : int
+            Number of rows collected before a batch is yielded.
+        backfill_workers : int
+            If greater than 1, the range is fetched with `iter_klines_sharded` using this many
+            concurrent windows instead of a sequential cursor walk.
+        cancelled : Callable[[], bool], optional
+            Checked after every page; once it returns True, no further pages are fetched, e.g.,
+            because the writer has given up on the pair.
+
+        Yields
+        ------
+        pd.DataFrame
+            Batches with the same columns as returned by `load_candlestick_data`.
+        """
+        self.logger.info(
+            f"Streaming candlestick data from BINANCE for '{symbol}' with interval '{interval}' starting from {start_ts}.")
+
+        if backfill_workers > 1:
+            pages = self.iter_klines_sharded(client, symbol, interval, start_ts, workers=backfill_workers)
+        else:
+            pages = self.iter_klines(client, symbol, interval, start_ts)
+
+        buffer = []
+        for page in pages:
+            if cancelled is not None and cancelled():
+                self.logger.warning(f"Stopped fetching '{symbol}' with interval '{interval}', it has been cancelled.")
+                return
+            buffer += page
+            while len(buffer) >= flush_size:
+                yield self.build_candlestick_dataframe(buffer[:flush_size], symbol, interval)
+                buffer = buffer[flush_size:]
+
+        if buffer:
+            yield self.build_candlestick_dataframe(buffer, symbol, interval)
+
+    def build_candlestick_dataframe(self, klines: List[List], symbol: str = "", interval: str = "") -> pd.DataFrame:
+        """
+        Converts raw Binance klines into the DataFrame layout used for database imports.
+
+        Parameters
+        ----------
+        klines : List[List]
+            Klines as returned by the Binance API.
+        symbol : str, optional
+            Trading pair symbol the klines belong to, used as metrics label.
+        interval : str, optional
+            Candlestick interval the klines belong to, used as metrics label.
+
+        Returns
+        -------
+        pd.DataFrame
+            A DataFrame containing the candlestick data with the following columns:
+            ['timestamp', 'open time', 'open', 'high', 'low', 'close', 'volume', 'close time', 'number of trades'].
+        """
         # Convert klines to DataFrame
         columns = [
             'open time', 'open', 'high', 'low', 'close', 'volume',
             'close time', 'quote asset volume', 'number of trades',
             'taker buy base asset volume', 'taker buy quote asset volume', "delete"
         ]
-        df = pd.DataFrame(klines, columns=columns)
+        with metrics.time_stage("dataframe_build", symbol, interval):
+            df = pd.DataFrame(klines, columns=columns)
 
-        # Add 'timestamp' in UTC datetime format
-        df["timestamp"] = pd.to_datetime(df["open time"], unit="ms").dt.tz_localize("UTC")
-        df.insert(0, 'timestamp', df.pop('timestamp'))  # Move 'timestamp' to the first column
+            # Add 'timestamp' in UTC datetime format
+            df["timestamp"] = pd.to_datetime(df["open time"], unit="ms").dt.tz_localize("UTC")
+            df.insert(0, 'timestamp', df.pop('timestamp'))  # Move 'timestamp' to the first column
 
-        # Remove unnecessary columns
-        df.drop(['quote asset volume', 'taker buy base asset volume', 'taker buy quote asset volume', 'delete'],
-                axis=1, inplace=True)
+            # Remove unnecessary columns
+            df.drop(['quote asset volume', 'taker buy base asset volume', 'taker buy quote asset volume', 'delete'],
+                    axis=1, inplace=True)
 
-        # Ensure correct data types for financial precision
-        df["open"] = df["open"].apply(Decimal)
-        df["high"] = df["high"].apply(Decimal)
-        df["low"] = df["low"].apply(Decimal)
-        df["close"] = df["close"].apply(Decimal)
-        df["volume"] = df["volume"].apply(Decimal)
+        with metrics.time_stage("numeric_conversion", symbol, interval):
+            if self.numeric_mode == "passthrough":
+                # Binance already sends exact decimal strings, COPY can parse them as they are
+                self.validate_numeric_columns(df)
+            else:
+                # Ensure correct data types for financial precision
+                df["open"] = df["open"].apply(Decimal)
+                df["high"] = df["high"].apply(Decimal)
+                df["low"] = df["low"].apply(Decimal)
+                df["close"] = df["close"].apply(Decimal)
+                df["volume"] = df["volume"].apply(Decimal)
 
         return df
+
+    @staticmethod
+    def validate_numeric_columns(df: pd.DataFrame) -> None:
+        """
+        Checks that all price and volume values are decimal strings fitting into NUMERIC(18, 8).
+
+        The check is a single vectorized pattern match per column, so the values never have to be
+        parsed into Python objects.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Candlestick DataFrame with the price and volume columns still holding strings.
+
+        Raises
+        ------
+        ValueError
+            If a value is not a string, is not a plain decimal literal, has more than 10 integer
+            digits or more than 8 fractional digits.
+        """
+        for column in PRICE_COLUMNS:
+            valid = df[column].str.fullmatch(NUMERIC_18_8_PATTERN).fillna(False).astype(bool)
+            if not valid.all():
+                invalid_value = df[column][~valid].iloc[0]
+                raise ValueError(f"Value {invalid_value!r} in column '{column}' does not fit NUMERIC(18, 8).")
@@ -0,0 +1,185 @@
+"""
+Local fake of the Binance REST endpoints used by the loader, for offline testing and benchmarks.
+
+This module provides the `FakeBinanceServer` class, an aiohttp web server that answers
+`GET /api/v3/klines`, `GET /api/v3/ping` and `GET /sapi/v1/system/status` in Binance's format.
+Recorded klines can be served for selected pairs with `add_series`, e.g., from a kline JSON file.
+All other klines are synthetic but deterministic: every symbol is listed at `listing_time` and has
+one candle per interval up to the current time. Either way, loaders see the same pagination,
+listing-date and end-of-history behaviour as against the real API. The server reports the
+consumed request weight in the `X-MBX-USED-WEIGHT-1M` header, compresses responses for clients
+that accept gzip and can add a fixed latency to every response to model the round trip to Binance.
+
+Dependencies:
+    - aiohttp
+    - python-binance
+    - ujson
+
+Example:
+    Run a server with 20 ms latency:
+
+    ```bash
+    python -m src.data_download.fake_binance_server --port 8766 --latency 0.02
+    ```
+
+    and point a `binance.Client` at it with
+    `client.API_URL = "http://localhost:8766/api"` and `client.MARGIN_API_URL = "http://localhost:8766/sapi"`.
+"""
+import argparse
+import asyncio
+import bisect
+import threading
+import time
+import ujson
+
+from aiohttp import web
+from binance.helpers import interval_to_milliseconds
+from typing import Dict, List, Optional, Tuple
+
+from src.data_download.rate_limiter import USED_WEIGHT_HEADER, klines_request_weight
+
+# First candle open time of every symbol (2020-01-01 00:00:00 UTC)
+LISTING_TIME_MS = 1_577_836_800_000
+
+
+class FakeBinanceServer:
+    def __init__(self, host: str = "localhost", port: int = 8766, listing_time: int = LISTING_TIME_MS,
+                 latency: float = 0.0):
+        """
+        Initialize the FakeBinanceServer class.
+
+        Args:
+            host: Interface to listen on.
+            port: Port to listen on.
+            listing_time: Open time of the first candle of every symbol in milliseconds.
+            latency: Seconds every response is delayed by.
+        """
+        self.host = host
+        self.port = port
+        self.listing_time = listing_time
+        self.latency = latency
+        self.requests = 0
+        self.klines_sent = 0
+        self._weight_minute = 0
+        self._used_weight = 0
+        self._series: Dict[Tuple[str, str], List[List]] = {}
+        self._series_open_times: Dict[Tuple[str, str], List[int]] = {}
+
+    def add_series(self, symbol: str, interval: str, klines: List[List]) -> None:
+        """
+        Serves recorded klines, ordered by open time, for a pair instead of synthetic ones.
+        """
+        self._series[(symbol, interval)] = klines
+        self._series_open_times[(symbol, interval)] = [kline[0] for kline in klines]
+
+    @staticmethod
+    def kline(open_time: int, step: int) -> List:
+        """
+        Returns the synthetic kline opening at `open_time`.
+        """
+        price = 100 + (open_time // step) % 1000 / 100
+        return [
+            open_time, f"{price:.8f}", f"{price + 1:.8f}", f"{price - 1:.8f}", f"{price + 0.5:.8f}",
+            f"{(open_time // step) % 997:.8f}", open_time + step - 1, "0.00000000",
+            (open_time // step) % 500, "0.00000000", "0.00000000", "0",
+        ]
+
+    def _use_weight(self, weight: int) -> int:
+        minute = int(time.time() // 60)
+        if minute != self._weight_minute:
+            self._weight_minute, self._used_weight = minute, 0
+        self._used_weight += weight
+        return self._used_weight
+
+    def _response(self, request: web.Request, body, weight: int) -> web.Response:
+        self.requests += 1
+        response = web.Response(body=ujson.dumps(body), content_type="application/json")
+        response.headers[USED_WEIGHT_HEADER] = str(self._use_weight(weight))
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            response.enable_compression()
+        return response
+
+    async def _klines(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        query = request.query
+        step = interval_to_milliseconds(query["interval"])
+        limit = min(int(query.get("limit", 500)), 1000)
+        now = int(time.time() * 1000)
+        end_time = min(int(query.get("endTime", now)), now)
+
+        key = (query["symbol"], query["interval"])
+        if key in self._series:
+            open_times = self._series_open_times[key]
+            first = bisect.bisect_left(open_times, int(query.get("startTime", 0)))
+            last = min(bisect.bisect_right(open_times, end_time), first + limit)
+            klines = self._series[key][first:last]
+        else:
+            start_time = max(int(query.get("startTime", self.listing_time)), self.listing_time)
+            # Align to the next candle open time at or after startTime
+            start_time = self.listing_time + -(-(start_time - self.listing_time) // step) * step
+            klines = [self.kline(open_time, step) for open_time in range(start_time, end_time + 1, step)[:limit]]
+        self.klines_sent += len(klines)
+        return self._response(request, klines, klines_request_weight(limit))
+
+    async def _ping(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        return self._response(request, {}, 1)
+
+    async def _system_status(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+        return self._response(request, {"status": 0, "msg": "normal"}, 1)
+
+    def application(self) -> web.Application:
+        """
+        Returns the aiohttp application serving the fake endpoints.
+        """
+        app = web.Application()
+        app.router.add_get("/api/v3/klines", self._klines)
+        app.router.add_get("/api/v3/ping", self._ping)
+        app.router.add_get("/sapi/v1/system/status", self._system_status)
+        return app
+
+    async def serve_forever(self, stop: Optional[asyncio.Event] = None) -> None:
+        """
+        Serves until `stop` is set, or forever if no event is given.
+        """
+        stop = stop or asyncio.Event()
+        runner = web.AppRunner(self.application(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, self.host, self.port).start()
+        try:
+            await stop.wait()
+        finally:
+            await runner.cleanup()
+
+    def start_in_thread(self) -> threading.Event:
+        """
+        Serves on a background event loop thread, so synchronous clients in the same process can
+        use the server. Returns the event that stops it.
+        """
+        loop = asyncio.new_event_loop()
+        stop = asyncio.Event()
+        started = threading.Event()
+
+        async def serve() -> None:
+            loop.call_soon(started.set)
+            await self.serve_forever(stop)
+
+        threading.Thread(target=loop.run_until_complete, args=(serve(),), daemon=True).start()
+        started.wait()
+        time.sleep(0.1)
+
+        stopped = threading.Event()
+        threading.Thread(target=lambda: (stopped.wait(), loop.call_soon_threadsafe(stop.set)), daemon=True).start()
+        return stopped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local fake of the Binance REST endpoints.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeBinanceServer(args.host, args.port, latency=args.latency)
+    asyncio.run(server.serve_forever())
@@ -0,0 +1,146 @@
+"""
+Module for reading the public Binance kline archives (data.binance.vision) from local disk.
+
+Binance publishes the complete kline history of every spot symbol as monthly and daily zip files,
+e.g., `BTCUSDT-1m-2024-01.zip` or `BTCUSDT-1m-2024-02-15.zip`, each holding one CSV file in the
+row layout of the REST klines endpoint. This module provides:
+
+- `find_kline_archives`, which scans a directory for such files and orders them per trading pair,
+- `read_kline_archive`, which parses one file into the DataFrame layout of
+  `BinanceDataLoader.build_candlestick_dataframe` (prices are kept as validated decimal strings).
+  It is a plain top-level function, so it can run in a process pool,
+- `validate_continuity`, which drops candles already seen and reports gaps in a series.
+
+Dependencies:
+    - pandas
+    - pathlib
+    - re
+    - zipfile
+
+Example:
+    Parse all archives of a directory in order:
+
+    ```python
+    from src.data_download.kline_archive_reader import find_kline_archives, read_kline_archive
+
+    for (symbol, interval), paths in find_kline_archives("downloads").items():
+        for path in paths:
+            df_klines = read_kline_archive(path)
+    ```
+"""
+import re
+import zipfile
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.data_download.binance_data_loader import BinanceDataLoader
+
+ARCHIVE_NAME_PATTERN = re.compile(
+    r"^(?P<symbol>[A-Z0-9]+)-(?P<interval>\d+[smhdwM])-(?P<period>\d{4}-\d{2}(?:-\d{2})?)\.zip$")
+
+KLINE_CSV_COLUMNS = [
+    'open time', 'open', 'high', 'low', 'close', 'volume',
+    'close time', 'quote asset volume', 'number of trades',
+    'taker buy base asset volume', 'taker buy quote asset volume', 'delete'
+]
+KLINE_CSV_DTYPES = {
+    'open time': 'int64', 'open': str, 'high': str, 'low': str, 'close': str, 'volume': str,
+    'close time': 'int64', 'number of trades': 'int64',
+}
+
+# Archives from 2025 on store spot timestamps in microseconds instead of milliseconds
+MICROSECOND_THRESHOLD = 10 ** 14
+
+
+def find_kline_archives(directory: Union[str, Path]) -> Dict[Tuple[str, str], List[Path]]:
+    """
+    Finds the kline archives below `directory` and groups them by (symbol, interval).
+
+    Within a pair, the files are ordered by the period they cover; a monthly file sorts before the
+    daily files of the same month. Files with other names are ignored.
+    """
+    archives: Dict[Tuple[str, str], List[Tuple[str, Path]]] = {}
+    for path in Path(directory).rglob("*.zip"):
+        match = ARCHIVE_NAME_PATTERN.match(path.name)
+        if match:
+            key = (match["symbol"], match["interval"])
+            archives.setdefault(key, []).append((match["period"], path))
+    return {key: [path for _, path in sorted(files)] for key, files in sorted(archives.items())}
+
+
+def read_kline_archive(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Parses a Binance kline archive into the DataFrame layout used for database imports.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to a kline zip file containing a single CSV file, with or without a header row.
+
+    Returns
+    -------
+    pd.DataFrame
+        Candlestick data with the columns ['timestamp', 'open time', 'open', 'high', 'low',
+        'close', 'volume', 'close time', 'number of trades'], ordered by open time. Prices and
+        volumes are decimal strings, validated against NUMERIC(18, 8).
+
+    Raises
+    ------
+    ValueError
+        If a price or volume does not fit into NUMERIC(18, 8).
+    """
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(archive.namelist()[0]) as file:
+            has_header = not file.peek(1)[:1].isdigit()
+            df = pd.read_csv(file, header=0 if has_header else None, names=KLINE_CSV_COLUMNS,
+                             usecols=list(KLINE_CSV_DTYPES), dtype=KLINE_CSV_DTYPES)
+
+    df = df[list(KLINE_CSV_DTYPES)]
+    if len(df) and df['open time'].iloc[0] > MICROSECOND_THRESHOLD:
+        df['open time'] //= 1000
+        df['close time'] //= 1000
+
+    df = df.sort_values('open time', ignore_index=True)
+    df.insert(0, 'timestamp', pd.to_datetime(df['open time'], unit='ms').dt.tz_localize('UTC'))
+    BinanceDataLoader.validate_numeric_columns(df)
+    return df
+
+
+def validate_continuity(df_klines: pd.DataFrame, interval_ms: Optional[int],
+                        last_open_time: Optional[int]) -> Tuple[pd.DataFrame, List[Tuple[int, int]]]:
+    """
+    Drops candles that do not follow `last_open_time` and finds the gaps in the rest of a series.
+
+    Parameters
+    ----------
+    df_klines : pd.DataFrame
+        Candlestick data ordered by open time.
+    interval_ms : int or None
+        Candlestick interval in milliseconds, or `None` for calendar intervals (1M), whose gaps
+        are not checked.
+    last_open_time : int or None
+        Open time of the last candle already imported, e.g., from an overlapping monthly file.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, List[Tuple[int, int]]]
+        The new candles, and (first missing open time, last missing open time) of every gap,
+        including a gap between `last_open_time` and the first new candle.
+    """
+    open_times = df_klines['open time']
+    keep = open_times.diff().fillna(1).gt(0)  # Duplicates within the file
+    if last_open_time is not None:
+        keep &= open_times.gt(last_open_time)
+    df_klines = df_klines[keep]
+
+    gaps = []
+    if interval_ms and not df_klines.empty:
+        open_times = df_klines['open time']
+        steps = open_times.diff()
+        steps.iloc[0] = open_times.iloc[0] - last_open_time if last_open_time is not None else interval_ms
+        missing = steps > interval_ms
+        for open_time, step in zip(open_times[missing], steps[missing]):
+            gaps.append((int(open_time - step) + interval_ms, int(open_time) - interval_ms))
+    return df_klines, gaps
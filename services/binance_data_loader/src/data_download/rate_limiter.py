@@ -0,0 +1,168 @@
+"""
+Module for pacing Binance REST requests against the account's API weight budget.
+
+Binance limits REST usage per IP by *request weight* over a rolling one-minute window and reports
+the weight already consumed in the `X-MBX-USED-WEIGHT-1M` response header. This module provides
+the `WeightRateLimiter` class, a thread-safe token bucket that is shared by all fetch workers.
+Tokens refill continuously at `max_weight_per_minute / 60` per second and every response header
+re-synchronises the bucket with the server-side counter, so the loader spends the available
+budget instead of sleeping for a fixed amount of time.
+
+Dependencies:
+    - threading
+    - time
+
+Example:
+    Share one limiter between several `BinanceDataLoader` instances:
+
+    ```python
+    from src.data_download.rate_limiter import WeightRateLimiter, klines_request_weight
+
+    limiter = WeightRateLimiter(max_weight_per_minute=6000)
+    limiter.acquire(klines_request_weight(500))
+    klines = client.get_klines(symbol="BNBBTC", interval="1h", limit=500)
+    limiter.update_from_headers(client.response.headers)
+    ```
+"""
+import threading
+import time
+
+from typing import Mapping, Optional
+
+from src.helper import metrics
+
+
+USED_WEIGHT_HEADER = "x-mbx-used-weight-1m"
+
+
+def klines_request_weight(limit: int) -> int:
+    """
+    Returns the request weight Binance charges for a `GET /api/v3/klines` call.
+
+    Parameters
+    ----------
+    limit : int
+        Number of candlesticks requested per call.
+
+    Returns
+    -------
+    int
+        Weight of a single klines request with the given limit.
+    """
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class WeightRateLimiter:
+    def __init__(self, max_weight_per_minute: int = 6000, safety_margin: float = 0.1):
+        """
+        Initialize the WeightRateLimiter class.
+
+        Args:
+            max_weight_per_minute: Request weight Binance allows per IP and minute.
+            safety_margin: Fraction of the budget kept in reserve for other clients on the same IP.
+        """
+        self.capacity = max_weight_per_minute * (1 - safety_margin)
+        self.refill_rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def acquire(self, weight: int = 1) -> None:
+        """
+        Blocks until `weight` tokens are available and consumes them.
+
+        Parameters
+        ----------
+        weight : int
+            Request weight of the call about to be made.
+        """
+        wait = self.try_acquire(weight)
+        while wait:
+            time.sleep(wait)
+            wait = self.try_acquire(weight)
+
+    def try_acquire(self, weight: int = 1) -> float:
+        """
+        Consumes `weight` tokens if they are available, without blocking.
+
+        Asynchronous callers use this to wait with `asyncio.sleep` instead of blocking the event loop.
+
+        Parameters
+        ----------
+        weight : int
+            Request weight of the call about to be made.
+
+        Returns
+        -------
+        float
+            0 if the tokens were consumed, otherwise the number of seconds to wait before trying again.
+        """
+        with self._lock:
+            self._refill()
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.tokens >= weight:
+                self.tokens -= weight
+                return 0
+            return (weight - self.tokens) / self.refill_rate
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops handing out tokens for `seconds`, e.g., after Binance answered with 429 or 418.
+
+        All workers sharing the limiter back off together, so the IP does not keep sending
+        requests into a rate limit or ban.
+
+        Parameters
+        ----------
+        seconds : float
+            Time to wait before the next request, typically the `Retry-After` header value.
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        Re-synchronises the bucket with the used weight reported by Binance.
+
+        The used-weight counter is kept per IP, so the header of any response reflects the budget
+        shared by all workers. The bucket is only ever lowered to the remaining server-side budget,
+        never raised above the locally tracked value.
+
+        Parameters
+        ----------
+        headers : Mapping[str, str], optional
+            Response headers of the last Binance REST call.
+        """
+        if not headers:
+            return
+        used_weight = None
+        for key, value in headers.items():
+            if key.lower() == USED_WEIGHT_HEADER:
+                used_weight = value
+                break
+        if used_weight is None:
+            return
+        try:
+            used_weight = int(used_weight)
+        except ValueError:
+            return
+        metrics.USED_WEIGHT.set(used_weight)
+        remaining = self.capacity - used_weight
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, remaining)
@@ -0,0 +1,118 @@
+"""
+Module for retrying Binance REST requests that failed for transient reasons.
+
+A long backfill issues thousands of `GET /api/v3/klines` calls, and a single 429 (rate limit),
+418 (IP ban after ignoring 429s), 5xx or dropped connection must not abort it. This module provides
+the `RetryPolicy` class, which decides whether a failed request is retried and how long to wait
+first: the `Retry-After` header Binance sends with 429 and 418 responses is honoured, otherwise the
+delay grows exponentially with full jitter up to a cap. A request is never retried before its
+`Retry-After` expires; if that is longer than the cap, e.g., for an IP ban lasting hours, the error
+is raised instead. Client errors such as an invalid symbol are never retried.
+
+Dependencies:
+    - python-binance
+    - random
+    - requests
+
+Example:
+    Retry a request up to five times:
+
+    ```python
+    from src.data_download.retry_policy import RetryPolicy
+
+    policy = RetryPolicy(max_retries=5, backoff_seconds=1, max_backoff_seconds=60)
+    attempt = 0
+    while True:
+        try:
+            klines = client.get_klines(symbol="BNBBTC", interval="1h")
+            break
+        except Exception as e:
+            delay = policy.retry_delay(e, attempt)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+    ```
+"""
+import random
+import requests
+
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+from typing import Optional
+
+
+# Status codes with which Binance asks the client to back off
+RATE_LIMIT_STATUS_CODES = (418, 429)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Returns the `Retry-After` header of the response behind a Binance API error, if any.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """
+    Returns True if Binance rejected the request because the IP exceeded its limits.
+    """
+    return isinstance(error, BinanceAPIException) and error.status_code in RATE_LIMIT_STATUS_CODES
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Returns True for rate limits, server errors and network failures, False for anything else.
+    """
+    if isinstance(error, BinanceAPIException):
+        return error.status_code in RATE_LIMIT_STATUS_CODES or error.status_code >= 500
+    return isinstance(error, (BinanceRequestException, requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout))
+
+
+class RetryPolicy:
+    def __init__(self, max_retries: int = 5, backoff_seconds: float = 1.0, max_backoff_seconds: float = 120.0):
+        """
+        Initialize the RetryPolicy class.
+
+        Args:
+            max_retries: Number of retries per request before the error is raised. 0 disables retries.
+            backoff_seconds: Base delay of the exponential backoff.
+            max_backoff_seconds: Upper bound of a single delay. Errors with a longer `Retry-After`
+                are raised instead of retried.
+        """
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Returns the number of seconds to wait before retrying, or None if the error must be raised.
+
+        Parameters
+        ----------
+        error : Exception
+            Error raised by the failed request.
+        attempt : int
+            Number of retries already made for this request, starting at 0.
+
+        Returns
+        -------
+        float, optional
+            Delay before the next attempt, or None if the error is not transient, the retries are
+            exhausted or Binance asks to wait longer than `max_backoff_seconds`.
+        """
+        if attempt >= self.max_retries or not is_retryable(error):
+            return None
+
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            # Retrying before it expires extends an IP ban
+            return retry_after if retry_after <= self.max_backoff_seconds else None
+
+        # Full jitter, so workers that failed together do not retry together
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
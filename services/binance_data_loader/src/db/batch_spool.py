@@ -0,0 +1,512 @@
+"""
+Module for decoupling Binance fetching from database writes with a durable local spool.
+
+When PostgreSQL is slow or unreachable, writing batches inline stalls the fetchers behind the
+database and a failed COPY drops the batch. This module provides two classes:
+
+- `BatchSpool`, an append-only queue of candlestick batches on local disk. Batches are appended to
+  segment files (`segment-<n>.spool`) as CSV, each record carrying its length, a CRC32 checksum,
+  the trading pair ID and its last close time. A small `index.json` stores the position of the
+  oldest batch not yet written to the database; fully consumed segments are deleted.
+- `SpoolDrainer`, a background thread that writes the spooled batches to the database in order at
+  its own pace. Connection failures are retried with backoff until the database is back, so no
+  fetched batch is lost and fetching never waits for the database.
+
+Batches left in the spool when the process stops are replayed on the next start. Replayed batches
+are upserted, so a batch that was committed right before a crash, but not yet marked as written in
+the index, does not fail as a duplicate. A batch the database rejects for any other reason is moved
+to the `rejected/` directory instead of blocking the batches behind it. Its trading pair is then
+marked as failed: its later batches are skipped and no longer accepted, so the watermark of the
+pair stays in front of the hole and the next run fetches the range again. The failed pairs are kept
+in the index, so batches of them that are still spooled are skipped after a restart as well.
+
+Dependencies:
+    - pandas
+    - psycopg2
+    - threading
+    - zlib
+
+Example:
+    Fetch into the spool while a drainer writes to the database:
+
+    ```python
+    from src.db.batch_spool import BatchSpool, SpoolDrainer
+
+    spool = BatchSpool("/app/spool")
+    drainer = SpoolDrainer(logger, spool, pg, lambda: connect_to_database(db_params))
+    for df_batch in bh.iter_candlestick_batches(client, "BNBBTC", "1m", start_ts):
+        spool.submit(trading_pair_id, df_batch)
+    drainer.close(timeout=600)
+    spool.close()
+    ```
+"""
+import json
+import os
+import struct
+import threading
+import zlib
+import pandas as pd
+import psycopg2
+
+from decimal import Decimal
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from src.data_download.binance_data_loader import PRICE_COLUMNS
+
+# Payload length, CRC32 of the payload, trading pair ID, last close time of the batch
+RECORD_HEADER = struct.Struct("<IIiq")
+
+SEGMENT_PATTERN = "segment-*.spool"
+INDEX_FILE = "index.json"
+REJECTED_DIR = "rejected"
+
+# Errors after which the database is assumed to be unavailable rather than the batch to be invalid
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+def _segment_name(segment: int) -> str:
+    return f"segment-{segment:012d}.spool"
+
+
+def _fsync_directory(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class SpoolRecord:
+    def __init__(self, segment: int, offset: int, end: int, trading_pair_id: int, last_close_time: int,
+                 payload: bytes):
+        """
+        Initialize the SpoolRecord class.
+
+        Args:
+            segment: Number of the segment file holding the record.
+            offset: Position of the record header in the segment.
+            end: Position right behind the record.
+            trading_pair_id: ID of the trading pair the batch belongs to.
+            last_close_time: Latest close time in the batch in milliseconds.
+            payload: The batch DataFrame as CSV.
+        """
+        self.segment = segment
+        self.offset = offset
+        self.end = end
+        self.trading_pair_id = trading_pair_id
+        self.last_close_time = last_close_time
+        self.payload = payload
+
+    def dataframe(self) -> pd.DataFrame:
+        """
+        Returns a fresh copy of the spooled batch, with prices and volumes as decimal strings.
+        """
+        return read_batch(self.payload)
+
+
+def write_batch(df_klines: pd.DataFrame) -> bytes:
+    """
+    Serialises a candlestick batch as CSV, which unlike a pickle can be read by any pandas version.
+    Prices and volumes are written exactly, whether they are decimal strings or `Decimal` values.
+    `Decimal` values are written in fixed-point notation, since `str` turns small values such as
+    `Decimal('0.00000001')` into `1E-8`, which neither COPY format accepts.
+    """
+    df_klines = df_klines.copy()
+    for column in PRICE_COLUMNS:
+        df_klines[column] = df_klines[column].map(
+            lambda value: format(value, "f") if isinstance(value, Decimal) else value)
+    return df_klines.to_csv(index=False).encode()
+
+
+def read_batch(payload: bytes) -> pd.DataFrame:
+    """
+    Reads a candlestick batch written by `write_batch`.
+    """
+    df_klines = pd.read_csv(BytesIO(payload), dtype={column: str for column in PRICE_COLUMNS})
+    df_klines["timestamp"] = pd.to_datetime(df_klines["timestamp"], utc=True)
+    return df_klines
+
+
+class BatchSpool:
+    def __init__(self, directory: Union[str, Path], segment_bytes: int = 64 << 20, fsync: bool = True):
+        """
+        Initialize the BatchSpool class, creating the directory or recovering an existing spool.
+
+        Args:
+            directory: Directory holding the segment files and the index.
+            segment_bytes: Size after which a new segment file is started.
+            fsync: Flush every appended batch to stable storage before `submit` returns.
+        """
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.pending = 0
+        self.pending_bytes = 0
+        self.last_close_times: Dict[int, int] = {}
+        # Pairs failed in this run, their batches are neither accepted nor written anymore
+        self.failed_pairs: Set[int] = set()
+        self._condition = threading.Condition()
+
+        segments = sorted(int(path.stem.split("-")[1]) for path in self.directory.glob(SEGMENT_PATTERN))
+        self._read_segment, self._read_offset, failed_before = self._load_index(segments)
+        self._recover(segments, failed_before)
+
+        self._write_segment = max(segments[-1] if segments else 0, self._read_segment)
+        self._write_file = open(self.directory / _segment_name(self._write_segment), "ab")
+        self._read_file = None
+
+        # Pairs failed in an earlier run: their batches spooled until now are skipped, batches
+        # fetched again in this run are written
+        end = (self._write_segment, self._write_file.tell())
+        self._stale_pairs: Dict[int, Tuple[int, int]] = {
+            trading_pair_id: end for trading_pair_id in failed_before
+            if (self._read_segment, self._read_offset) < end
+        }
+
+    def _load_index(self, segments: List[int]) -> tuple:
+        index_path = self.directory / INDEX_FILE
+        if index_path.exists():
+            index = json.loads(index_path.read_text())
+            return index["segment"], index["offset"], set(index.get("failed_pairs", []))
+        return (segments[0] if segments else 0), 0, set()
+
+    def _recover(self, segments: List[int], failed_pairs: Set[int]) -> None:
+        """
+        Counts the batches not yet written and truncates a record torn by a crash during `submit`.
+        Batches of `failed_pairs` do not move the resume point of their pair.
+        """
+        for segment in segments:
+            if segment < self._read_segment:
+                # Consumed, but deleting it was interrupted
+                (self.directory / _segment_name(segment)).unlink()
+                continue
+
+            path = self.directory / _segment_name(segment)
+            size = path.stat().st_size
+            offset = self._read_offset if segment == self._read_segment else 0
+            with open(path, "rb") as file:
+                while offset < size:
+                    file.seek(offset)
+                    header = file.read(RECORD_HEADER.size)
+                    if len(header) < RECORD_HEADER.size:
+                        break
+                    length, _, trading_pair_id, last_close_time = RECORD_HEADER.unpack(header)
+                    end = offset + RECORD_HEADER.size + length
+                    if end > size:
+                        break
+                    self._count(trading_pair_id, None if trading_pair_id in failed_pairs else last_close_time,
+                                end - offset)
+                    offset = end
+
+            if offset < size:
+                with open(path, "r+b") as file:
+                    file.truncate(offset)
+
+    def _count(self, trading_pair_id: int, last_close_time: Optional[int], size: int) -> None:
+        self.pending += 1
+        self.pending_bytes += size
+        if last_close_time is not None:
+            self.last_close_times[trading_pair_id] = max(self.last_close_times.get(trading_pair_id, 0),
+                                                         last_close_time)
+
+    def submit(self, trading_pair_id: int, df_klines: pd.DataFrame) -> None:
+        """
+        Appends a batch of a trading pair to the spool.
+
+        Parameters
+        ----------
+        trading_pair_id : int
+            ID of the trading pair the batch belongs to.
+        df_klines : pd.DataFrame
+            Candlestick batch as returned by `BinanceDataLoader.build_candlestick_dataframe`.
+
+        Batches of a failed trading pair are dropped, so no data is spooled behind a hole.
+        """
+        if trading_pair_id in self.failed_pairs or df_klines.empty:
+            return
+        payload = write_batch(df_klines)
+        last_close_time = int(df_klines['close time'].max())
+        header = RECORD_HEADER.pack(len(payload), zlib.crc32(payload), trading_pair_id, last_close_time)
+
+        with self._condition:
+            if self._write_file.tell() >= self.segment_bytes:
+                self._write_file.close()
+                self._write_segment += 1
+                self._write_file = open(self.directory / _segment_name(self._write_segment), "ab")
+                _fsync_directory(self.directory)
+
+            self._write_file.write(header + payload)
+            self._write_file.flush()
+            if self.fsync:
+                os.fsync(self._write_file.fileno())
+
+            self._count(trading_pair_id, last_close_time, len(header) + len(payload))
+            self._condition.notify_all()
+
+    def peek(self, timeout: Optional[float] = None) -> Optional[SpoolRecord]:
+        """
+        Returns the oldest batch that has not been acknowledged yet, without removing it.
+
+        Only one consumer may read from a spool.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for a batch if the spool is empty. Waits indefinitely if None.
+
+        Returns
+        -------
+        SpoolRecord or None
+            The oldest pending batch, or None if none arrived within `timeout`.
+
+        Raises
+        ------
+        ValueError
+            If the checksum of the batch does not match, the record is then rejected.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.pending, timeout):
+                return None
+
+        while True:
+            if self._read_file is None:
+                self._read_file = open(self.directory / _segment_name(self._read_segment), "rb")
+            self._read_file.seek(self._read_offset)
+            header = self._read_file.read(RECORD_HEADER.size)
+            if header:
+                break
+            # The segment is consumed, continue with the next one
+            self._advance(self._read_segment + 1, 0)
+
+        length, crc, trading_pair_id, last_close_time = RECORD_HEADER.unpack(header)
+        payload = self._read_file.read(length)
+        record = SpoolRecord(self._read_segment, self._read_offset, self._read_offset + RECORD_HEADER.size + length,
+                             trading_pair_id, last_close_time, payload)
+        if zlib.crc32(payload) != crc:
+            self.fail_pair(trading_pair_id)
+            self.reject(record, "checksum mismatch")
+            raise ValueError(f"Spooled batch at {_segment_name(record.segment)}:{record.offset} is corrupt.")
+        return record
+
+    def ack(self, record: SpoolRecord) -> None:
+        """
+        Marks a batch returned by `peek` as written, so it is never replayed.
+        """
+        self._advance(record.segment, record.end)
+        with self._condition:
+            self.pending -= 1
+            self.pending_bytes -= record.end - record.offset
+            self._condition.notify_all()
+
+    def is_skipped(self, record: SpoolRecord) -> bool:
+        """
+        Returns True if a batch belongs to a failed trading pair and must not be written.
+        """
+        stale_until = self._stale_pairs.get(record.trading_pair_id)
+        return (record.trading_pair_id in self.failed_pairs
+                or (stale_until is not None and (record.segment, record.offset) < stale_until))
+
+    def fail_pair(self, trading_pair_id: int) -> None:
+        """
+        Marks a trading pair as failed after one of its batches could not be written.
+
+        Its later batches are no longer accepted by `submit` and are skipped by the drainer, also
+        after a restart, and its spooled batches no longer move its resume point.
+        """
+        with self._condition:
+            self.failed_pairs.add(trading_pair_id)
+            self.last_close_times.pop(trading_pair_id, None)
+        self._write_index()
+
+    def reject(self, record: SpoolRecord, reason: str) -> Path:
+        """
+        Moves a batch that cannot be written to the `rejected/` directory and acknowledges it.
+
+        Returns
+        -------
+        Path
+            File the batch was saved to, loadable with `read_batch` if the checksum matched.
+        """
+        rejected_dir = self.directory / REJECTED_DIR
+        rejected_dir.mkdir(exist_ok=True)
+        path = rejected_dir / f"{record.segment:012d}-{record.offset:012d}-{record.trading_pair_id}.csv"
+        path.write_bytes(record.payload)
+        path.with_suffix(".reason").write_text(reason)
+        self.ack(record)
+        return path
+
+    def _advance(self, segment: int, offset: int) -> None:
+        """
+        Moves the read position and persists it, deleting the segment left behind.
+        """
+        previous_segment = self._read_segment
+        self._read_segment, self._read_offset = segment, offset
+        # Pairs failed in an earlier run are forgotten once their stale batches are consumed
+        self._stale_pairs = {trading_pair_id: stale_until for trading_pair_id, stale_until in self._stale_pairs.items()
+                             if (segment, offset) < stale_until}
+        self._write_index()
+
+        if segment != previous_segment:
+            self._read_file.close()
+            self._read_file = None
+            with self._condition:
+                if previous_segment != self._write_segment:
+                    (self.directory / _segment_name(previous_segment)).unlink()
+
+    def _write_index(self) -> None:
+        """
+        Persists the read position and the failed trading pairs atomically.
+        """
+        index = {
+            "segment": self._read_segment,
+            "offset": self._read_offset,
+            "failed_pairs": sorted(self.failed_pairs | set(self._stale_pairs)),
+        }
+        index_path = self.directory / INDEX_FILE
+        tmp_path = index_path.with_name(f".{INDEX_FILE}.tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(index, file)
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+        os.replace(tmp_path, index_path)
+
+    def close(self) -> None:
+        """
+        Closes the segment files. Pending batches stay in the spool and are replayed on reopening.
+        """
+        with self._condition:
+            self._write_file.close()
+            if self._read_file is not None:
+                self._read_file.close()
+                self._read_file = None
+
+
+class SpoolDrainer:
+    def __init__(self, logger, spool: BatchSpool, pg, connect: Callable, retry_seconds: float = 1.0,
+                 max_retry_seconds: float = 60.0):
+        """
+        Initialize the SpoolDrainer class and start the drainer thread.
+
+        Args:
+            logger: Logger instance for logging.
+            spool: Spool the batches are read from.
+            pg: PostgresOperations instance used to write the batches.
+            connect: Callable returning a new database connection.
+            retry_seconds: Delay before reconnecting after the database became unavailable.
+            max_retry_seconds: Upper bound of the delay, which doubles with every failed attempt.
+        """
+        self.logger = logger
+        self.spool = spool
+        self.pg = pg
+        # Replayed batches are upserted, they may already have been committed
+        self.replay_pg = type(pg)(logger, pg.copy_format, "merge", pg.on_committed)
+        self.connect = connect
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.skipped = 0
+
+        self._connection = None
+        self._closing = threading.Event()
+        self._abort = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        replaying = self.spool.pending > 0
+        delay = self.retry_seconds
+        try:
+            while not self._abort.is_set():
+                try:
+                    record = self.spool.peek(timeout=0.5)
+                except ValueError as e:
+                    self.logger.error(f"Rejected spooled batch: {e}")
+                    self.rejected += 1
+                    continue
+                if record is None:
+                    if self._closing.is_set():
+                        return
+                    continue
+                if self.spool.is_skipped(record):
+                    # Writing it would advance the watermark of the pair across the rejected batch
+                    self.spool.ack(record)
+                    self.skipped += 1
+                    continue
+
+                try:
+                    if self._connection is None or self._connection.closed:
+                        self._connection = self.connect()
+                    pg = self.replay_pg if replaying else self.pg
+                    rows = pg.copy_import_candlestick_batches(self._connection, [record.dataframe()],
+                                                              record.trading_pair_id)
+                except CONNECTION_ERRORS as e:
+                    self.logger.warning(f"Database unavailable, {self.spool.pending} batches spooled, "
+                                        f"retrying in {delay:.1f}s: {e}")
+                    self._disconnect()
+                    replaying = True
+                    self._abort.wait(delay)
+                    delay = min(delay * 2, self.max_retry_seconds)
+                    continue
+                except Exception as e:
+                    if not replaying:
+                        # Retry once as an upsert, e.g., the batch overlaps data already stored
+                        replaying = True
+                        continue
+                    self.spool.fail_pair(record.trading_pair_id)
+                    path = self.spool.reject(record, str(e))
+                    self.rejected += 1
+                    self.logger.error(f"Rejected spooled batch of trading pair {record.trading_pair_id}, "
+                                      f"saved to '{path}', skipping its remaining batches: {e}")
+                    replaying = False
+                    continue
+
+                self.spool.ack(record)
+                self.batches += 1
+                self.rows += rows
+                replaying = False
+                delay = self.retry_seconds
+        finally:
+            self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Writes the remaining batches and stops the drainer thread.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Seconds to wait for the spool to drain. Waits indefinitely if None.
+
+        Returns
+        -------
+        bool
+            True if the spool was drained, False if batches are left for the next run.
+        """
+        self._closing.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self._abort.set()
+            self._thread.join()
+
+        self.logger.info(f"Spool drainer wrote {self.rows} rows in {self.batches} batches, "
+                         f"rejected {self.rejected} and skipped {self.skipped} batches of failed pairs.")
+        if self.spool.pending:
+            self.logger.warning(f"{self.spool.pending} batches ({self.spool.pending_bytes / 2 ** 20:.1f} MB) "
+                                f"remain in the spool and are written on the next run.")
+            return False
+        return True
@@ -0,0 +1,192 @@
+"""
+Module for writing candlestick batches with several concurrent COPY connections.
+
+A single connection serialises all COPYs on one database backend, although the `candlesticks`
+hypertable is split into space partitions by `trading_pair_id` that can be written independently.
+This module provides the `ParallelCopyWriter` class, which runs a number of writer threads, each
+with its own connection from a psycopg2 connection pool. Batches are routed to a writer by the
+TimescaleDB space partition of their trading pair, so:
+
+- writers work on disjoint chunks and indexes and do not contend for the same locks,
+- all batches of one trading pair go through the same writer and are committed in order.
+
+Every writer has a bounded queue, so producers are slowed down when the database cannot keep up.
+A trading pair whose batch fails is added to `failed_pairs`; its later batches are dropped and
+producers check the set to stop downloading the pair. Writers take their connection from the pool
+when a batch arrives, so while the database is unreachable batches fail, but the queues are still
+drained and `submit` and `close` never block on a dead writer. The rows written per trading pair are
+counted in `rows_by_pair`, so the outcome of every pair is known once the writer is closed.
+Per-writer row counts and throughput are logged when the writer is closed.
+
+Dependencies:
+    - psycopg2
+    - queue
+    - threading
+
+Example:
+    Write batches of many trading pairs through four connections:
+
+    ```python
+    from psycopg2.pool import ThreadedConnectionPool
+    from src.db.parallel_copy_writer import ParallelCopyWriter
+
+    pool = ThreadedConnectionPool(1, 4, **db_params)
+    with ParallelCopyWriter(logger, pool, pg, workers=4, partitions=partitions) as writer:
+        for trading_pair_id, df_klines in batches:
+            writer.submit(trading_pair_id, df_klines)
+    print(writer.stats)
+    ```
+"""
+import queue
+import threading
+import time
+import pandas as pd
+
+from typing import Dict, List, Optional, Set
+
+_STOP = object()
+
+
+class WriterStats:
+    def __init__(self, worker: int):
+        """
+        Initialize the WriterStats class.
+
+        Args:
+            worker: Index of the writer thread.
+        """
+        self.worker = worker
+        self.batches = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.busy_seconds if self.busy_seconds else 0.0
+
+
+class ParallelCopyWriter:
+    def __init__(self, logger, pool, pg, workers: int = 4, partitions: Optional[Dict[int, int]] = None,
+                 max_pending_batches: int = 2):
+        """
+        Initialize the ParallelCopyWriter class and start the writer threads.
+
+        Args:
+            logger: Logger instance for logging.
+            pool: psycopg2 connection pool with room for `workers` connections.
+            pg: PostgresOperations instance used to write the batches.
+            workers: Number of concurrent COPY connections.
+            partitions: Space partition of every trading pair ID, as returned by
+                `PostgresOperations.get_space_partitions`. Unknown IDs are routed by their value.
+            max_pending_batches: Number of batches queued per writer before `submit` blocks.
+        """
+        self.logger = logger
+        self.pool = pool
+        self.pg = pg
+        self.partitions = partitions or {}
+        self.stats = [WriterStats(worker) for worker in range(workers)]
+        self.failed_pairs: Set[int] = set()
+        self.rows_by_pair: Dict[int, int] = {}
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=max_pending_batches) for _ in range(workers)]
+        self._threads = [threading.Thread(target=self._run, args=(worker,), daemon=True) for worker in range(workers)]
+        self._started = time.perf_counter()
+        for thread in self._threads:
+            thread.start()
+
+    def worker_for(self, trading_pair_id: int) -> int:
+        """
+        Returns the writer responsible for a trading pair.
+        """
+        return self.partitions.get(trading_pair_id, trading_pair_id) % len(self._queues)
+
+    def submit(self, trading_pair_id: int, df_klines: pd.DataFrame) -> None:
+        """
+        Queues a batch of a trading pair for writing, blocking while the writer's queue is full.
+
+        Batches of a trading pair whose earlier batch failed are dropped, so no data is written on
+        top of a hole.
+        """
+        if trading_pair_id in self.failed_pairs or df_klines.empty:
+            return
+        worker = self.worker_for(trading_pair_id)
+        if not self._put(worker, (trading_pair_id, df_klines)):
+            self.logger.error(f"Writer {worker} has stopped, skipping the batches of trading pair {trading_pair_id}.")
+            self.failed_pairs.add(trading_pair_id)
+
+    def _put(self, worker: int, item) -> bool:
+        """
+        Queues an item for a writer, returning False if the writer thread has exited.
+        """
+        while self._threads[worker].is_alive():
+            try:
+                self._queues[worker].put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, worker: int) -> None:
+        stats = self.stats[worker]
+        # Taken from the pool on demand, so a database outage fails batches instead of the thread
+        connection = None
+        try:
+            while True:
+                item = self._queues[worker].get()
+                if item is _STOP:
+                    return
+                trading_pair_id, df_klines = item
+                if trading_pair_id in self.failed_pairs:
+                    continue
+
+                start = time.perf_counter()
+                try:
+                    if connection is None:
+                        connection = self.pool.getconn()
+                    rows = self.pg.copy_import_candlestick_batches(connection, [df_klines], trading_pair_id)
+                except Exception as e:
+                    self.logger.error(f"Writer {worker} failed for trading pair {trading_pair_id}, "
+                                      f"skipping its remaining batches: {e}")
+                    self.failed_pairs.add(trading_pair_id)
+                    if connection is not None and connection.closed:
+                        self.pool.putconn(connection, close=True)
+                        connection = None
+                    continue
+                finally:
+                    stats.busy_seconds += time.perf_counter() - start
+
+                stats.batches += 1
+                stats.rows += rows
+                # Each pair is written by a single writer thread
+                self.rows_by_pair[trading_pair_id] = self.rows_by_pair.get(trading_pair_id, 0) + rows
+        finally:
+            if connection is not None:
+                self.pool.putconn(connection)
+
+    def close(self) -> List[WriterStats]:
+        """
+        Writes all queued batches, stops the writer threads and logs their throughput.
+
+        Returns
+        -------
+        List[WriterStats]
+            Batches, rows and busy time of every writer.
+        """
+        for worker in range(len(self._queues)):
+            self._put(worker, _STOP)
+        for thread in self._threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - self._started
+        for stats in self.stats:
+            self.logger.info(f"Writer {stats.worker}: {stats.rows} rows in {stats.batches} batches, "
+                             f"{stats.rows_per_second:,.0f} rows/s while busy.")
+        total_rows = sum(stats.rows for stats in self.stats)
+        self.logger.info(f"Wrote {total_rows} rows with {len(self.stats)} writers in {elapsed:.1f}s "
+                         f"({total_rows / elapsed if elapsed else 0:,.0f} rows/s).")
+        return self.stats
+
+    def __enter__(self) -> "ParallelCopyWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -1,15 +1,45 @@
+import time
+import pandas as pd
+
 from io import StringIO
+from psycopg2.extras import execute_values
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.db.binary_copy import BinaryCopyStream, encode_candlestick_rows
+from src.helper import metrics
+
+CANDLESTICK_COLUMNS = "trading_pair_id, timestamp, open_time, open, high, low, close, volume, close_time, number_of_trades"
+
+COPY_FORMATS = ("csv", "binary")
+
+WRITE_MODES = ("copy", "merge")
 
 
 class PostgresOperations:
-    def __init__(self, logger):
+    def __init__(self, logger, copy_format: str = "csv", write_mode: str = "copy",
+                 on_committed: Optional[Callable[[pd.DataFrame], None]] = None):
         """
         Initialize the PostgresOperations class.
 
         Args:
             logger: Logger instance for logging.
+            copy_format: Format used to send candlestick data with COPY. "csv" serialises the data
+                as text, "binary" streams it in PostgreSQL's binary COPY format.
+            write_mode: How candlestick data is written. "copy" COPYs straight into the target
+                table and fails on overlapping rows, "merge" COPYs into a temporary staging table
+                and upserts from there, so repeated or overlapping loads are idempotent.
+            on_committed: Called with every candlestick DataFrame once its transaction has been
+                committed, e.g., to mirror the data into the candle store. May also be set later.
         """
+        if copy_format not in COPY_FORMATS:
+            raise ValueError(f"Invalid COPY format '{copy_format}', expected one of {COPY_FORMATS}.")
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Invalid write mode '{write_mode}', expected one of {WRITE_MODES}.")
+
         self.logger = logger
+        self.copy_format = copy_format
+        self.write_mode = write_mode
+        self.on_committed = on_committed
 
     def copy_import_candlestick_data(self, connection, df_klines, table_name="candlesticks"):
         """
@@ -19,30 +49,559 @@ class PostgresOperations:
             connection: psycopg2 database connection object.
             df_klines: Pandas DataFrame containing the candlestick data.
             table_name: Target table name in the database.
+
+        Returns:
+            True if the data has been committed, False if the import failed and was rolled back.
         """
         try:
             self.logger.info(f"Start import of {len(df_klines)} rows into {table_name}.")
 
-            # Prepare the DataFrame for COPY by converting it to CSV in memory
+            with connection.cursor() as cursor:
+                self._write_dataframe(cursor, df_klines, table_name, self.write_mode)
+                self._update_ingestion_state(cursor, df_klines)
+            connection.commit()
+            self._observe_committed(df_klines)
+            self.logger.info(f"Successfully copied {len(df_klines)} rows into {table_name}.")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error copying data to PostgreSQL: {e}")
+            connection.rollback()
+            return False
+
+    def copy_import_candlestick_batches(self, connection, batches: Iterable[pd.DataFrame], trading_pair_id: int,
+                                        table_name: str = "candlesticks") -> int:
+        """
+        Imports a stream of candlestick batches with PostgreSQL COPY, committing after every batch.
+
+        Every batch is its own transaction, so memory stays bounded by a single batch and a
+        failure only loses the batch in flight. Because later batches must not be written on top
+        of a hole, the first failing batch stops the import.
+
+        Parameters
+        ----------
+        connection : psycopg2 connection
+            Database connection object.
+        batches : Iterable[pd.DataFrame]
+            Candlestick batches as yielded by `BinanceDataLoader.iter_candlestick_batches`.
+        trading_pair_id : int
+            ID of the trading pair the batches belong to.
+        table_name : str, optional
+            Target table name in the database (default is 'candlesticks').
+
+        Returns
+        -------
+        int
+            Total number of rows imported.
+
+        Raises
+        ------
+        Exception
+            Re-raises the error of the first batch that could not be imported, after rolling back.
+        """
+        total_rows = 0
+        for df_klines in batches:
+            df_klines.insert(0, 'trading_pair_id', trading_pair_id)
+            try:
+                with connection.cursor() as cursor:
+                    self._write_dataframe(cursor, df_klines, table_name, self.write_mode)
+                    self._update_ingestion_state(cursor, df_klines)
+                connection.commit()
+                self._observe_committed(df_klines)
+            except Exception as e:
+                self.logger.error(f"Error copying batch of {len(df_klines)} rows to PostgreSQL: {e}")
+                connection.rollback()
+                raise
+
+            total_rows += len(df_klines)
+            self.logger.info(
+                f"Committed batch of {len(df_klines)} rows for trading pair {trading_pair_id} "
+                f"({total_rows} rows so far).")
+
+        return total_rows
+
+    def merge_import_candlestick_data(self, connection, df_klines: pd.DataFrame,
+                                      table_name: str = "candlesticks") -> int:
+        """
+        Upserts candlestick data through a staging table, regardless of the configured write mode.
+
+        Parameters
+        ----------
+        connection : psycopg2 connection
+            Database connection object.
+        df_klines : pd.DataFrame
+            Candlestick data including the 'trading_pair_id' column.
+        table_name : str, optional
+            Target table name in the database (default is 'candlesticks').
+
+        Returns
+        -------
+        int
+            Number of rows inserted or changed.
+
+        Raises
+        ------
+        Exception
+            Re-raises any database error after rolling back.
+        """
+        try:
+            with connection.cursor() as cursor:
+                affected_rows = self._write_dataframe(cursor, df_klines, table_name, "merge")
+                self._update_ingestion_state(cursor, df_klines)
+            connection.commit()
+            self._observe_committed(df_klines)
+            self.logger.info(f"Merged {len(df_klines)} rows into {table_name}, {affected_rows} inserted or changed.")
+            return affected_rows
+        except Exception as e:
+            self.logger.error(f"Error merging data into PostgreSQL: {e}")
+            connection.rollback()
+            raise
+
+    def _write_dataframe(self, cursor, df_klines: pd.DataFrame, table_name: str, write_mode: str) -> int:
+        """
+        Writes a candlestick DataFrame with the given write mode, without committing, and returns
+        the number of rows inserted or changed.
+        """
+        if write_mode != "merge":
+            self._copy_dataframe(cursor, df_klines, table_name)
+            return len(df_klines)
+
+        # The staging table is private to the session and emptied by every commit. COPY numbers the
+        # rows in batch order, so the last version of a candle within a batch wins the merge.
+        staging_table = f"{table_name}_staging"
+        cursor.execute(
+            f"""
+            CREATE TEMP TABLE IF NOT EXISTS {staging_table}
+            (LIKE {table_name} INCLUDING DEFAULTS, staged_row BIGSERIAL) ON COMMIT DELETE ROWS;
+            """
+        )
+        self._copy_dataframe(cursor, df_klines, staging_table)
+
+        # Apply the whole batch in one set-based statement, skipping rows that did not change
+        cursor.execute(
+            f"""
+            INSERT INTO {table_name} ({CANDLESTICK_COLUMNS})
+            SELECT DISTINCT ON (trading_pair_id, timestamp) {CANDLESTICK_COLUMNS}
+            FROM {staging_table}
+            ORDER BY trading_pair_id, timestamp, staged_row DESC
+            ON CONFLICT (trading_pair_id, timestamp) DO UPDATE SET
+                open_time = EXCLUDED.open_time,
+                open = EXCLUDED.open,
+                high = EXCLUDED.high,
+                low = EXCLUDED.low,
+                close = EXCLUDED.close,
+                volume = EXCLUDED.volume,
+                close_time = EXCLUDED.close_time,
+                number_of_trades = EXCLUDED.number_of_trades
+            WHERE ({table_name}.open_time, {table_name}.open, {table_name}.high, {table_name}.low,
+                   {table_name}.close, {table_name}.volume, {table_name}.close_time,
+                   {table_name}.number_of_trades)
+                IS DISTINCT FROM
+                  (EXCLUDED.open_time, EXCLUDED.open, EXCLUDED.high, EXCLUDED.low,
+                   EXCLUDED.close, EXCLUDED.volume, EXCLUDED.close_time,
+                   EXCLUDED.number_of_trades);
+            """
+        )
+        return cursor.rowcount
+
+    def _copy_dataframe(self, cursor, df_klines: pd.DataFrame, table_name: str) -> None:
+        """
+        Sends a candlestick DataFrame to the server with COPY, without committing.
+
+        The serialisation and COPY durations are recorded as metrics. In binary format the rows are
+        encoded while they are sent, so both are part of the COPY duration.
+        """
+        labels = metrics.batch_labels(df_klines["trading_pair_id"].unique())
+        if self.copy_format == "binary":
+            # Encode rows lazily while psycopg2 reads from the stream
+            start = time.perf_counter()
+            cursor.copy_expert(
+                f"COPY {table_name} ({CANDLESTICK_COLUMNS}) FROM STDIN WITH (FORMAT binary);",
+                BinaryCopyStream(encode_candlestick_rows(df_klines)),
+                size=65536,
+            )
+            metrics.observe_copy(labels, len(df_klines), time.perf_counter() - start)
+            return
+
+        # Prepare the DataFrame for COPY by converting it to CSV in memory
+        with metrics.time_stage("serialize", *labels):
             output = StringIO()
             df_klines.to_csv(output, index=False, header=False)  # Exclude index and headers
             output.seek(0)  # Move cursor to the beginning of the StringIO object
 
-            # Execute the COPY command
+        # Execute the COPY command
+        start = time.perf_counter()
+        cursor.copy_expert(f"COPY {table_name} ({CANDLESTICK_COLUMNS}) FROM STDIN WITH CSV;", output)
+        metrics.observe_copy(labels, len(df_klines), time.perf_counter() - start)
+
+    def _observe_committed(self, df_klines: pd.DataFrame) -> None:
+        """
+        Records the committed rows and last close time of every trading pair in the batch and
+        passes the batch to `on_committed`.
+        """
+        if df_klines.empty:
+            return
+        committed = df_klines.groupby("trading_pair_id")["close time"].agg(["size", "max"])
+        for trading_pair_id, row in committed.iterrows():
+            metrics.observe_committed(int(trading_pair_id), int(row["size"]), int(row["max"]))
+        if self.on_committed is not None:
+            self.on_committed(df_klines)
+
+    @staticmethod
+    def _update_ingestion_state(cursor, df_klines: pd.DataFrame) -> None:
+        """
+        Advances the per-pair watermark in `ingestion_state` within the caller's transaction, so
+        the resume point is committed atomically with the data it describes.
+        """
+        if df_klines.empty:
+            return
+
+        watermarks = df_klines.groupby("trading_pair_id").agg(
+            last_open_time=("open time", "max"), last_close_time=("close time", "max"))
+        execute_values(
+            cursor,
+            """
+            INSERT INTO ingestion_state (trading_pair_id, last_open_time, last_close_time)
+            VALUES %s
+            ON CONFLICT (trading_pair_id) DO UPDATE SET
+                last_open_time = GREATEST(ingestion_state.last_open_time, EXCLUDED.last_open_time),
+                last_close_time = GREATEST(ingestion_state.last_close_time, EXCLUDED.last_close_time),
+                updated_at = now()
+            """,
+            [(int(pair_id), int(row.last_open_time), int(row.last_close_time))
+             for pair_id, row in watermarks.iterrows()],
+        )
+
+    def ensure_ingestion_state_table(self, connection) -> None:
+        """
+        Creates the `ingestion_state` watermark table if the database predates it.
+
+        Parameters
+        ----------
+        connection : psycopg2 connection
+            Database connection object.
+        """
+        try:
             with connection.cursor() as cursor:
-                cursor.copy_expert(
-                    f"""
-                    COPY {table_name} (
-                        trading_pair_id, timestamp, open_time, open, high, low, close, volume, close_time, number_of_trades
-                    ) FROM STDIN WITH CSV;
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS ingestion_state (
+                        trading_pair_id INT PRIMARY KEY REFERENCES trading_pairs(id) ON DELETE CASCADE,
+                        last_open_time BIGINT NOT NULL,
+                        last_close_time BIGINT NOT NULL,
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                    )
+                    """
+                )
+            connection.commit()
+        except Exception as e:
+            self.logger.error(f"Error creating ingestion_state table: {e}")
+            connection.rollback()
+            raise
+
+    def resolve_trading_pairs(self, connection, pairs: List[Tuple[str, str]], source_name: str,
+                              source_type: str = "exchange") -> Dict[Tuple[str, str], Dict]:
+        """
+        Resolves the IDs and resume points of many trading pairs with a few set-based queries.
+
+        Missing `sources` and `trading_pairs` rows are created in bulk. Resume points are read from
+        the `ingestion_state` watermark table; pairs without a watermark are seeded once from the
+        candlesticks already stored for them.
+
+        Parameters
+        ----------
+        connection : psycopg2 connection
+            Database connection object.
+        pairs : List[Tuple[str, str]]
+            (symbol, interval) tuples of the configured trading pairs.
+        source_name : str
+            Name of the source (e.g., 'Binance').
+        source_type : str, optional
+            Type of the source (default is 'exchange').
+
+        Returns
+        -------
+        Dict[Tuple[str, str], Dict]
+            Maps every (symbol, interval) to a dictionary with the keys 'trading_pair_id' and
+            'last_close_time' (in milliseconds, or None if no data has been stored yet).
+        """
+        if not pairs:
+            return {}
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO sources (name, type) VALUES (%s, %s)
+                    ON CONFLICT (name) DO NOTHING
+                    """,
+                    (source_name, source_type),
+                )
+                cursor.execute("SELECT id FROM sources WHERE name = %s", (source_name,))
+                source_id = cursor.fetchone()[0]
+
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO trading_pairs (symbol, interval, source_id, type) VALUES %s
+                    ON CONFLICT (source_id, symbol, interval) DO NOTHING
+                    """,
+                    [(symbol, interval, source_id, "crypto") for symbol, interval in set(pairs)],
+                )
+
+                cursor.execute(
+                    """
+                    SELECT tp.id, tp.symbol, tp.interval, s.last_close_time
+                    FROM trading_pairs tp
+                    LEFT JOIN ingestion_state s ON s.trading_pair_id = tp.id
+                    WHERE tp.source_id = %s AND tp.symbol = ANY(%s)
                     """,
-                    output,
+                    (source_id, list({symbol for symbol, _ in pairs})),
                 )
+                wanted = set(pairs)
+                states = {
+                    (symbol, interval): {"trading_pair_id": pair_id, "last_close_time": last_close_time}
+                    for pair_id, symbol, interval, last_close_time in cursor.fetchall()
+                    if (symbol, interval) in wanted
+                }
+
+                # One-time seed for pairs loaded before the watermark table existed
+                missing_ids = [state["trading_pair_id"] for state in states.values()
+                               if state["last_close_time"] is None]
+                if missing_ids:
+                    cursor.execute(
+                        """
+                        INSERT INTO ingestion_state (trading_pair_id, last_open_time, last_close_time)
+                        SELECT trading_pair_id, MAX(open_time), MAX(close_time)
+                        FROM candlesticks
+                        WHERE trading_pair_id = ANY(%s)
+                        GROUP BY trading_pair_id
+                        ON CONFLICT (trading_pair_id) DO NOTHING
+                        RETURNING trading_pair_id, last_close_time
+                        """,
+                        (missing_ids,),
+                    )
+                    seeded = dict(cursor.fetchall())
+                    for state in states.values():
+                        if state["trading_pair_id"] in seeded:
+                            state["last_close_time"] = seeded[state["trading_pair_id"]]
+
             connection.commit()
-            self.logger.info(f"Successfully copied {len(df_klines)} rows into {table_name}.")
+            for (symbol, interval), state in states.items():
+                metrics.register_trading_pair(state["trading_pair_id"], symbol, interval)
+            self.logger.info(f"Resolved {len(states)} trading pairs for source '{source_name}'.")
+            return states
         except Exception as e:
-            self.logger.error(f"Error copying data to PostgreSQL: {e}")
+            self.logger.error(f"Error resolving trading pairs for source '{source_name}': {e}")
+            connection.rollback()
+            raise
+
+    def find_candle_gaps(self, connection, trading_pair_id: int, interval_ms: int) -> List[Tuple[int, int]]:
+        """
+        Finds the missing candles in the middle of a stored series as compact ranges.
+
+        The scan runs entirely in SQL: a `LAG` window over `open_time`, served in order by the
+        `(trading_pair_id, open_time)` index, compares every candle with its predecessor and only
+        the gaps are returned to Python.
+
+        Parameters
+        ----------
+        connection : psycopg2 connection
+            Database connection object.
+        trading_pair_id : int
+            ID of the trading pair.
+        interval_ms : int
+            Candlestick interval in milliseconds.
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            (first missing open time, last missing open time) in milliseconds for every gap,
+            ordered by time.
+        """
+        query = """
+            SELECT prev_open_time + %(step)s AS gap_start, open_time - %(step)s AS gap_end
+            FROM (
+                SELECT open_time, LAG(open_time) OVER (ORDER BY open_time) AS prev_open_time
+                FROM candlesticks
+                WHERE trading_pair_id = %(trading_pair_id)s
+            ) AS series
+            WHERE open_time - prev_open_time > %(step)s
+            ORDER BY gap_start;
+        """
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query, {"trading_pair_id": trading_pair_id, "step": interval_ms})
+                gaps = cursor.fetchall()
+            connection.commit()
+            self.logger.info(f"Found {len(gaps)} gaps for trading pair {trading_pair_id}.")
+            return gaps
+        except Exception as e:
+            self.logger.error(f"Error scanning for gaps of trading pair {trading_pair_id}: {e}")
+            connection.rollback()
+            raise
+
+    def get_space_partitions(self, connection, trading_pair_ids: List[int],
+                             table_name: str = "candlesticks") -> Dict[int, int]:
+        """
+        Returns the TimescaleDB space partition of every trading pair in the hypertable.
+
+        TimescaleDB assigns a row to one of `number_partitions` ranges of the hash of
+        `trading_pair_id`. Batches of trading pairs in the same partition compete for the same
+        chunk locks and indexes, so writers are best grouped by this number.
+
+        Parameters
+        ----------
+        connection : psycopg2 connection
+            Database connection object.
+        trading_pair_ids : List[int]
+            IDs of the trading pairs.
+        table_name : str, optional
+            Hypertable name in the database (default is 'candlesticks').
+
+        Returns
+        -------
+        Dict[int, int]
+            Maps every trading pair ID to its partition number (0 to number_partitions - 1).
+            Without TimescaleDB space partitioning every ID maps to itself.
+        """
+        query = """
+            SELECT pair.id,
+                   LEAST(%(schema)s.get_partition_hash(pair.id) / (2147483647 / dim.num_partitions),
+                         dim.num_partitions - 1)::INTEGER
+            FROM unnest(%(ids)s::INTEGER[]) AS pair(id)
+            CROSS JOIN (
+                SELECT num_partitions
+                FROM timescaledb_information.dimensions
+                WHERE hypertable_name = %(table)s AND column_name = 'trading_pair_id'
+            ) AS dim;
+        """
+        # The hash function moved to another schema in TimescaleDB 2.12
+        for schema in ("_timescaledb_functions", "_timescaledb_internal"):
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(query.replace("%(schema)s", schema),
+                                   {"ids": list(trading_pair_ids), "table": table_name})
+                    partitions = dict(cursor.fetchall())
+                connection.commit()
+                if partitions:
+                    return partitions
+            except Exception as e:
+                connection.rollback()
+                self.logger.debug(f"Partition lookup with schema {schema} failed: {e}")
+
+        self.logger.warning(f"No space partitioning found for {table_name}, grouping writers by trading pair.")
+        return {trading_pair_id: trading_pair_id for trading_pair_id in trading_pair_ids}
+
+    def rollup_candlesticks(self, connection, source_trading_pair_id: int, target_trading_pair_id: int,
+                            bucket_width: str, since_ms: int = 0, table_name: str = "candlesticks") -> int:
+        """
+        Derives the candles of a coarser interval from a finer stored series and upserts them.
+
+        The aggregation runs entirely in SQL with `time_bucket`: the open of the first and the
+        close of the last source candle (TimescaleDB's `first` / `last`), the highest high, the
+        lowest low and the sums of volume and number of trades. Only the buckets from the one
+        containing `since_ms` onwards are recomputed, so a run after an incremental load touches a
+        handful of rows. The watermark of the target pair is advanced in the same transaction.
+
+        Parameters
+        ----------
+        connection : psycopg2 connection
+            Database connection object.
+        source_trading_pair_id : int
+            ID of the trading pair holding the fine-grained series, e.g., 1m.
+        target_trading_pair_id : int
+            ID of the trading pair the derived candles are stored under.
+        bucket_width : str
+            PostgreSQL interval literal of the target interval, e.g., '3600 seconds' or '1 month'.
+        since_ms : int, optional
+            Time in milliseconds from whose bucket on the candles are recomputed (default all).
+        table_name : str, optional
+            Target table name in the database (default is 'candlesticks').
+
+        Returns
+        -------
+        int
+            Number of derived candles inserted or changed.
+
+        Raises
+        ------
+        Exception
+            Re-raises any database error after rolling back.
+
+        Notes
+        -----
+        - The last bucket is usually incomplete. Like an open candle fetched from Binance, it is
+          stored with its partial values and completed by the next rollup.
+        - The inserted or changed candles are passed to `on_committed` after the commit.
+        """
+        query = f"""
+            WITH rolled_up AS (
+                INSERT INTO {table_name} ({CANDLESTICK_COLUMNS})
+                SELECT %(target)s,
+                       bucket,
+                       (EXTRACT(EPOCH FROM bucket) * 1000)::BIGINT,
+                       first(open, timestamp),
+                       MAX(high),
+                       MIN(low),
+                       last(close, timestamp),
+                       SUM(volume),
+                       (EXTRACT(EPOCH FROM bucket + %(width)s::INTERVAL) * 1000)::BIGINT - 1,
+                       SUM(number_of_trades)::INTEGER
+                FROM (
+                    SELECT time_bucket(%(width)s::INTERVAL, timestamp) AS bucket, *
+                    FROM {table_name}
+                    WHERE trading_pair_id = %(source)s
+                      AND timestamp >= time_bucket(%(width)s::INTERVAL, to_timestamp(%(since)s / 1000.0))
+                ) AS source_candles
+                GROUP BY bucket
+                ON CONFLICT (trading_pair_id, timestamp) DO UPDATE SET
+                    open_time = EXCLUDED.open_time,
+                    open = EXCLUDED.open,
+                    high = EXCLUDED.high,
+                    low = EXCLUDED.low,
+                    close = EXCLUDED.close,
+                    volume = EXCLUDED.volume,
+                    close_time = EXCLUDED.close_time,
+                    number_of_trades = EXCLUDED.number_of_trades
+                WHERE ({table_name}.open, {table_name}.high, {table_name}.low, {table_name}.close,
+                       {table_name}.volume, {table_name}.close_time, {table_name}.number_of_trades)
+                    IS DISTINCT FROM
+                      (EXCLUDED.open, EXCLUDED.high, EXCLUDED.low, EXCLUDED.close,
+                       EXCLUDED.volume, EXCLUDED.close_time, EXCLUDED.number_of_trades)
+                RETURNING open_time, open, high, low, close, volume, close_time, number_of_trades
+            ), watermark AS (
+                INSERT INTO ingestion_state (trading_pair_id, last_open_time, last_close_time)
+                SELECT %(target)s, MAX(open_time), MAX(close_time)
+                FROM rolled_up
+                HAVING COUNT(*) > 0
+                ON CONFLICT (trading_pair_id) DO UPDATE SET
+                    last_open_time = GREATEST(ingestion_state.last_open_time, EXCLUDED.last_open_time),
+                    last_close_time = GREATEST(ingestion_state.last_close_time, EXCLUDED.last_close_time),
+                    updated_at = now()
+            )
+            SELECT open_time, open, high, low, close, volume, close_time, number_of_trades FROM rolled_up;
+        """
+        params = {"source": source_trading_pair_id, "target": target_trading_pair_id,
+                  "width": bucket_width, "since": since_ms or 0}
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(query, params)
+                rolled_up = cursor.fetchall()
+            connection.commit()
+            affected_rows = len(rolled_up)
+            if rolled_up and self.on_committed is not None:
+                # Hand the changed candles on like fetched ones, e.g., to the candle store
+                df_rolled_up = pd.DataFrame(rolled_up, columns=["open time", "open", "high", "low", "close", "volume",
+                                                                "close time", "number of trades"])
+                df_rolled_up.insert(0, "trading_pair_id", target_trading_pair_id)
+                self.on_committed(df_rolled_up.sort_values("open time", ignore_index=True))
+            self.logger.info(f"Rolled up {affected_rows} candles of trading pair {target_trading_pair_id} "
+                             f"from trading pair {source_trading_pair_id}.")
+            return affected_rows
+        except Exception as e:
+            self.logger.error(f"Error rolling up trading pair {target_trading_pair_id}: {e}")
             connection.rollback()
+            raise
 
     def get_or_create_source(self, connection, source_name: str, source_type: str = "exchange",
                              description: str = None) -> int:
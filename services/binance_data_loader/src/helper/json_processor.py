@@ -3,9 +3,11 @@ Module for loading and saving historical OHLCV data in JSON format.
 
 This module provides two functions: `load_last_close_time_from_json` to load the last close time
 from a JSON file, and `save_to_json` to save OHLCV (Open, High, Low, Close, Volume) data to a JSON file
-for a specified trading symbol and interval.
+for a specified trading symbol and interval. Existing JSON files can be moved into the Parquet
+archive with `migrate_json_to_archive`.
 
 Dependencies:
+    - gzip
     - json
     - pandas
     - pathlib
@@ -22,10 +24,15 @@ Example:
     ```
 """
 
+import gzip
 import json
 import pandas as pd
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    # pyarrow is an optional dependency (requirements-archive.txt)
+    from src.archive.parquet_archive import ParquetCandleArchive
 
 
 def load_last_close_time_from_json(symbol: str, interval: str) -> Optional[int]:
@@ -131,3 +138,48 @@ def save_to_json(data: List[List], symbol: str, interval: str) -> None:
 
     # Save the data to JSON format
     df.to_json(out_json, orient="records", date_format="iso")
+
+
+def migrate_json_to_archive(file_path: Path, archive: "ParquetCandleArchive", symbol: Optional[str] = None,
+                            interval: Optional[str] = None) -> int:
+    """
+    Appends the candles of a JSON file written by `save_to_json` to a Parquet archive.
+
+    Prices and volumes are read as the original decimal strings, so no precision is lost on the
+    way. Candles already contained in the archive are skipped, so a migration can be repeated.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path to a `<symbol>_<interval>.json` file, optionally gzip-compressed (`.json.gz`).
+    archive : ParquetCandleArchive
+        Archive to append the candles to.
+    symbol : str, optional
+        Name of the trading pair. Defaults to the symbol in the file name.
+    interval : str, optional
+        Candlestick interval. Defaults to the interval in the file name.
+
+    Returns
+    -------
+    int
+        Number of candles appended to the archive.
+
+    Examples
+    --------
+    Migrate the sample data:
+
+    ```python
+    archive = ParquetCandleArchive("archive")
+    migrate_json_to_archive(Path("sample_data/LINKUSDT_1h.json.gz"), archive)
+    ```
+    """
+    file_path = Path(file_path)
+    name = file_path.name.split(".")[0]
+    file_symbol, _, file_interval = name.rpartition("_")
+
+    opener = gzip.open if file_path.suffix == ".gz" else open
+    with opener(file_path, "rt") as file:
+        records = json.load(file)
+
+    df = pd.DataFrame.from_records(records)
+    return archive.append_dataframe(symbol or file_symbol, interval or file_interval, df)
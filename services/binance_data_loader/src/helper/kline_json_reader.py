@@ -0,0 +1,158 @@
+"""
+Module for reading large kline JSON files incrementally.
+
+`pd.read_json` needs the whole file as text plus an object-dtype DataFrame in memory, which does
+not work for multi-GB 1m exports. This module provides `iter_kline_json`, which decodes a JSON
+array of klines element by element from a plain or gzip-compressed file and yields fixed-size
+chunks with explicit dtypes, either as DataFrames or as NumPy structured arrays. Only the
+requested columns are materialised, so memory is bounded by the chunk size, not the file size.
+
+Both layouts written in this project are supported: arrays of records as produced by
+`json_processor.save_to_json` (`[{"open time": ..., "open": "0.53", ...}, ...]`) and arrays of
+rows as returned by the Binance REST API (`[[1547632800000, "0.53", ...], ...]`).
+
+Dependencies:
+    - gzip
+    - json
+    - numpy
+    - pandas
+
+Example:
+    Compute the average close price of a gzipped file in constant memory:
+
+    ```python
+    from src.helper.kline_json_reader import iter_kline_json
+
+    total, count = 0.0, 0
+    for chunk in iter_kline_json("sample_data/LINKUSDT_1h.json.gz", columns=["close"]):
+        total += chunk["close"].sum()
+        count += len(chunk)
+    ```
+"""
+import gzip
+import json
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+KLINE_COLUMNS = [
+    'open time', 'open', 'high', 'low', 'close', 'volume',
+    'close time', 'quote asset volume', 'number of trades',
+    'taker buy base asset volume', 'taker buy quote asset volume', 'delete'
+]
+INTEGER_COLUMNS = ('open time', 'close time', 'number of trades')
+
+READ_SIZE = 1 << 20
+
+_WHITESPACE = " \t\r\n"
+
+
+def kline_dtypes(price_dtype: str = "float64") -> Dict[str, str]:
+    """
+    Returns the dtype of every kline column: int64 for times and trade counts, `price_dtype` for
+    prices and volumes and `object` for the unused last field.
+    """
+    dtypes = {column: price_dtype for column in KLINE_COLUMNS}
+    dtypes.update({column: "int64" for column in INTEGER_COLUMNS})
+    dtypes['delete'] = "object"
+    return dtypes
+
+
+def _iter_elements(file, read_size: int = READ_SIZE) -> Iterator[Union[Dict, List]]:
+    """
+    Yields the elements of a top-level JSON array from a text file, reading `read_size`
+    characters at a time.
+    """
+    decoder = json.JSONDecoder()
+    buffer = file.read(read_size).lstrip(_WHITESPACE)
+    if not buffer.startswith("["):
+        raise ValueError("Expected a JSON array of klines")
+    position = 1
+    eof = False
+
+    while True:
+        # Skip separators between elements
+        while position < len(buffer) and buffer[position] in _WHITESPACE + ",":
+            position += 1
+        if position < len(buffer) and buffer[position] == "]":
+            return
+
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The element continues behind the buffer, read more and retry
+            if eof:
+                raise
+            more = file.read(read_size)
+            eof = not more
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+
+        yield element
+        position = end
+
+
+def _rows_to_columns(rows: List, columns: List[str]) -> Dict[str, list]:
+    if rows and isinstance(rows[0], dict):
+        return {column: [row[column] for row in rows] for column in columns}
+    indices = [KLINE_COLUMNS.index(column) for column in columns]
+    return {column: [row[index] for row in rows] for column, index in zip(columns, indices)}
+
+
+def iter_kline_json(file_path: Union[str, Path], chunk_size: int = 100_000, columns: Optional[List[str]] = None,
+                    as_numpy: bool = False, price_dtype: str = "float64") -> Iterator[Union[pd.DataFrame, np.ndarray]]:
+    """
+    Reads a plain or gzip-compressed kline JSON file in chunks.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        Path to a JSON file containing an array of klines; files ending in `.gz` are decompressed
+        on the fly.
+    chunk_size : int
+        Number of klines per chunk.
+    columns : List[str], optional
+        Columns to materialise, e.g., ['open time', 'close']. Defaults to all columns.
+    as_numpy : bool
+        Yield NumPy structured arrays instead of DataFrames.
+    price_dtype : str
+        Dtype of the price and volume columns, e.g., 'float64' or 'float32'.
+
+    Yields
+    ------
+    pd.DataFrame or np.ndarray
+        Up to `chunk_size` klines with int64 times and trade counts and `price_dtype` prices.
+
+    Raises
+    ------
+    ValueError
+        If the file does not contain a JSON array.
+    """
+    file_path = Path(file_path)
+    columns = columns or KLINE_COLUMNS
+    dtypes = kline_dtypes(price_dtype)
+
+    def convert(rows: List) -> Union[pd.DataFrame, np.ndarray]:
+        data = _rows_to_columns(rows, columns)
+        arrays = {column: np.asarray(values, dtype=dtypes[column]) for column, values in data.items()}
+        if not as_numpy:
+            return pd.DataFrame(arrays, columns=columns)
+
+        records = np.empty(len(rows), dtype=[(column, dtypes[column]) for column in columns])
+        for column, values in arrays.items():
+            records[column] = values
+        return records
+
+    opener = gzip.open if file_path.suffix == ".gz" else open
+    with opener(file_path, "rt", encoding="utf-8") as file:
+        rows = []
+        for element in _iter_elements(file):
+            rows.append(element)
+            if len(rows) >= chunk_size:
+                yield convert(rows)
+                rows = []
+        if rows:
+            yield convert(rows)
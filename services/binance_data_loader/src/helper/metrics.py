@@ -0,0 +1,175 @@
+"""
+Module for Prometheus instrumentation of the ingestion pipeline.
+
+The loader's log messages tell what happened, not where the time goes. This module defines the
+counters, histograms and gauges recorded around every stage of an ingestion, all labelled by
+symbol and interval:
+
+- `binance_request_seconds` / `binance_requests_total`: latency and outcome of every klines request,
+- `binance_used_weight`: request weight used by the IP in the current minute, from the
+  `X-MBX-USED-WEIGHT-1M` header,
+- `loader_stage_seconds`: duration of the `json_decode`, `dataframe_build`, `numeric_conversion`,
+  `serialize` and `copy` stages of every page or batch,
+- `loader_rows_written_total` / `loader_copy_rows_per_second`: rows committed to the database,
+- `loader_lag_seconds`: how far the stored data is behind the latest closed candle, computed at
+  scrape time from the last committed close time.
+
+Batches are written with a trading pair ID only, so the database layer maps IDs to labels via
+`register_trading_pair`, which `PostgresOperations.resolve_trading_pairs` calls for every pair.
+The metrics are exposed with `start_metrics`, on an HTTP endpoint, as a node exporter textfile,
+or both.
+
+Dependencies:
+    - prometheus-client
+
+Example:
+    Time a stage and expose the metrics on port 9108:
+
+    ```python
+    from src.helper import metrics
+
+    metrics.start_metrics(port=9108)
+    with metrics.time_stage("dataframe_build", "BTCUSDT", "1m"):
+        df = pd.DataFrame(klines, columns=columns)
+    ```
+"""
+import atexit
+import time
+
+from binance.helpers import interval_to_milliseconds
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY, start_http_server, write_to_textfile
+from typing import Dict, Iterator, Optional, Tuple
+
+# Stage durations range from microseconds (decoding a page) to minutes (a large COPY)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REQUEST_SECONDS = Histogram(
+    "binance_request_seconds", "Latency of single Binance klines requests, failed attempts included.",
+    ["symbol", "interval"], buckets=STAGE_BUCKETS)
+REQUESTS = Counter(
+    "binance_requests_total", "Binance klines requests by HTTP status ('network' for connection errors).",
+    ["symbol", "interval", "status"])
+USED_WEIGHT = Gauge(
+    "binance_used_weight", "Request weight used by this IP in the current minute, as reported by Binance.")
+STAGE_SECONDS = Histogram(
+    "loader_stage_seconds", "Duration of an ingestion stage for one page or batch.",
+    ["stage", "symbol", "interval"], buckets=STAGE_BUCKETS)
+ROWS_WRITTEN = Counter(
+    "loader_rows_written_total", "Candles committed to the database.", ["symbol", "interval"])
+COPY_ROWS_PER_SECOND = Gauge(
+    "loader_copy_rows_per_second", "Throughput of the last COPY.", ["symbol", "interval"])
+LAG_SECONDS = Gauge(
+    "loader_lag_seconds", "Time between the latest closed candle and the last committed candle.",
+    ["symbol", "interval"])
+
+# Label of batches spanning several trading pairs
+MULTIPLE_PAIRS = ("*", "*")
+
+_trading_pairs: Dict[int, Tuple[str, str]] = {}
+_last_close_times: Dict[Tuple[str, str], int] = {}
+_textfile: Optional[str] = None
+
+
+def register_trading_pair(trading_pair_id: int, symbol: str, interval: str) -> None:
+    """
+    Registers the labels of a trading pair ID, so batches identified by their ID are labelled.
+    """
+    _trading_pairs[trading_pair_id] = (symbol, interval)
+
+
+def pair_labels(trading_pair_id: int) -> Tuple[str, str]:
+    """
+    Returns the (symbol, interval) labels of a trading pair ID, or empty labels if unknown.
+    """
+    return _trading_pairs.get(trading_pair_id, ("", ""))
+
+
+def batch_labels(trading_pair_ids) -> Tuple[str, str]:
+    """
+    Returns the labels of a batch: those of its trading pair, or `*` if it spans several pairs.
+    """
+    trading_pair_ids = set(trading_pair_ids)
+    if len(trading_pair_ids) != 1:
+        return MULTIPLE_PAIRS
+    return pair_labels(int(trading_pair_ids.pop()))
+
+
+@contextmanager
+def time_stage(stage: str, symbol: str = "", interval: str = "") -> Iterator[None]:
+    """
+    Observes the duration of the enclosed block in `loader_stage_seconds`.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage, symbol, interval).observe(time.perf_counter() - start)
+
+
+def observe_request(symbol: str, interval: str, status: str, seconds: float) -> None:
+    """
+    Records the outcome and latency of a klines request.
+    """
+    REQUESTS.labels(symbol, interval, status).inc()
+    REQUEST_SECONDS.labels(symbol, interval).observe(seconds)
+
+
+def observe_copy(labels: Tuple[str, str], rows: int, seconds: float) -> None:
+    """
+    Records the duration and throughput of a COPY of `rows` rows.
+    """
+    STAGE_SECONDS.labels("copy", *labels).observe(seconds)
+    if seconds > 0:
+        COPY_ROWS_PER_SECOND.labels(*labels).set(rows / seconds)
+
+
+def observe_committed(trading_pair_id: int, rows: int, last_close_time: int) -> None:
+    """
+    Records committed rows of a trading pair and its new last close time for the lag gauge.
+    """
+    labels = pair_labels(trading_pair_id)
+    ROWS_WRITTEN.labels(*labels).inc(rows)
+
+    if labels not in _last_close_times:
+        LAG_SECONDS.labels(*labels).set_function(lambda: lag_seconds(labels))
+    _last_close_times[labels] = max(_last_close_times.get(labels, 0), last_close_time)
+
+
+def lag_seconds(labels: Tuple[str, str], now_ms: Optional[int] = None) -> float:
+    """
+    Returns the seconds between the close of the latest closed candle and the last committed one.
+    """
+    now_ms = now_ms or int(time.time() * 1000)
+    step = interval_to_milliseconds(labels[1])
+    # Close time of the latest candle that has closed; intervals without a fixed length use now
+    latest_close_time = now_ms // step * step - 1 if step else now_ms
+    return max(0.0, (latest_close_time - _last_close_times[labels]) / 1000)
+
+
+def start_metrics(port: Optional[int] = None, textfile: Optional[str] = None) -> None:
+    """
+    Exposes the metrics on an HTTP endpoint and/or writes them to a textfile at exit.
+
+    Parameters
+    ----------
+    port : int, optional
+        Port of the `/metrics` endpoint, e.g., 9108. Not started if None.
+    textfile : str, optional
+        Path of a `.prom` file for the node exporter's textfile collector, written when the
+        process exits and whenever `write_textfile` is called. Not written if None.
+    """
+    global _textfile
+    if port:
+        start_http_server(port)
+    if textfile:
+        _textfile = textfile
+        atexit.register(write_textfile)
+
+
+def write_textfile() -> None:
+    """
+    Writes the current metrics to the textfile configured in `start_metrics`, if any.
+    """
+    if _textfile:
+        write_to_textfile(_textfile, REGISTRY)
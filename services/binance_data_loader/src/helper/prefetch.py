@@ -0,0 +1,99 @@
+"""
+Module for overlapping a producer iterator with its consumer through a bounded queue.
+
+This module provides the `prefetch` function, which runs an iterator (for example the Binance page
+fetcher) in a background thread while the caller consumes its items (for example the database
+writer). The queue between both sides holds at most `max_pending` items: once it is full the
+producer blocks until the consumer catches up, which gives natural backpressure and keeps memory
+bounded.
+
+Dependencies:
+    - queue
+    - threading
+    - typing
+
+Example:
+    Fetch the next batches while the current one is being written:
+
+    ```python
+    from src.helper.prefetch import prefetch
+
+    batches = bh.iter_candlestick_batches(client, "BNBBTC", "1m", start_ts)
+    for df in prefetch(batches, max_pending=2):
+        write(df)
+    ```
+"""
+import queue
+import threading
+
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _ProducerError:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(iterable: Iterable[T], max_pending: int = 2) -> Iterator[T]:
+    """
+    Iterates over `iterable` in a background thread, keeping at most `max_pending` items ahead.
+
+    Parameters
+    ----------
+    iterable : Iterable[T]
+        Producer to run in the background.
+    max_pending : int
+        Maximum number of produced items waiting to be consumed.
+
+    Yields
+    ------
+    T
+        The items of `iterable`, in order.
+
+    Raises
+    ------
+    Exception
+        Any exception raised by the producer is re-raised in the consumer.
+
+    Notes
+    -----
+    - If the consumer stops early, the producer is signalled to stop after its current item.
+    """
+    items = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_ProducerError(e))
+            return
+        put(_DONE)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,87 @@
+"""
+Module for planning which candlestick intervals are derived locally from 1m data.
+
+Every Binance interval from 3m up to 1M is an exact aggregation of 1m candles: the open of the
+first minute, the highest high, the lowest low, the close of the last minute and the sums of volume
+and number of trades. If `trading_pairs.yml` lists the same symbol at 1m and at coarser intervals,
+downloading the coarser intervals again is redundant. This module splits the configured trading
+pairs into the ones that have to be downloaded and the ones that are rolled up from the stored 1m
+series, and maps Binance intervals to the bucket widths used by TimescaleDB's `time_bucket`.
+
+Dependencies:
+    - python-binance
+    - typing
+
+Example:
+    Download only the 1m series and derive the 1h series from it:
+
+    ```python
+    from src.helper.rollup import plan_rollups
+
+    pairs = [{'symbol': 'BTCUSDT', 'interval': '1m', 'start_date': '1 Jan, 2024'},
+             {'symbol': 'BTCUSDT', 'interval': '1h', 'start_date': '1 Jan, 2024'}]
+    download_pairs, rollups = plan_rollups(pairs)
+    # download_pairs == [pairs[0]], rollups == {('BTCUSDT', '1m'): ['1h']}
+    ```
+"""
+from binance.helpers import interval_to_milliseconds
+from typing import Dict, List, Tuple
+
+ROLLUP_SOURCE_INTERVAL = "1m"
+ROLLUP_SOURCE_MS = 60_000
+
+
+def rollup_bucket_width(interval: str) -> str:
+    """
+    Returns the PostgreSQL interval literal of a Binance candlestick interval, e.g., '3600 seconds' for '1h'.
+
+    Monthly candles follow calendar months and are mapped to '1 month'. Fixed-width buckets use
+    TimescaleDB's default origin (Monday, 2000-01-03), which matches the alignment of Binance's
+    daily, 3-day and weekly candles.
+    """
+    if interval == "1M":
+        return "1 month"
+
+    step = interval_to_milliseconds(interval)
+    if step is None or step <= ROLLUP_SOURCE_MS or step % ROLLUP_SOURCE_MS:
+        raise ValueError(f"Interval '{interval}' cannot be derived from {ROLLUP_SOURCE_INTERVAL} candles")
+    return f"{step // 1000} seconds"
+
+
+def is_rollup_interval(interval: str) -> bool:
+    """
+    Returns whether candles of `interval` can be derived from 1m candles.
+    """
+    try:
+        rollup_bucket_width(interval)
+        return True
+    except ValueError:
+        return False
+
+
+def plan_rollups(pairs: List[Dict]) -> Tuple[List[Dict], Dict[Tuple[str, str], List[str]]]:
+    """
+    Splits trading pairs into pairs to download and intervals to derive from a configured 1m pair.
+
+    Parameters
+    ----------
+    pairs : List[Dict]
+        List of trading pair configurations with each dictionary containing 'symbol',
+        'interval', and 'start_date' keys.
+
+    Returns
+    -------
+    Tuple[List[Dict], Dict[Tuple[str, str], List[str]]]
+        The pairs to download from Binance, and for every (symbol, '1m') source pair the
+        intervals that are rolled up from it.
+    """
+    sources = {pair['symbol'] for pair in pairs if pair['interval'] == ROLLUP_SOURCE_INTERVAL}
+
+    download_pairs = []
+    rollups: Dict[Tuple[str, str], List[str]] = {}
+    for pair in pairs:
+        if pair['symbol'] in sources and is_rollup_interval(pair['interval']):
+            rollups.setdefault((pair['symbol'], ROLLUP_SOURCE_INTERVAL), []).append(pair['interval'])
+        else:
+            download_pairs.append(pair)
+    return download_pairs, rollups
@@ -0,0 +1,134 @@
+"""
+Module for scheduling work at candlestick close boundaries.
+
+Binance candles of a fixed interval close on exact multiples of the interval (weekly candles are
+aligned to Monday 00:00 UTC). This module provides `next_close_boundary`, which computes the next
+close boundary of an interval, and the `CandleCloseScheduler` class, which keeps the next boundary
+of every registered trading pair in a heap and sleeps until the earliest one is due. Between two
+boundaries the caller is blocked in a single timed wait, so idle CPU usage stays near zero.
+
+Dependencies:
+    - heapq
+    - python-binance
+    - threading
+    - time
+
+Example:
+    Wake up whenever a 1m or 1h candle of a pair has closed:
+
+    ```python
+    import threading
+    from src.scheduler.candle_scheduler import CandleCloseScheduler
+
+    stop = threading.Event()
+    scheduler = CandleCloseScheduler(settle_ms=1000)
+    scheduler.add(("BTCUSDT", "1m"), "1m")
+    scheduler.add(("BTCUSDT", "1h"), "1h")
+
+    while not stop.is_set():
+        for key, boundary in scheduler.wait_next(stop):
+            print(f"{key} closed a candle at {boundary}")
+    ```
+"""
+import heapq
+import threading
+import time
+
+from binance.helpers import interval_to_milliseconds
+from typing import Hashable, List, Optional, Tuple
+
+# Binance weeks start on Monday, while the Unix epoch (1970-01-01) was a Thursday
+WEEK_OFFSET_MS = 4 * 24 * 60 * 60 * 1000
+WEEK_MS = 7 * 24 * 60 * 60 * 1000
+
+
+def next_close_boundary(now_ms: int, interval: str) -> int:
+    """
+    Returns the end of the candle of `interval` that is open at `now_ms`.
+
+    The boundary is the open time of the next candle, i.e. the close time of the current candle
+    plus one millisecond.
+
+    Parameters
+    ----------
+    now_ms : int
+        Current time in milliseconds.
+    interval : str
+        Candlestick interval, e.g., "1m" for 1 minute.
+
+    Returns
+    -------
+    int
+        Next close boundary in milliseconds.
+    """
+    step = interval_to_milliseconds(interval)
+    if step is None:
+        raise ValueError(f"Unsupported interval for scheduling: '{interval}'")
+
+    offset = WEEK_OFFSET_MS if step % WEEK_MS == 0 else 0
+    return ((now_ms - offset) // step + 1) * step + offset
+
+
+class CandleCloseScheduler:
+    def __init__(self, settle_ms: int = 1000):
+        """
+        Initialize the CandleCloseScheduler class.
+
+        Args:
+            settle_ms: Delay after a close boundary before the entry is due, giving Binance time
+                to finalise the closed candle.
+        """
+        self.settle_ms = settle_ms
+        self._heap: List[Tuple[int, int, Hashable, str]] = []
+        self._counter = 0
+
+    def add(self, key: Hashable, interval: str, now_ms: Optional[int] = None) -> None:
+        """
+        Registers `key` to become due after every close boundary of `interval`.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifier returned by `wait_next`, e.g., a (symbol, interval) tuple.
+        interval : str
+            Candlestick interval, e.g., "1m" for 1 minute.
+        now_ms : int, optional
+            Current time in milliseconds. Defaults to the system clock.
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        self._counter += 1
+        heapq.heappush(self._heap, (next_close_boundary(now_ms, interval), self._counter, key, interval))
+
+    def wait_next(self, stop: threading.Event) -> List[Tuple[Hashable, int]]:
+        """
+        Sleeps until the earliest close boundary is due and returns all entries due by then.
+
+        Every returned entry is rescheduled for its following boundary.
+
+        Parameters
+        ----------
+        stop : threading.Event
+            Interrupts the wait when set; an empty list is returned in that case.
+
+        Returns
+        -------
+        List[Tuple[Hashable, int]]
+            (key, close boundary in milliseconds) of every due entry.
+        """
+        if not self._heap:
+            stop.wait()
+            return []
+
+        due_at = self._heap[0][0] + self.settle_ms
+        timeout = max(0.0, (due_at - time.time() * 1000) / 1000)
+        if stop.wait(timeout):
+            return []
+
+        now_ms = int(time.time() * 1000)
+        due = []
+        while self._heap and self._heap[0][0] + self.settle_ms <= now_ms:
+            boundary, _, key, interval = heapq.heappop(self._heap)
+            due.append((key, boundary))
+            self.add(key, interval, max(now_ms, boundary))
+        return due
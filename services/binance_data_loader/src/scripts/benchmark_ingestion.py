@@ -0,0 +1,275 @@
+"""
+Script for benchmarking the whole ingestion path, from HTTP request to committed rows, offline.
+
+A `FakeBinanceServer` serves `/api/v3/klines` and `/sapi/v1/system/status`: the recorded 1h
+history of `sample_data/LINKUSDT_1h.json.gz` plus a number of synthetic 1m series. A scratch
+database is created on the configured PostgreSQL server and initialised with
+`infra/postgres/timescale_init.sql`, so every run starts from empty tables. The loader then runs
+`process_trading_pairs` (or `process_trading_pairs_concurrently` with `workers` > 1) in a fresh
+child process, with the `loader` settings given by `--set`.
+
+The result contains the rows written per second, the peak resident memory of the loader process,
+the time spent per request and per stage (from the Prometheus metrics of `src.helper.metrics`),
+the benchmark parameters and the git commit. It is printed and stored as JSON, and `--compare`
+prints the change against an earlier result, so regressions can be spotted between commits.
+
+Dependencies:
+    - aiohttp
+    - multiprocessing
+    - psycopg2
+    - resource
+
+Example:
+    Compare streaming passthrough mode with the result of the previous commit:
+
+    ```bash
+    python -m src.scripts.benchmark_ingestion --config /app/config.yml --synthetic-pairs 4 \\
+        --synthetic-candles 200000 --set streaming=true --set numeric_mode=passthrough \\
+        --compare benchmark_results/previous.json
+    ```
+"""
+import argparse
+import gzip
+import json
+import logging
+import multiprocessing
+import queue
+import resource
+import subprocess
+import time
+import traceback
+import psycopg2
+import yaml
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from src.config.config_loader import load_config
+from src.data_download.fake_binance_server import FakeBinanceServer
+from src.helper.kline_json_reader import KLINE_COLUMNS
+
+SERVICE_DIR = Path(__file__).resolve().parents[2]
+REPO_DIR = SERVICE_DIR.parents[1]
+
+# Large enough to never throttle the benchmark
+UNLIMITED_WEIGHT = 10 ** 9
+
+
+def load_recorded_klines(file_path: Path) -> List[List]:
+    """
+    Reads a kline JSON file as written by `json_processor.save_to_json` into Binance's row layout.
+    """
+    with gzip.open(file_path, "rt") if file_path.suffix == ".gz" else open(file_path) as file:
+        return [[kline[column] for column in KLINE_COLUMNS] for kline in json.load(file)]
+
+
+def prepare_database(db_params: Dict, database: str, init_sql: Path) -> Dict:
+    """
+    (Re)creates the scratch database, initialises it with `init_sql` and returns its parameters.
+    """
+    connection = psycopg2.connect(**db_params)
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP DATABASE IF EXISTS "{database}"')
+        cursor.execute(f'CREATE DATABASE "{database}"')
+    connection.close()
+
+    benchmark_params = dict(db_params, dbname=database)
+    connection = psycopg2.connect(**benchmark_params)
+    with connection.cursor() as cursor:
+        cursor.execute(init_sql.read_text())
+    connection.commit()
+    connection.close()
+    return benchmark_params
+
+
+def summarize_histogram(histogram, label: str) -> Dict[str, Dict[str, float]]:
+    """
+    Sums the count and seconds of a Prometheus histogram over all label values except `label`.
+    """
+    summary = {}
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            suffix = sample.name.rsplit("_", 1)[-1]
+            if suffix not in ("count", "sum"):
+                continue
+            entry = summary.setdefault(sample.labels.get(label, "all"), {"count": 0, "seconds": 0.0})
+            entry["count" if suffix == "count" else "seconds"] += sample.value
+    return summary
+
+
+def run_loader(pairs: List[Dict], db_params: Dict, settings: Dict, base_url: str, results) -> None:
+    """
+    Runs the loader in the current (child) process and puts its measurements into `results`.
+
+    If the loader fails, `{"error": <traceback>}` is put instead, so the parent does not wait forever.
+    """
+    try:
+        measurements = measure_loader(pairs, db_params, settings, base_url)
+    except BaseException:
+        results.put({"error": traceback.format_exc()})
+        raise
+    results.put(measurements)
+
+
+def measure_loader(pairs: List[Dict], db_params: Dict, settings: Dict, base_url: str) -> Dict:
+    """
+    Runs the loader with the given settings against the fake server and returns its measurements.
+    """
+    import load_binance_data
+    from binance.client import Client
+    from src.data_download.rate_limiter import WeightRateLimiter
+    from src.helper import metrics
+
+    logging.basicConfig(level=logging.WARNING)
+    load_binance_data.logger = logging.getLogger("benchmark")
+
+    client = Client(ping=False)
+    client.API_URL = base_url + "/api"
+    client.MARGIN_API_URL = base_url + "/sapi"
+
+    start = time.perf_counter()
+    workers = settings.get('workers', 1)
+    if workers > 1 or settings.get('spool_path'):
+        load_binance_data.process_trading_pairs_concurrently(
+            pairs, client, db_params, workers, WeightRateLimiter(UNLIMITED_WEIGHT), settings)
+    else:
+        connection = psycopg2.connect(**db_params)
+        load_binance_data.process_trading_pairs(pairs, client, connection, settings)
+        connection.close()
+    elapsed = time.perf_counter() - start
+
+    rows = sum(sample.value for metric in metrics.ROWS_WRITTEN.collect() for sample in metric.samples
+               if sample.name.endswith("_total"))
+    return {
+        "rows": int(rows),
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "requests": summarize_histogram(metrics.REQUEST_SECONDS, "none").get("all", {"count": 0, "seconds": 0.0}),
+        "stages": summarize_histogram(metrics.STAGE_SECONDS, "stage"),
+    }
+
+
+def wait_for_measurements(process, results) -> Dict:
+    """
+    Waits for the measurements of the loader process, failing if it exits without sending them.
+    """
+    while True:
+        exited = process.exitcode is not None
+        try:
+            # A result sent right before exiting is still read after the exit was noticed
+            measurements = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if exited:
+                raise RuntimeError(f"Loader process exited with code {process.exitcode} without a result.")
+    if "error" in measurements:
+        raise RuntimeError(f"Loader failed:\n{measurements['error']}")
+    return measurements
+
+
+def count_rows(db_params: Dict) -> int:
+    connection = psycopg2.connect(**db_params)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM candlesticks")
+        rows = cursor.fetchone()[0]
+    connection.close()
+    return rows
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(result: Dict, baseline: Dict) -> None:
+    def change(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"\nCompared with {baseline.get('commit')} ({baseline.get('created_at')}):")
+    for key in ("rows_per_second", "peak_rss_mb", "seconds"):
+        print(f"  {key:<24}{baseline[key]:>14,.1f} -> {result[key]:>14,.1f}  {change(result[key], baseline[key])}")
+    for stage, entry in sorted(result["stages"].items()):
+        old = baseline["stages"].get(stage, {}).get("seconds", 0.0)
+        print(f"  {'stage ' + stage:<24}{old:>14,.2f} -> {entry['seconds']:>14,.2f}  {change(entry['seconds'], old)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion path against a fake Binance server.")
+    parser.add_argument("--config", type=Path, default=Path("/app/config.yml"),
+                        help="config.yml whose 'postgres' section points to a TimescaleDB server.")
+    parser.add_argument("--database", default="binance_benchmark", help="Scratch database, dropped and recreated.")
+    parser.add_argument("--init-sql", type=Path, default=REPO_DIR / "infra/postgres/timescale_init.sql")
+    parser.add_argument("--recorded", type=Path, default=REPO_DIR / "sample_data/LINKUSDT_1h.json.gz",
+                        help="Kline JSON file served as LINKUSDT 1h.")
+    parser.add_argument("--synthetic-pairs", type=int, default=2)
+    parser.add_argument("--synthetic-candles", type=int, default=100_000, help="Approximate 1m candles per pair.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Response latency of the fake server in seconds.")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Loader setting, e.g., streaming=true. Can be repeated.")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Result file, defaults to benchmark_results/<commit>-<time>.json.")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result to compare with.")
+    args = parser.parse_args()
+
+    settings = {"max_weight_per_minute": UNLIMITED_WEIGHT}
+    for assignment in args.set:
+        key, value = assignment.split("=", 1)
+        settings[key] = yaml.safe_load(value)
+
+    # Synthetic series start at midnight, so their start_date is exactly the listing date
+    listing_time = (int(time.time() * 1000) - args.synthetic_candles * 60_000) // 86_400_000 * 86_400_000
+    server = FakeBinanceServer(port=args.port, listing_time=listing_time, latency=args.latency)
+    recorded = load_recorded_klines(args.recorded)
+    server.add_series("LINKUSDT", "1h", recorded)
+    listing_date = datetime.fromtimestamp(listing_time / 1000, timezone.utc).strftime("%d %b, %Y")
+    recorded_date = datetime.fromtimestamp(recorded[0][0] / 1000, timezone.utc).strftime("%d %b, %Y")
+    pairs = [{"symbol": "LINKUSDT", "interval": "1h", "start_date": recorded_date}] + [
+        {"symbol": f"SYN{i}USDT", "interval": "1m", "start_date": listing_date} for i in range(args.synthetic_pairs)
+    ]
+    base_url = f"http://localhost:{args.port}"
+    settings.setdefault("api_url", base_url)
+
+    db_params = prepare_database(load_config(args.config)["postgres"], args.database, args.init_sql)
+    stop = server.start_in_thread()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run_loader, args=(pairs, db_params, settings, base_url, results))
+    process.start()
+    try:
+        measurements = wait_for_measurements(process, results)
+    finally:
+        process.join()
+        stop.set()
+
+    commit = git_commit()
+    created_at = datetime.now(timezone.utc)
+    result = {
+        "commit": commit,
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "scenario": {
+            "recorded": str(args.recorded.name), "recorded_candles": len(recorded),
+            "synthetic_pairs": args.synthetic_pairs, "synthetic_candles": args.synthetic_candles,
+            "latency": args.latency,
+        },
+        "settings": settings,
+        "rows_in_database": count_rows(db_params),
+        "server_requests": server.requests,
+        **measurements,
+    }
+    print(json.dumps(result, indent=2))
+
+    output = args.output or SERVICE_DIR / "benchmark_results" / f"{commit}-{created_at:%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Result written to '{output}'.")
+
+    if args.compare:
+        print_comparison(result, json.loads(args.compare.read_text()))
@@ -0,0 +1,101 @@
+"""
+Script for comparing the streaming kline JSON reader with `load_json_to_dataframe`.
+
+Both readers process the same file in a fresh child process each, so their peak resident memory
+can be compared directly: `load_json_to_dataframe` reads the whole file with `pd.read_json`, the
+streaming reader yields chunks of `--chunk-size` klines with explicit dtypes and only keeps the
+running sum of the close price. To measure a file that is larger than the sample data, `--repeat`
+writes a gzipped copy of the input with its klines repeated N times (and shifted in time) first.
+
+Dependencies:
+    - gzip
+    - json
+    - multiprocessing
+    - resource
+
+Example:
+    Compare both readers on the sample data repeated 20 times (about 1M klines):
+
+    ```bash
+    python -m src.scripts.benchmark_json_reader --file ../../sample_data/LINKUSDT_1h.json.gz --repeat 20
+    ```
+"""
+import argparse
+import gzip
+import json
+import multiprocessing
+import resource
+import tempfile
+import time
+
+from pathlib import Path
+
+from src.helper.kline_json_reader import iter_kline_json
+from src.scripts.load_json_to_dataframe import load_json_to_dataframe
+
+
+def write_repeated_file(file_path: Path, repeat: int, output_path: Path) -> None:
+    with gzip.open(file_path, "rt") if file_path.suffix == ".gz" else open(file_path) as file:
+        klines = json.load(file)
+    span = klines[-1]["close time"] - klines[0]["open time"] + 1
+
+    with gzip.open(output_path, "wt", compresslevel=1) as file:
+        file.write("[")
+        for i in range(repeat):
+            for j, kline in enumerate(klines):
+                shifted = dict(kline, **{"open time": kline["open time"] + i * span,
+                                         "close time": kline["close time"] + i * span})
+                file.write(("," if i or j else "") + json.dumps(shifted, separators=(",", ":")))
+        file.write("]")
+
+
+def run_read_json(file_path: Path, chunk_size: int) -> dict:
+    df = load_json_to_dataframe(file_path)
+    return {"rows": len(df), "close_sum": float(df["close"].astype(float).sum())}
+
+
+def run_streaming(file_path: Path, chunk_size: int) -> dict:
+    rows, close_sum = 0, 0.0
+    for chunk in iter_kline_json(file_path, chunk_size=chunk_size, columns=["open time", "close"], as_numpy=True):
+        rows += len(chunk)
+        close_sum += float(chunk["close"].sum())
+    return {"rows": rows, "close_sum": close_sum}
+
+
+def _child(target, file_path: Path, chunk_size: int, results) -> None:
+    start = time.perf_counter()
+    result = target(file_path, chunk_size)
+    result["seconds"] = time.perf_counter() - start
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put(result)
+
+
+def measure(target, file_path: Path, chunk_size: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_child, args=(target, file_path, chunk_size, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming kline JSON reader against pd.read_json.")
+    parser.add_argument("--file", type=Path, default=Path("../../sample_data/LINKUSDT_1h.json.gz"))
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = args.file
+        if args.repeat > 1:
+            # The file name must keep the '<symbol>_<interval>.json' format for load_json_to_dataframe
+            file_path = Path(tmp_dir) / "BENCHMARK_1m.json.gz"
+            write_repeated_file(args.file, args.repeat, file_path)
+
+        print(f"{'reader':<24}{'rows':>12}{'seconds':>10}{'rows/s':>12}{'peak RSS MB':>14}")
+        for name, target in [("load_json_to_dataframe", run_read_json), ("iter_kline_json", run_streaming)]:
+            result = measure(target, file_path, args.chunk_size)
+            print(f"{name:<24}{result['rows']:>12,}{result['seconds']:>10.2f}"
+                  f"{result['rows'] / result['seconds']:>12,.0f}{result['peak_rss_mb']:>14,.0f}")
@@ -0,0 +1,82 @@
+"""
+Script for testing the throughput and reconnect behaviour of the kline stream ingestion offline.
+
+This script starts a `FakeKlineServer` and a `KlineStreamIngestor` in the same event loop, lets
+them run for a number of seconds and reports how many closed candles per second reached the
+writer callback, how many micro-batches were written, how many reconnects happened and for how
+many pairs a backfill was requested. No network access or database is needed.
+
+Dependencies:
+    - asyncio
+    - websockets
+
+Example:
+    Stream 300 pairs, dropping every connection after 20,000 messages:
+
+    ```bash
+    python -m src.scripts.benchmark_kline_stream --pairs 300 --seconds 10 --drop-after 20000
+    ```
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from src.streaming.fake_kline_server import FakeKlineServer
+from src.streaming.kline_stream import KlineStreamIngestor
+
+
+async def run_benchmark(pairs: int, seconds: float, port: int, drop_after: int, batch_size: int,
+                        streams_per_connection: int) -> None:
+    written = {"rows": 0, "batches": 0, "backfills": 0}
+
+    def write_batch(rows_by_pair):
+        written["rows"] += sum(len(rows) for rows in rows_by_pair.values())
+        written["batches"] += 1
+
+    def backfill(key, last_close_time):
+        written["backfills"] += 1
+
+    server = FakeKlineServer(port=port, drop_after=drop_after)
+    ingestor = KlineStreamIngestor(
+        logging.getLogger(__name__),
+        [(f"PAIR{i}USDT", "1m") for i in range(pairs)],
+        write_batch, backfill,
+        url=f"ws://localhost:{port}/stream",
+        streams_per_connection=streams_per_connection,
+        batch_size=batch_size,
+    )
+
+    stop_server, stop_ingestor = asyncio.Event(), asyncio.Event()
+    server_task = asyncio.create_task(server.serve_forever(stop_server))
+    await asyncio.sleep(0.2)
+
+    start = time.perf_counter()
+    ingestor_task = asyncio.create_task(ingestor.run(stop_ingestor))
+    await asyncio.sleep(seconds)
+    stop_ingestor.set()
+    await ingestor_task
+    elapsed = time.perf_counter() - start
+    stop_server.set()
+    await server_task
+
+    print(f"closed candles sent:     {server.closed_candles_sent:>10,}")
+    print(f"closed candles written:  {written['rows']:>10,} ({written['rows'] / elapsed:,.0f}/s)")
+    print(f"batches written:         {written['batches']:>10,}")
+    print(f"connections accepted:    {server.connections:>10,}")
+    print(f"reconnects:              {ingestor.reconnects:>10,}")
+    print(f"backfills requested:     {written['backfills']:>10,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark kline stream ingestion against a local fake server.")
+    parser.add_argument("--pairs", type=int, default=300)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--drop-after", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--streams-per-connection", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.pairs, args.seconds, args.port, args.drop_after, args.batch_size,
+                              args.streams_per_connection))
@@ -0,0 +1,86 @@
+"""
+Script for benchmarking the numeric conversion modes of `BinanceDataLoader`.
+
+This script measures the CPU cost of turning raw Binance klines into the CSV text sent to
+PostgreSQL COPY, once with the per-cell `Decimal` conversion (`numeric_mode="decimal"`) and once
+with the validated string pass-through (`numeric_mode="passthrough"`). The klines are taken from
+`sample_data/LINKUSDT_1h.json.gz`, repeated to reach a meaningful row count, and the result is
+printed as rows per second for each mode, for the DataFrame build alone and including the CSV
+serialisation done by `PostgresOperations`.
+
+Dependencies:
+    - pandas
+    - python-binance
+
+Example:
+    Run the benchmark from the `services/binance_data_loader` directory:
+
+    ```bash
+    python -m src.scripts.benchmark_numeric_conversion --repeat 20 --rounds 3
+    ```
+"""
+import argparse
+import gzip
+import json
+import logging
+import time
+
+from io import StringIO
+from pathlib import Path
+from typing import List, Tuple
+
+from src.data_download.binance_data_loader import BinanceDataLoader
+
+DEFAULT_FIXTURE = Path(__file__).resolve().parents[4] / "sample_data" / "LINKUSDT_1h.json.gz"
+
+COLUMNS = [
+    'open time', 'open', 'high', 'low', 'close', 'volume',
+    'close time', 'quote asset volume', 'number of trades',
+    'taker buy base asset volume', 'taker buy quote asset volume', "delete"
+]
+
+
+def load_fixture_klines(file_path: Path, repeat: int) -> List[List]:
+    """
+    Loads the records of a gzipped JSON fixture as raw kline rows, repeated `repeat` times.
+    """
+    with gzip.open(file_path, "rt") as file:
+        records = json.load(file)
+    klines = [[record[column] for column in COLUMNS] for record in records]
+    return klines * repeat
+
+
+def run_mode(klines: List[List], numeric_mode: str, rounds: int) -> Tuple[float, float]:
+    """
+    Returns the best rows/s of `rounds` runs for the DataFrame build alone and for the DataFrame
+    build plus CSV serialisation.
+    """
+    loader = BinanceDataLoader(logging.getLogger(__name__), numeric_mode=numeric_mode)
+    best_build, best_total = 0.0, 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        df = loader.build_candlestick_dataframe(klines)
+        built = time.perf_counter()
+        df.to_csv(StringIO(), index=False, header=False)
+        done = time.perf_counter()
+        best_build = max(best_build, len(klines) / (built - start))
+        best_total = max(best_total, len(klines) / (done - start))
+    return best_build, best_total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the numeric conversion modes of the loader.")
+    parser.add_argument("--fixture", type=Path, default=DEFAULT_FIXTURE, help="Gzipped JSON kline fixture.")
+    parser.add_argument("--repeat", type=int, default=20, help="How often the fixture rows are repeated.")
+    parser.add_argument("--rounds", type=int, default=3, help="Runs per mode, the best one is reported.")
+    args = parser.parse_args()
+
+    klines = load_fixture_klines(args.fixture, args.repeat)
+    print(f"Benchmarking {len(klines)} rows from {args.fixture.name}")
+
+    results = {mode: run_mode(klines, mode, args.rounds) for mode in ("decimal", "passthrough")}
+    print(f"{'mode':>12}  {'build rows/s':>14}  {'build+csv rows/s':>16}")
+    for mode, (build, total) in results.items():
+        print(f"{mode:>12}  {build:>14,.0f}  {total:>16,.0f}")
+    speedup = [after / before for before, after in zip(results["decimal"], results["passthrough"])]
+    print(f"{'speedup':>12}  {speedup[0]:>13.2f}x  {speedup[1]:>15.2f}x")
@@ -0,0 +1,135 @@
+"""
+Local fake of the Binance combined kline stream endpoint for offline testing.
+
+This module provides the `FakeKlineServer` class, a WebSocket server that speaks the message
+format of `wss://stream.binance.com:9443/stream?streams=...`. For every subscribed stream it
+emits synthetic kline events: `updates_per_candle - 1` updates of the open candle followed by the
+closing event (`x=true`), after which the next candle starts. Messages are sent as fast as possible
+or at a fixed rate, and connections can be dropped after a number of messages to exercise the
+reconnect and backfill logic of `KlineStreamIngestor`.
+
+Dependencies:
+    - asyncio
+    - json
+    - python-binance
+    - websockets
+
+Example:
+    Run a server that drops every connection after 50,000 messages:
+
+    ```bash
+    python -m src.streaming.fake_kline_server --port 8765 --drop-after 50000
+    ```
+
+    and point the ingestor at `ws://localhost:8765/stream`.
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from binance.helpers import interval_to_milliseconds
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+# First candle open time of every stream (2024-01-01 00:00:00 UTC)
+START_TIME_MS = 1_704_067_200_000
+
+
+class FakeKlineServer:
+    def __init__(self, host: str = "localhost", port: int = 8765, updates_per_candle: int = 2,
+                 messages_per_second: Optional[float] = None, drop_after: Optional[int] = None):
+        """
+        Initialize the FakeKlineServer class.
+
+        Args:
+            host: Interface to listen on.
+            port: Port to listen on.
+            updates_per_candle: Events per candle and stream, the last one closes the candle.
+            messages_per_second: Send rate per connection, or `None` to send as fast as possible.
+            drop_after: Close every connection after this many messages, or `None` to never drop.
+        """
+        self.host = host
+        self.port = port
+        self.updates_per_candle = updates_per_candle
+        self.messages_per_second = messages_per_second
+        self.drop_after = drop_after
+        self.connections = 0
+        self.messages_sent = 0
+        self.closed_candles_sent = 0
+        # Candle index per stream survives reconnects, like the real market does
+        self._candle_index: Dict[str, int] = {}
+
+    def _event(self, stream: str, update: int) -> Dict:
+        symbol, interval = stream.split("@kline_")
+        step = interval_to_milliseconds(interval)
+        index = self._candle_index.get(stream, 0)
+        open_time = START_TIME_MS + index * step
+        price = 100 + random.random()
+        closed = update == self.updates_per_candle - 1
+        return {
+            "stream": stream,
+            "data": {
+                "e": "kline",
+                "E": open_time + step - 1,
+                "s": symbol.upper(),
+                "k": {
+                    "t": open_time, "T": open_time + step - 1, "s": symbol.upper(), "i": interval,
+                    "f": 0, "L": 0,
+                    "o": f"{price:.8f}", "c": f"{price + 0.5:.8f}",
+                    "h": f"{price + 1:.8f}", "l": f"{price - 1:.8f}",
+                    "v": f"{random.random() * 1000:.8f}", "n": random.randint(1, 500),
+                    "x": closed, "q": "0.00000000", "V": "0.00000000", "Q": "0.00000000", "B": "0",
+                },
+            },
+        }
+
+    async def _handler(self, websocket) -> None:
+        self.connections += 1
+        query = parse_qs(urlparse(websocket.request.path).query)
+        streams = query.get("streams", [""])[0].split("/")
+        delay = 1 / self.messages_per_second if self.messages_per_second else 0
+        sent = 0
+
+        try:
+            while True:
+                for update in range(self.updates_per_candle):
+                    for stream in streams:
+                        await websocket.send(json.dumps(self._event(stream, update)))
+                        sent += 1
+                        self.messages_sent += 1
+                        if update == self.updates_per_candle - 1:
+                            self.closed_candles_sent += 1
+                            self._candle_index[stream] = self._candle_index.get(stream, 0) + 1
+                        if self.drop_after and sent >= self.drop_after:
+                            await websocket.close()
+                            return
+                        await asyncio.sleep(delay)
+        except ConnectionClosed:
+            # The client went away, e.g., because the ingestor was stopped
+            return
+
+    async def serve_forever(self, stop: Optional[asyncio.Event] = None) -> None:
+        """
+        Serves until `stop` is set, or forever if no event is given.
+        """
+        stop = stop or asyncio.Event()
+        async with serve(self._handler, self.host, self.port):
+            await stop.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local fake of the Binance kline stream endpoint.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--updates-per-candle", type=int, default=2)
+    parser.add_argument("--messages-per-second", type=float, default=None)
+    parser.add_argument("--drop-after", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeKlineServer(args.host, args.port, args.updates_per_candle, args.messages_per_second,
+                             args.drop_after)
+    asyncio.run(server.serve_forever())
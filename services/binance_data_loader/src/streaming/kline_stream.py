@@ -0,0 +1,294 @@
+"""
+Module for live ingestion of closed candlesticks from Binance kline WebSocket streams.
+
+This module provides the `KlineStreamIngestor` class, which subscribes to the kline streams of
+many trading pairs over a few multiplexed (combined stream) connections. Only closed candles
+(`x=true`) are kept. They are collected by a `KlineMicroBatcher` and handed to a writer callback
+once a batch is large enough or old enough, so the database receives a few COPYs per second
+instead of one statement per candle. Whenever a connection is (re-)established, a backfill
+callback is invoked for every pair of that connection, so the window that was missed before the
+subscription or while disconnected can be fetched over REST. Dropped connections are
+re-established with exponential backoff. The last close time of a pair only advances once its
+candles are written; if writing a batch fails, its pairs are backfilled from the first candle of
+the failed batch, and again after the next successful write until the backfill succeeds.
+
+Both callbacks are synchronous (they typically talk to psycopg2 and the Binance REST client) and
+are executed one at a time in a worker thread. Full batches are queued for a writer task and
+backfills run as tasks of their own, so the receive loops never wait for either.
+
+Dependencies:
+    - asyncio
+    - json
+    - websockets
+
+Example:
+    Stream closed 1m candles of two pairs and print the batch sizes:
+
+    ```python
+    import asyncio
+    from src.streaming.kline_stream import KlineStreamIngestor
+
+    def write_batch(rows_by_pair):
+        print({key: len(rows) for key, rows in rows_by_pair.items()})
+
+    def backfill(key, last_close_time):
+        print(f"Fetch missed data for {key} after {last_close_time}")
+
+    ingestor = KlineStreamIngestor(logger, [("BTCUSDT", "1m"), ("ETHUSDT", "1m")], write_batch, backfill)
+    asyncio.run(ingestor.run(asyncio.Event()))
+    ```
+"""
+import asyncio
+import json
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from websockets.asyncio.client import connect
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+
+PairKey = Tuple[str, str]
+
+
+def stream_name(symbol: str, interval: str) -> str:
+    """
+    Returns the Binance kline stream name of a trading pair, e.g., 'btcusdt@kline_1m'.
+    """
+    return f"{symbol.lower()}@kline_{interval}"
+
+
+def kline_event_to_row(event: Dict) -> Optional[List]:
+    """
+    Converts a kline stream event into the row layout of the REST klines endpoint.
+
+    Parameters
+    ----------
+    event : Dict
+        The `data` object of a combined stream message.
+
+    Returns
+    -------
+    List or None
+        The kline row, or `None` if the candle is not closed yet.
+    """
+    k = event["k"]
+    if not k["x"]:
+        return None
+    return [k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"], k["q"], k["n"], k["V"], k["Q"], k["B"]]
+
+
+class KlineMicroBatcher:
+    def __init__(self, batch_size: int = 1000, flush_interval: float = 1.0):
+        """
+        Initialize the KlineMicroBatcher class.
+
+        Args:
+            batch_size: Number of buffered candles that triggers a flush.
+            flush_interval: Maximum age in seconds of the oldest buffered candle.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._rows: Dict[PairKey, List[List]] = {}
+        self._count = 0
+        self._oldest: Optional[float] = None
+
+    def add(self, key: PairKey, row: List) -> bool:
+        """
+        Buffers a closed candle and returns whether the batch is full.
+        """
+        self._rows.setdefault(key, []).append(row)
+        self._count += 1
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+        return self._count >= self.batch_size
+
+    def is_due(self) -> bool:
+        """
+        Returns whether the oldest buffered candle has waited for `flush_interval` seconds.
+        """
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+
+    def drain(self) -> Dict[PairKey, List[List]]:
+        """
+        Returns the buffered candles grouped by trading pair and empties the buffer.
+        """
+        rows, self._rows = self._rows, {}
+        self._count = 0
+        self._oldest = None
+        return rows
+
+
+class KlineStreamIngestor:
+    def __init__(self, logger, pairs: List[PairKey],
+                 write_batch: Callable[[Dict[PairKey, List[List]]], None],
+                 backfill: Callable[[PairKey, Optional[int]], None],
+                 url: str = BINANCE_STREAM_URL, streams_per_connection: int = 200,
+                 batch_size: int = 1000, flush_interval: float = 1.0, max_backoff: float = 60.0):
+        """
+        Initialize the KlineStreamIngestor class.
+
+        Args:
+            logger: Logger instance for logging.
+            pairs: (symbol, interval) tuples to subscribe to.
+            write_batch: Called with the closed candles of a micro-batch, grouped by pair.
+            backfill: Called with a pair and the last close time written for it (or `None`) after
+                every connect, to fetch the candles missed while not subscribed. Also called
+                after a failed write, with the close time right before the failed candles.
+            url: Base URL of the combined stream endpoint.
+            streams_per_connection: Maximum number of streams multiplexed over one connection.
+            batch_size: Number of closed candles that triggers a flush.
+            flush_interval: Maximum time in seconds a closed candle waits before it is flushed.
+            max_backoff: Upper bound in seconds of the reconnect backoff.
+        """
+        self.logger = logger
+        self.pairs = pairs
+        self.write_batch = write_batch
+        self.backfill = backfill
+        self.url = url
+        self.streams_per_connection = streams_per_connection
+        self.batcher = KlineMicroBatcher(batch_size, flush_interval)
+        self.max_backoff = max_backoff
+        # Last close time written per pair, advanced only after a successful write
+        self.last_close_times: Dict[PairKey, int] = {}
+        # Close time before the first candle of a failed write per pair, until backfilled
+        self.missing_after: Dict[PairKey, int] = {}
+        self.reconnects = 0
+        self._streams = {stream_name(symbol, interval): (symbol, interval) for symbol, interval in pairs}
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._backfill_tasks: Set[asyncio.Task] = set()
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._stopping = False
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """
+        Streams until `stop` is set, then flushes the remaining candles.
+
+        Parameters
+        ----------
+        stop : asyncio.Event
+            Stops all connections when set.
+        """
+        names = list(self._streams)
+        chunks = [names[i:i + self.streams_per_connection] for i in range(0, len(names), self.streams_per_connection)]
+        self.logger.info(f"Subscribing to {len(names)} kline streams over {len(chunks)} connections.")
+
+        self._write_queue = asyncio.Queue()
+        writer = asyncio.create_task(self._write_batches())
+        tasks = [asyncio.create_task(self._run_connection(chunk, stop)) for chunk in chunks]
+        tasks.append(asyncio.create_task(self._flush_periodically(stop)))
+        try:
+            await stop.wait()
+        finally:
+            for task in tasks + list(self._backfill_tasks):
+                task.cancel()
+            await asyncio.gather(*tasks, *self._backfill_tasks, return_exceptions=True)
+            # Write the queued batches and the remaining candles, then stop the writer
+            self._stopping = True
+            self._flush()
+            self._write_queue.put_nowait(None)
+            await writer
+            self._executor.shutdown(wait=True)
+            for (symbol, interval), last_close_time in self.missing_after.items():
+                self.logger.warning(f"Candles of '{symbol}' with interval '{interval}' after {last_close_time} "
+                                    f"could not be written, run '--mode repair' to fetch them.")
+
+    async def _run_connection(self, names: List[str], stop: asyncio.Event) -> None:
+        url = f"{self.url}?streams={'/'.join(names)}"
+        backoff = 1.0
+        connected_before = False
+
+        while not stop.is_set():
+            try:
+                async with connect(url) as websocket:
+                    if connected_before:
+                        self.reconnects += 1
+                        self.logger.warning(f"Reconnected kline stream connection with {len(names)} streams.")
+                    connected_before = True
+                    # Candles that closed before the subscription was active are fetched over REST
+                    for name in names:
+                        self._start_backfill(self._streams[name])
+                    backoff = 1.0
+
+                    async for message in websocket:
+                        await self._handle_message(message)
+            except Exception as e:
+                self.logger.warning(f"Kline stream connection lost: {e}. Reconnecting in {backoff:.0f}s.")
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _handle_message(self, message) -> None:
+        payload = json.loads(message)
+        event = payload.get("data", payload)
+        if event.get("e") != "kline":
+            return
+
+        row = kline_event_to_row(event)
+        if row is None:
+            return
+
+        key = self._streams.get(payload.get("stream")) or (event["s"], event["k"]["i"])
+        if self.batcher.add(key, row):
+            self._flush()
+
+    def _start_backfill(self, key: PairKey) -> None:
+        if self._stopping:
+            return
+        # Keep a reference, so the task is not garbage-collected while it runs
+        task = asyncio.create_task(self._backfill(key))
+        self._backfill_tasks.add(task)
+        task.add_done_callback(self._backfill_tasks.discard)
+
+    def _mark_missing(self, key: PairKey, last_close_time: int) -> None:
+        self.missing_after[key] = min(self.missing_after.get(key, last_close_time), last_close_time)
+
+    async def _backfill(self, key: PairKey) -> None:
+        # A hole left by a failed write is fetched from its start, ignoring later written candles
+        missing_after = self.missing_after.pop(key, None)
+        last_close_time = self.last_close_times.get(key)
+        if missing_after is not None:
+            last_close_time = min(missing_after, last_close_time or missing_after)
+        try:
+            await self._in_executor(self.backfill, key, last_close_time)
+        except Exception as e:
+            if missing_after is not None:
+                self._mark_missing(key, missing_after)
+            self.logger.error(f"Error backfilling '{key[0]}' with interval '{key[1]}': {e}")
+
+    async def _flush_periodically(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            await asyncio.sleep(self.batcher.flush_interval / 4)
+            if self.batcher.is_due():
+                self._flush()
+
+    def _flush(self) -> None:
+        rows_by_pair = self.batcher.drain()
+        if rows_by_pair:
+            self._write_queue.put_nowait(rows_by_pair)
+
+    async def _write_batches(self) -> None:
+        while True:
+            rows_by_pair = await self._write_queue.get()
+            if rows_by_pair is None:
+                return
+            try:
+                await self._in_executor(self.write_batch, rows_by_pair)
+            except Exception as e:
+                self.logger.error(f"Error writing kline stream batch, backfilling its {len(rows_by_pair)} pairs: {e}")
+                for key, rows in rows_by_pair.items():
+                    self._mark_missing(key, min(row[0] for row in rows) - 1)
+                    self._start_backfill(key)
+                continue
+
+            for key, rows in rows_by_pair.items():
+                self.last_close_times[key] = max(self.last_close_times.get(key, 0), max(row[6] for row in rows))
+                if key in self.missing_after:
+                    # A backfill of an earlier failed batch failed as well, retry now that writes succeed
+                    self._start_backfill(key)
+
+    async def _in_executor(self, func: Callable, *args) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
@@ -1,13 +1,62 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pathlib import Path
+from prometheus_client import make_asgi_app
+from psycopg2.pool import PoolError
+from typing import AsyncIterator, Iterator, List, Literal, Optional
 
 from src.config.config_loader import load_config
-from src.db.database_handler import connect_to_database
+from src.db.async_connection_pool import AsyncDatabasePool
+from src.db.async_postgres_operations import AsyncPostgresOperations
+from src.db.connection_pool import DatabasePool
 from src.db.postgres_operations import PostgresOperations
 from src.helper.interval import search_suitable_interval
+from src.helper.json_stream import (JSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE, iterate_blocking, json_array_chunks,
+                                   ndjson_chunks)
 
+CONFIG_PATH = Path(__file__).resolve().parent / "config.yml"
 
-api = FastAPI(openapi_tags=[
+# Largest page a client can request without streaming
+MAX_LIMIT = 10000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Buckets fetched from the server-side cursor per round trip when streaming
+STREAM_BATCH_SIZE = 1000
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the configuration and open the database connection pool once per process.
+
+    With `pool/driver: asyncpg` (default) queries run on the event loop. With `psycopg2` they run
+    blocking in FastAPI's threadpool, which bounds the number of concurrent queries.
+    """
+    config = load_config(CONFIG_PATH)
+    pool_settings = config.get('pool') or {}
+    pool_class = DatabasePool if pool_settings.get('driver', 'asyncpg') == 'psycopg2' else AsyncDatabasePool
+    app.state.config = config
+    app.state.db_pool = pool_class(
+        config['postgres'],
+        min_connections=pool_settings.get('min_connections', 1),
+        max_connections=pool_settings.get('max_connections', 10),
+        acquire_timeout=pool_settings.get('acquire_timeout', 5.0),
+        health_check_seconds=pool_settings.get('health_check_seconds', 30.0),
+    )
+    if isinstance(app.state.db_pool, AsyncDatabasePool):
+        await app.state.db_pool.open()
+    try:
+        yield
+    finally:
+        if isinstance(app.state.db_pool, AsyncDatabasePool):
+            await app.state.db_pool.close()
+        else:
+            app.state.db_pool.close()
+
+
+api = FastAPI(lifespan=lifespan, openapi_tags=[
     {
         'name': 'home',
         'description': 'Basic functionality of API'
@@ -17,26 +66,132 @@ api = FastAPI(openapi_tags=[
         'description': 'Candlestick Data. Open, High, Low, Close, Volume'
     }
 ])
+api.mount('/metrics', make_asgi_app())
+
+
+@api.exception_handler(PoolError)
+async def pool_exhausted(request: Request, exc: PoolError):
+    """Answer 503 if no database connection became free in time."""
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 
 @api.get('/check', tags=['home'])
-def check_availability():
+async def check_availability():
     """Check if the app is running."""
     return {"data": "success"}
 
 
-@api.get("/candlesticks/{symbol}/{target_interval}", tags=['candlestick'])
-def get_candlesticks(symbol: str, target_interval: str):
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Interpret timestamps without a time zone as UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def next_cursor(data: list, limit: Optional[int]) -> Optional[str]:
+    """Return the cursor of the page after `data`, or None if `data` is the last page."""
+    if limit is None or len(data) < limit:
+        return None
+    last_open_time = datetime.fromisoformat(data[-1]['open_time']).astimezone(timezone.utc)
+    return last_open_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def get_candlesticks_blocking(db_pool: DatabasePool, symbol: str, target_interval: str, **filters):
+    """psycopg2 version of `get_candlesticks`, run in the threadpool."""
     psql_ops = PostgresOperations()
 
-    conf_path = Path(__file__).resolve().parent / "config.yml"
-    config = load_config(conf_path)
-    conn = connect_to_database(config['postgres'])
-    available_intervals = psql_ops.get_available_intervals_for_trading_pair(conn, symbol)
+    with db_pool.connection() as conn:
+        available_intervals = psql_ops.get_available_intervals_for_trading_pair(conn, symbol)
+
+        chosen_interval = search_suitable_interval(available_intervals=available_intervals,
+                                                    target_interval=target_interval)
+
+        return psql_ops.get_candlestick_data(conn, symbol, target_interval, chosen_interval, **filters)
+
+
+def choose_interval_blocking(db_pool: DatabasePool, symbol: str, target_interval: str) -> str:
+    """Look up the stored interval that `target_interval` is aggregated from, with psycopg2."""
+    with db_pool.connection() as conn:
+        available_intervals = PostgresOperations().get_available_intervals_for_trading_pair(conn, symbol)
+
+    return search_suitable_interval(available_intervals=available_intervals, target_interval=target_interval)
+
+
+async def choose_interval(db_pool: AsyncDatabasePool, symbol: str, target_interval: str) -> str:
+    """Look up the stored interval that `target_interval` is aggregated from, with asyncpg."""
+    async with db_pool.connection() as conn:
+        available_intervals = await AsyncPostgresOperations().get_available_intervals_for_trading_pair(conn, symbol)
+
+    return search_suitable_interval(available_intervals=available_intervals, target_interval=target_interval)
+
+
+def stream_candlesticks_blocking(db_pool: DatabasePool, symbol: str, target_interval: str, interval: str,
+                                 **filters) -> Iterator[List[str]]:
+    """Yield batches of buckets as JSON text, holding a psycopg2 connection until closed."""
+    with db_pool.connection() as conn:
+        yield from PostgresOperations().iter_candlestick_json(conn, symbol, target_interval, interval,
+                                                              batch_size=STREAM_BATCH_SIZE, **filters)
+
+
+async def stream_candlesticks(db_pool: AsyncDatabasePool, symbol: str, target_interval: str, interval: str,
+                              **filters) -> AsyncIterator[List[str]]:
+    """Yield batches of buckets as JSON text, holding an asyncpg connection until closed."""
+    async with db_pool.connection() as conn:
+        async for batch in AsyncPostgresOperations().iter_candlestick_json(conn, symbol, target_interval, interval,
+                                                                           batch_size=STREAM_BATCH_SIZE, **filters):
+            yield batch
+
+
+@api.get("/candlesticks/{symbol}/{target_interval}", tags=['candlestick'])
+async def get_candlesticks(symbol: str, target_interval: str, request: Request, response: Response,
+                           start: Optional[datetime] = None, end: Optional[datetime] = None,
+                           limit: Optional[int] = Query(None, ge=1), cursor: Optional[datetime] = None,
+                           stream: Optional[Literal['ndjson', 'json']] = None):
+    """
+    Aggregate the candles of a trading pair into buckets of `target_interval`.
+
+    The buckets start with the bucket containing `start` and end before `end` (exclusive).
+    Without `limit` all of them are returned, as before paging was added. With `limit` (at most
+    `MAX_LIMIT`) at most that many are returned, and if there may be more, the `X-Next-Cursor`
+    header holds the `cursor` of the next page.
+
+    With `stream=ndjson` (one bucket per line) or `stream=json` (one array) the buckets are
+    streamed from a server-side cursor while they are read, without holding the whole range in
+    memory, and `limit` is not bounded by `MAX_LIMIT`.
+    """
+    if stream is None and limit is not None and limit > MAX_LIMIT:
+        raise HTTPException(status_code=422, detail=f"limit must not exceed {MAX_LIMIT} unless streaming")
+
+    filters = {'start': as_utc(start), 'end': as_utc(end), 'limit': limit, 'cursor': as_utc(cursor)}
+    db_pool = request.app.state.db_pool
+
+    if stream is not None:
+        if isinstance(db_pool, DatabasePool):
+            chosen_interval = await run_in_threadpool(choose_interval_blocking, db_pool, symbol, target_interval)
+            batches = iterate_blocking(
+                stream_candlesticks_blocking(db_pool, symbol, target_interval, chosen_interval, **filters))
+        else:
+            chosen_interval = await choose_interval(db_pool, symbol, target_interval)
+            batches = stream_candlesticks(db_pool, symbol, target_interval, chosen_interval, **filters)
+
+        if stream == 'ndjson':
+            return StreamingResponse(ndjson_chunks(batches), media_type=NDJSON_MEDIA_TYPE)
+        return StreamingResponse(json_array_chunks(batches), media_type=JSON_MEDIA_TYPE)
+
+    if isinstance(db_pool, DatabasePool):
+        data = await run_in_threadpool(get_candlesticks_blocking, db_pool, symbol, target_interval, **filters)
+    else:
+        psql_ops = AsyncPostgresOperations()
+
+        async with db_pool.connection() as conn:
+            available_intervals = await psql_ops.get_available_intervals_for_trading_pair(conn, symbol)
 
-    chosen_interval = search_suitable_interval(available_intervals=available_intervals,
-                                                target_interval=target_interval)
+            chosen_interval = search_suitable_interval(available_intervals=available_intervals,
+                                                        target_interval=target_interval)
 
-    data = psql_ops.get_candlestick_data(conn, symbol, target_interval, chosen_interval)
+            data = await psql_ops.get_candlestick_data(conn, symbol, target_interval, chosen_interval, **filters)
 
+    next_page = next_cursor(data, limit)
+    if next_page is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_page
     return data
@@ -0,0 +1,121 @@
+"""
+Module for sharing a bounded pool of asyncpg connections between all API requests.
+
+`AsyncDatabasePool` is the asyncio counterpart of `DatabasePool`. It wraps an `asyncpg.Pool`, so
+requests wait for a free connection without blocking the event loop, and a single worker can
+serve hundreds of concurrent requests with a few connections:
+
+- At most `max_connections` connections exist. Requests beyond that wait up to `acquire_timeout`
+  seconds for a returned connection and then raise `PoolError`, as with `DatabasePool`.
+- Connections that have been idle for `health_check_seconds` are closed and reopened on demand,
+  so connections dropped by a database restart or a firewall are never handed out. Connections
+  that fail during a request are replaced by asyncpg.
+- asyncpg prepares every statement on first use and caches it per connection, so queries with a
+  constant text and bind parameters are parsed and planned once per connection.
+
+Wait times, timeouts and usage are recorded in the metrics of `src.helper.metrics`.
+
+Dependencies:
+    - asyncpg
+    - prometheus-client
+
+Example:
+    ```python
+    pool = AsyncDatabasePool(config['postgres'], min_connections=1, max_connections=10)
+    await pool.open()
+    async with pool.connection() as conn:
+        intervals = await psql_ops.get_available_intervals_for_trading_pair(conn, "BTCUSDT")
+    await pool.close()
+    ```
+"""
+import asyncio
+import time
+import asyncpg
+
+from contextlib import asynccontextmanager
+from psycopg2.pool import PoolError
+from typing import AsyncIterator, Dict, Optional
+
+from src.helper import metrics
+
+
+def asyncpg_connect_params(db_params: Dict) -> Dict:
+    """
+    Translates psycopg2 connection parameters (the `postgres` section of `config.yml`) to asyncpg.
+    """
+    params = dict(db_params)
+    if 'dbname' in params:
+        params['database'] = params.pop('dbname')
+    if 'port' in params:
+        params['port'] = int(params['port'])
+    return params
+
+
+class AsyncDatabasePool:
+    def __init__(self, db_params: Dict, min_connections: int = 1, max_connections: int = 10,
+                 acquire_timeout: float = 5.0, health_check_seconds: float = 30.0):
+        """
+        Initialize the AsyncDatabasePool class. The connections are opened by `open`.
+
+        Args:
+            db_params: Database connection parameters (the `postgres` section of `config.yml`).
+            min_connections: Connections opened at startup.
+            max_connections: Maximum number of open connections.
+            acquire_timeout: Seconds a request waits for a free connection before `PoolError`.
+            health_check_seconds: Idle time after which a connection is closed.
+        """
+        self.db_params = asyncpg_connect_params(db_params)
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self.health_check_seconds = health_check_seconds
+        self.pool: Optional[asyncpg.Pool] = None
+        self._waiting = 0
+
+    async def open(self) -> None:
+        """
+        Opens the pool with `min_connections` connections.
+        """
+        self.pool = await asyncpg.create_pool(
+            min_size=self.min_connections,
+            max_size=self.max_connections,
+            max_inactive_connection_lifetime=self.health_check_seconds,
+            **self.db_params,
+        )
+        metrics.POOL_CONNECTIONS_MAX.set(self.max_connections)
+        metrics.POOL_CONNECTIONS_IN_USE.set_function(lambda: self.pool.get_size() - self.pool.get_idle_size())
+        metrics.POOL_WAITING_REQUESTS.set_function(lambda: self._waiting)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[asyncpg.Connection]:
+        """
+        Borrows a connection for the enclosed block, waiting up to `acquire_timeout` seconds.
+
+        Raises
+        ------
+        PoolError
+            If no connection became free within `acquire_timeout` seconds.
+        """
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            conn = await self.pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            metrics.POOL_TIMEOUTS.inc()
+            raise PoolError(f"No database connection available within {self.acquire_timeout}s")
+        finally:
+            self._waiting -= 1
+        metrics.POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+        try:
+            yield conn
+        finally:
+            await self.pool.release(conn)
+
+    async def close(self) -> None:
+        """
+        Closes all connections of the pool.
+        """
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
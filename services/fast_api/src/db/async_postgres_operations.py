@@ -0,0 +1,151 @@
+import json
+
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
+
+from src.helper.interval import interval_to_minutes
+
+AVAILABLE_INTERVALS_QUERY = """
+    SELECT DISTINCT interval
+    FROM trading_pairs
+    WHERE symbol = $1
+    ORDER BY interval;
+""".strip()
+
+BUCKET_OBJECT = """
+json_build_object(
+        'open_time', bucket_time,
+        'low', low,
+        'high', high,
+        'open', open,
+        'close', close,
+        'volume', volume,
+        'number_of_trades', number_of_trades
+    )
+""".strip()
+
+# The statement text only depends on the filters used, so asyncpg prepares each variant once per
+# connection. The placeholders are replaced by `build_candlestick_query`.
+CANDLESTICK_DATA_QUERY = """
+{select}
+FROM (
+    SELECT
+        time_bucket($1::interval, t1.timestamp) AS bucket_time,
+        MIN(t1.low) AS low,
+        MAX(t1.high) AS high,
+        FIRST(t1.open, t1.timestamp) AS open,
+        LAST(t1.close, t1.timestamp) AS close,
+        SUM(t1.volume) AS volume,
+        SUM(t1.number_of_trades) AS number_of_trades
+    FROM candlesticks t1
+    JOIN trading_pairs t2
+        ON t1.trading_pair_id = t2.id
+    WHERE
+        t2.symbol = $2
+        AND t2.interval = $3
+        {conditions}
+    GROUP BY bucket_time
+    ORDER BY bucket_time
+    {limit}
+) AS sub
+{order};
+""".strip()
+
+
+class AsyncPostgresOperations:
+    """
+    asyncio counterpart of `PostgresOperations` for asyncpg connections. The values of a query are
+    passed as bind parameters instead of being formatted into its text.
+    """
+
+    def build_time_bucket_interval(self, interval_str: str) -> timedelta:
+        """
+        Converts an interval string into the bucket width passed to
+        time_bucket(interval, timestamp), for example:
+        '5m' -> timedelta(minutes=5), '1h' -> timedelta(hours=1), etc.
+        """
+        return timedelta(minutes=interval_to_minutes(interval_str))
+
+    async def get_available_intervals_for_trading_pair(self, conn, symbol: str) -> list[str]:
+        """
+        Returns all available intervals for a given trading pair symbol
+        from the 'trading_pairs' table.
+
+        Args:
+            conn: An asyncpg connection to the database.
+            symbol: The trading pair symbol (e.g. 'BTC/USD').
+
+        Returns:
+            A list of intervals (e.g. ['1m', '5m', '1h']).
+        """
+        rows = await conn.fetch(AVAILABLE_INTERVALS_QUERY, symbol)
+        return [row[0] for row in rows]
+
+    def build_candlestick_query(self, symbol: str, target_interval: str, interval: str,
+                                start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                limit: Optional[int] = None, cursor: Optional[datetime] = None,
+                                aggregate: bool = True) -> Tuple[str, List]:
+        """
+        Returns the query of `PostgresOperations.build_candlestick_query` for asyncpg and its bind
+        parameters. The range is applied to the raw timestamps, so TimescaleDB only scans the
+        chunks and index entries of the requested window.
+        """
+        bucket = self.build_time_bucket_interval(target_interval)
+        args = [bucket, symbol, interval]
+        conditions = []
+        if start is not None:
+            args.append(start)
+            # Include the whole bucket containing start
+            conditions.append(f"AND t1.timestamp >= time_bucket($1::interval, ${len(args)}::timestamptz)")
+        if cursor is not None:
+            args.append(cursor + bucket)
+            conditions.append(f"AND t1.timestamp >= ${len(args)}")
+        if end is not None:
+            args.append(end)
+            conditions.append(f"AND t1.timestamp < ${len(args)}")
+        limit_clause = ""
+        if limit is not None:
+            args.append(limit)
+            limit_clause = f"LIMIT ${len(args)}"
+
+        query = CANDLESTICK_DATA_QUERY.format(
+            select=f"SELECT json_agg({BUCKET_OBJECT}) AS data" if aggregate else f"SELECT {BUCKET_OBJECT}::text",
+            conditions="\n        ".join(conditions),
+            limit=limit_clause,
+            order="" if aggregate else "ORDER BY bucket_time",
+        )
+        return query, args
+
+    async def get_candlestick_data(self, conn, symbol: str, target_interval: str, interval: str,
+                                   start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                   limit: Optional[int] = None, cursor: Optional[datetime] = None):
+        """
+        Returns the buckets of `build_candlestick_query`, ordered by their open time, as one list.
+        """
+        query, args = self.build_candlestick_query(symbol, target_interval, interval, start, end, limit, cursor)
+
+        data = await conn.fetchval(query, *args)
+
+        # asyncpg returns json values as text
+        return json.loads(data) if data else []
+
+    async def iter_candlestick_json(self, conn, symbol: str, target_interval: str, interval: str,
+                                    start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                    limit: Optional[int] = None, cursor: Optional[datetime] = None,
+                                    batch_size: int = 1000) -> AsyncIterator[List[str]]:
+        """
+        Yields the buckets of `build_candlestick_query` in batches of JSON objects as text.
+
+        The buckets are read through a server-side cursor in a transaction of its own, so neither
+        the database nor the API holds more than `batch_size` buckets at a time.
+        """
+        query, args = self.build_candlestick_query(symbol, target_interval, interval, start, end, limit, cursor,
+                                                   aggregate=False)
+
+        async with conn.transaction(readonly=True):
+            cur = await conn.cursor(query, *args)
+            while True:
+                rows = await cur.fetch(batch_size)
+                if not rows:
+                    return
+                yield [row[0] for row in rows]
@@ -0,0 +1,176 @@
+"""
+Module for sharing a bounded pool of database connections between all API requests.
+
+Opening a psycopg2 connection per request costs a TCP and authentication handshake, and under
+load the open connections can exceed the `max_connections` of PostgreSQL. `DatabasePool` wraps a
+`psycopg2.pool.ThreadedConnectionPool` that is created once per application:
+
+- At most `max_connections` connections exist. Requests beyond that wait up to `acquire_timeout`
+  seconds for a returned connection instead of failing at once, and then raise `PoolError`.
+- A connection that has been idle for `health_check_seconds` is checked with `SELECT 1` before it
+  is handed out, so connections dropped by a database restart or a firewall are replaced
+  transparently.
+- Connections returned after a connection error, or closed, are discarded instead of reused.
+
+Wait times, timeouts and usage are recorded in the metrics of `src.helper.metrics`.
+
+Dependencies:
+    - prometheus-client
+    - psycopg2
+
+Example:
+    ```python
+    pool = DatabasePool(config['postgres'], min_connections=1, max_connections=10)
+    with pool.connection() as conn:
+        intervals = psql_ops.get_available_intervals_for_trading_pair(conn, "BTCUSDT")
+    pool.close()
+    ```
+"""
+import threading
+import time
+import psycopg2
+
+from contextlib import contextmanager
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from typing import Dict, Iterator
+
+from src.helper import metrics
+
+
+class DatabasePool:
+    def __init__(self, db_params: Dict, min_connections: int = 1, max_connections: int = 10,
+                 acquire_timeout: float = 5.0, health_check_seconds: float = 30.0):
+        """
+        Initialize the DatabasePool class and open `min_connections` connections.
+
+        Args:
+            db_params: Database connection parameters (the `postgres` section of `config.yml`).
+            min_connections: Connections opened at startup.
+            max_connections: Maximum number of open connections. Connections are opened on
+                demand up to this number and then kept open for reuse.
+            acquire_timeout: Seconds a request waits for a free connection before `PoolError`.
+            health_check_seconds: Idle time after which a connection is checked before use.
+        """
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self.health_check_seconds = health_check_seconds
+        self._pool = ThreadedConnectionPool(min_connections, max_connections, **db_params)
+        # psycopg2 closes returned connections beyond `minconn`; keep all of them open for reuse
+        self._pool.minconn = max_connections
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._last_used: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._waiting = 0
+
+        metrics.POOL_CONNECTIONS_MAX.set(max_connections)
+        metrics.POOL_CONNECTIONS_IN_USE.set_function(lambda: self._in_use)
+        metrics.POOL_WAITING_REQUESTS.set_function(lambda: self._waiting)
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - self._last_used.get(id(conn), 0.0) < self.health_check_seconds:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    def getconn(self):
+        """
+        Borrows a healthy connection, waiting up to `acquire_timeout` seconds for a free one.
+
+        Returns
+        -------
+        connection
+            A psycopg2 connection, to be given back with `putconn`.
+
+        Raises
+        ------
+        PoolError
+            If no connection became free within `acquire_timeout` seconds.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        if not acquired:
+            metrics.POOL_TIMEOUTS.inc()
+            raise PoolError(f"No database connection available within {self.acquire_timeout}s")
+
+        try:
+            conn = self._pool.getconn()
+            while not self._is_healthy(conn):
+                metrics.POOL_DISCARDED_CONNECTIONS.labels("health_check").inc()
+                self._discard(conn)
+                conn = self._pool.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+        metrics.POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+        return conn
+
+    def _discard(self, conn) -> None:
+        self._last_used.pop(id(conn), None)
+        self._pool.putconn(conn, close=True)
+
+    def putconn(self, conn, broken: bool = False) -> None:
+        """
+        Gives a borrowed connection back. Open transactions are rolled back by the pool.
+
+        Parameters
+        ----------
+        conn : connection
+            Connection returned by `getconn`.
+        broken : bool
+            Whether the connection failed with a connection error and must not be reused.
+        """
+        try:
+            if broken or conn.closed:
+                metrics.POOL_DISCARDED_CONNECTIONS.labels("connection_error").inc()
+                self._discard(conn)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                try:
+                    self._pool.putconn(conn)
+                except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                    # The rollback of an open transaction failed, the connection is gone
+                    metrics.POOL_DISCARDED_CONNECTIONS.labels("connection_error").inc()
+                    self._discard(conn)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator:
+        """
+        Borrows a connection for the enclosed block. It is discarded if the block fails with a
+        connection error.
+        """
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, broken)
+
+    def close(self) -> None:
+        """
+        Closes all connections of the pool.
+        """
+        self._pool.closeall()
@@ -1,6 +1,10 @@
 import re
 
+from datetime import datetime, timedelta
 from io import StringIO
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.helper.interval import interval_to_minutes
 
 
 class PostgresOperations:
@@ -57,18 +61,57 @@ class PostgresOperations:
 
         return intervals
 
-    def get_candlestick_data(self, conn, symbol: str, target_interval: str, interval: str):
+    def build_candlestick_query(self, symbol: str, target_interval: str, interval: str,
+                                start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                limit: Optional[int] = None, cursor: Optional[datetime] = None,
+                                aggregate: bool = True) -> Tuple[str, Dict]:
         """
         Creates a SQL statement for TimescaleDB that performs:
           - Aggregation on a chosen time bucket (e.g., '5 minutes')
           - Joins the 'candlesticks' table to 'trading_pairs'
           - Filters by the given symbol and an available interval
+          - Optionally restricts the buckets to a time range and a page after a cursor
+
+        The range is applied to the raw timestamps, so TimescaleDB only scans the chunks and
+        index entries of the requested window.
+
+        Args:
+            symbol: The trading pair symbol (e.g. 'BTC/USD').
+            target_interval: Width of the buckets (e.g. '5m').
+            interval: Stored interval the buckets are aggregated from.
+            start: Buckets containing or following this time are returned.
+            end: Only candles before this time (exclusive) are aggregated.
+            limit: Maximum number of buckets.
+            cursor: Open time of the last bucket of the previous page; only later buckets are returned.
+            aggregate: Whether the query returns all buckets as one JSON array, or one row with a
+                JSON object as text per bucket.
+
+        Returns:
+            The query and its parameters.
         """
-        target_interval = self.build_time_bucket_part(target_interval)
+        bucket_width = timedelta(minutes=interval_to_minutes(target_interval))
+        params = {
+            'bucket': self.build_time_bucket_part(target_interval),
+            'symbol': symbol,
+            'interval': interval,
+            'start': start,
+            'end': end,
+            'after': cursor + bucket_width if cursor else None,
+            'limit': limit,
+        }
 
-        query = f"""
-        SELECT json_agg(
-            json_build_object(
+        conditions = []
+        if start is not None:
+            # Include the whole bucket containing start
+            conditions.append("AND t1.timestamp >= time_bucket(%(bucket)s::interval, %(start)s::timestamptz)")
+        if cursor is not None:
+            conditions.append("AND t1.timestamp >= %(after)s")
+        if end is not None:
+            conditions.append("AND t1.timestamp < %(end)s")
+        conditions = "\n                ".join(conditions)
+        limit_clause = "LIMIT %(limit)s" if limit is not None else ""
+
+        bucket_object = """json_build_object(
                 'open_time', bucket_time,
                 'low', low,
                 'high', high,
@@ -76,11 +119,15 @@ class PostgresOperations:
                 'close', close,
                 'volume', volume,
                 'number_of_trades', number_of_trades
-            )
-        ) AS data
+            )"""
+        select = f"SELECT json_agg({bucket_object}) AS data" if aggregate else f"SELECT {bucket_object}::text"
+        order = "" if aggregate else "ORDER BY bucket_time"
+
+        query = f"""
+        {select}
         FROM (
             SELECT
-                time_bucket('{target_interval}', t1.timestamp) AS bucket_time,
+                time_bucket(%(bucket)s::interval, t1.timestamp) AS bucket_time,
                 MIN(t1.low) AS low,
                 MAX(t1.high) AS high,
                 FIRST(t1.open, t1.timestamp) AS open,
@@ -91,17 +138,59 @@ class PostgresOperations:
             JOIN trading_pairs t2
                 ON t1.trading_pair_id = t2.id
             WHERE
-                t2.symbol = '{symbol}'
-                AND t2.interval = '{interval}'
+                t2.symbol = %(symbol)s
+                AND t2.interval = %(interval)s
+                {conditions}
             GROUP BY bucket_time
             ORDER BY bucket_time
-        ) AS sub;
+            {limit_clause}
+        ) AS sub
+        {order};
         """.strip()
+        return query, params
+
+    def get_candlestick_data(self, conn, symbol: str, target_interval: str, interval: str,
+                             start: Optional[datetime] = None, end: Optional[datetime] = None,
+                             limit: Optional[int] = None, cursor: Optional[datetime] = None):
+        """
+        Returns the buckets of `build_candlestick_query`, ordered by their open time, as one list.
+
+        Args:
+            conn: An open psycopg2 connection to the database.
+            The other arguments are those of `build_candlestick_query`.
+        """
+        query, params = self.build_candlestick_query(symbol, target_interval, interval, start, end, limit, cursor)
 
         with conn.cursor() as cur:
-            cur.execute(query)
+            cur.execute(query, params)
             row = cur.fetchone()
-            conn.close()
 
         data = row[0] if row and row[0] else []
         return data
+
+    def iter_candlestick_json(self, conn, symbol: str, target_interval: str, interval: str,
+                              start: Optional[datetime] = None, end: Optional[datetime] = None,
+                              limit: Optional[int] = None, cursor: Optional[datetime] = None,
+                              batch_size: int = 1000) -> Iterator[List[str]]:
+        """
+        Yields the buckets of `build_candlestick_query` in batches of JSON objects as text.
+
+        The buckets are read through a named server-side cursor, so neither the database nor the
+        API holds more than `batch_size` buckets at a time, however large the range. The cursor
+        lives in the current transaction, which is rolled back when the connection is returned.
+
+        Args:
+            conn: An open psycopg2 connection to the database, not in autocommit mode.
+            batch_size: Number of buckets fetched per round trip.
+            The other arguments are those of `build_candlestick_query`.
+        """
+        query, params = self.build_candlestick_query(symbol, target_interval, interval, start, end, limit, cursor,
+                                                     aggregate=False)
+
+        with conn.cursor(name="candlestick_stream") as cur:
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield [row[0] for row in rows]
@@ -0,0 +1,60 @@
+"""
+Module for encoding batches of JSON documents as a streamed response body.
+
+The streaming endpoints read rows that are already JSON text from the database in batches. The
+functions of this module turn those batches into the chunks of a `StreamingResponse` without
+parsing them, so the API holds only one batch at a time:
+
+- `ndjson_chunks` writes one document per line (`application/x-ndjson`),
+- `json_array_chunks` writes one JSON array, opened before the first and closed after the last batch,
+- `iterate_blocking` runs a blocking generator of batches in the threadpool and closes it when the
+  response ends or the client disconnects, so its database connection is returned.
+
+Example:
+    ```python
+    batches = psql_ops.iter_candlestick_json(conn, "BTCUSDT", "1h", "1m")
+    return StreamingResponse(ndjson_chunks(batches), media_type=NDJSON_MEDIA_TYPE)
+    ```
+"""
+import anyio
+
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from typing import AsyncIterator, Iterator, List
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[str]]) -> AsyncIterator[str]:
+    """
+    Yields every batch of JSON documents as newline-delimited lines.
+    """
+    async for batch in batches:
+        yield "\n".join(batch) + "\n"
+
+
+async def json_array_chunks(batches: AsyncIterator[List[str]]) -> AsyncIterator[str]:
+    """
+    Yields the JSON documents of all batches as the elements of one JSON array.
+    """
+    separator = "["
+    async for batch in batches:
+        yield separator + ",".join(batch)
+        separator = ","
+    yield "[]" if separator == "[" else "]"
+
+
+async def iterate_blocking(batches: Iterator[List[str]]) -> AsyncIterator[List[str]]:
+    """
+    Iterates a blocking generator in the threadpool and closes it when iteration stops.
+
+    The close is shielded from cancellation: on a client disconnect the response task is
+    cancelled, and the generator would otherwise be finalised later by the garbage collector, on
+    the event loop thread.
+    """
+    try:
+        async for batch in iterate_in_threadpool(batches):
+            yield batch
+    finally:
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(batches.close)
@@ -0,0 +1,42 @@
+"""
+Module for Prometheus instrumentation of the API.
+
+This module defines the metrics of the database connection pool shared by all requests:
+
+- `api_db_pool_wait_seconds`: time a request waited for a connection, including the health check,
+- `api_db_pool_timeouts_total`: requests that gave up waiting for a connection,
+- `api_db_pool_connections_in_use` / `api_db_pool_connections_max`: borrowed and allowed connections,
+- `api_db_pool_waiting_requests`: requests currently waiting for a connection,
+- `api_db_pool_discarded_connections_total`: broken connections closed by the pool, by reason.
+
+The metrics are served by `main.py` on `/metrics`.
+
+Dependencies:
+    - prometheus-client
+
+Example:
+    Observe a pool checkout:
+
+    ```python
+    from src.helper import metrics
+
+    metrics.POOL_WAIT_SECONDS.observe(0.002)
+    ```
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+# Checkouts take microseconds from an idle pool and up to the acquire timeout from an exhausted one
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+POOL_WAIT_SECONDS = Histogram(
+    "api_db_pool_wait_seconds", "Time a request waited for a database connection.", buckets=WAIT_BUCKETS)
+POOL_TIMEOUTS = Counter(
+    "api_db_pool_timeouts_total", "Requests that gave up waiting for a database connection.")
+POOL_CONNECTIONS_IN_USE = Gauge(
+    "api_db_pool_connections_in_use", "Database connections currently borrowed by requests.")
+POOL_CONNECTIONS_MAX = Gauge(
+    "api_db_pool_connections_max", "Maximum number of database connections of the pool.")
+POOL_WAITING_REQUESTS = Gauge(
+    "api_db_pool_waiting_requests", "Requests currently waiting for a database connection.")
+POOL_DISCARDED_CONNECTIONS = Counter(
+    "api_db_pool_discarded_connections_total", "Broken database connections closed by the pool.", ["reason"])
@@ -0,0 +1,138 @@
+"""
+Script for load testing `/candlesticks` with the blocking psycopg2 and the asyncpg database driver.
+
+For every driver the API is started with uvicorn in a fresh single-worker process, with the
+`pool/driver` setting of `config.yml` overridden. A number of concurrent clients then request the
+same chart until the total number of requests is reached. For every driver the requests per
+second, the error count and the 50th, 95th and 99th latency percentiles are printed.
+
+The API needs a database with candlesticks for the requested symbol, e.g., filled by the
+binance_data_loader service.
+
+Dependencies:
+    - aiohttp
+    - multiprocessing
+    - uvicorn
+
+Example:
+    Request the daily LINKUSDT chart 5,000 times with 300 concurrent clients:
+
+    ```bash
+    python -m src.scripts.benchmark_candlestick_api --symbol LINKUSDT --interval 1d \\
+        --concurrency 300 --requests 5000
+    ```
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import tempfile
+import time
+import urllib.request
+import aiohttp
+import uvicorn
+import yaml
+
+from pathlib import Path
+from typing import Dict, List
+
+from src.config.config_loader import load_config
+
+SERVICE_DIR = Path(__file__).resolve().parents[2]
+
+
+def run_server(config_path: Path, port: int) -> None:
+    import main
+
+    main.CONFIG_PATH = config_path
+    uvicorn.run(main.api, host="localhost", port=port, log_level="warning")
+
+
+def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(base_url + "/check") as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"API at {base_url} did not start within {timeout}s")
+        time.sleep(0.2)
+
+
+async def run_load(url: str, concurrency: int, requests: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def client_loop(session: aiohttp.ClientSession) -> None:
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                async with session.get(url) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    # aiohttp keeps up with the server when both share a machine, httpx's async client does not
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=120)) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50": percentiles[49],
+        "p95": percentiles[94],
+        "p99": percentiles[98],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test /candlesticks with the psycopg2 and asyncpg drivers.")
+    parser.add_argument("--config", type=Path, default=SERVICE_DIR / "config.yml")
+    parser.add_argument("--symbol", default="LINKUSDT")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--drivers", nargs="+", default=["psycopg2", "asyncpg"], choices=["psycopg2", "asyncpg"])
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    base_url = f"http://localhost:{args.port}"
+    url = f"{base_url}/candlesticks/{args.symbol}/{args.interval}"
+    context = multiprocessing.get_context("spawn")
+
+    print(f"{'driver':<12}{'requests':>10}{'errors':>8}{'seconds':>10}{'req/s':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for driver in args.drivers:
+        config["pool"] = dict(config.get("pool") or {}, driver=driver)
+        with tempfile.NamedTemporaryFile("w", suffix=".yml") as config_file:
+            yaml.safe_dump(config, config_file)
+            config_file.flush()
+
+            server = context.Process(target=run_server, args=(Path(config_file.name), args.port))
+            server.start()
+            try:
+                wait_until_ready(base_url)
+                result = asyncio.run(run_load(url, args.concurrency, args.requests))
+            finally:
+                server.terminate()
+                server.join()
+
+        print(f"{driver:<12}{result['requests']:>10,}{result['errors']:>8,}{result['seconds']:>10.2f}"
+              f"{result['requests_per_second']:>10,.0f}{result['p50'] * 1000:>10.1f}"
+              f"{result['p95'] * 1000:>10.1f}{result['p99'] * 1000:>10.1f}")
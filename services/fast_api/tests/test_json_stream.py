@@ -0,0 +1,52 @@
+import threading
+import time
+import anyio
+import pytest
+
+from contextlib import contextmanager
+
+from src.helper.json_stream import iterate_blocking, ndjson_chunks
+
+
+class FakePool:
+    def __init__(self):
+        self.in_use = 0
+        self.returned_by = []
+
+    @contextmanager
+    def connection(self):
+        self.in_use += 1
+        try:
+            yield object()
+        finally:
+            self.in_use -= 1
+            self.returned_by.append(threading.get_ident())
+
+
+def stream_batches(pool):
+    with pool.connection():
+        while True:
+            time.sleep(0.05)
+            yield ['{"open_time": "2024-01-01T00:00:00+00:00"}']
+
+
+@pytest.mark.anyio
+async def test_iterate_blocking_returns_connection_when_cancelled_mid_stream():
+    pool = FakePool()
+    batches = stream_batches(pool)
+    chunks = []
+
+    async def consume():
+        async for chunk in ndjson_chunks(iterate_blocking(batches)):
+            chunks.append(chunk)
+
+    # Starlette cancels the response task group when the client disconnects
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(consume)
+        while len(chunks) < 2:
+            await anyio.sleep(0.01)
+        task_group.cancel_scope.cancel()
+
+    # `batches` is still referenced, so only the shielded close can have returned the connection
+    assert pool.in_use == 0
+    assert pool.returned_by != [threading.get_ident()]